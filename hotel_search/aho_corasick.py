@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aho–Corasick 多模式匹配
+把整个词典编译成一个自动机，对文本只扫描一遍即可找出所有词典词，
+耗时与文本长度（加匹配数）成正比，与词典大小无关
+"""
+
+from collections import deque
+from typing import Dict, Generic, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar, Union
+
+V = TypeVar('V')
+
+# (起始下标, 结束下标（不含）, 值)
+Match = Tuple[int, int, V]
+
+
+class AhoCorasickMatcher(Generic[V]):
+    """多模式匹配器，默认采用最左最长（leftmost-longest）语义
+
+    patterns 可以是 {词: 值} 字典，也可以是 (词, 值) 序列；同一个词出现多次时以第一次为准。
+    """
+
+    def __init__(self, patterns: Union[Mapping[str, V], Iterable[Tuple[str, V]]]):
+        items = patterns.items() if isinstance(patterns, Mapping) else patterns
+
+        # 节点用下标表示：转移表、失败指针、以该节点结尾的词的长度和值、输出链接
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._length: List[int] = [0]
+        self._value: List[Optional[V]] = [None]
+        self._output: List[int] = [0]
+
+        for word, value in items:
+            self._add(word, value)
+        self._build_links()
+
+    def _add(self, word: str, value: V):
+        """插入一个词"""
+        if not word:
+            return
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._length.append(0)
+                self._value.append(None)
+                self._output.append(0)
+            node = next_node
+        if not self._length[node]:
+            self._length[node] = len(word)
+            self._value[node] = value
+
+    def _build_links(self):
+        """按层次遍历计算失败指针；输出链接指向失败链上最近的词尾节点"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._output[child] = fail if self._length[fail] else self._output[fail]
+
+    def __len__(self) -> int:
+        return sum(1 for length in self._length if length)
+
+    def iter_matches(self, text: str) -> Iterator[Match]:
+        """一次扫描返回所有（可能重叠的）匹配，按结束位置升序"""
+        goto, fail, length, value, output = self._goto, self._fail, self._length, self._value, self._output
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match = node if length[node] else output[node]
+            while match:
+                yield end - length[match], end, value[match]
+                match = output[match]
+
+    def leftmost_longest(self, text: str) -> List[Match]:
+        """互不重叠的匹配：从左到右，每处取起点最靠左、同起点最长的词"""
+        longest: Dict[int, Tuple[int, V]] = {}
+        for start, end, value in self.iter_matches(text):
+            if end > longest.get(start, (0, None))[0]:
+                longest[start] = (end, value)
+
+        matches = []
+        position = 0
+        for start in sorted(longest):
+            if start >= position:
+                end, value = longest[start]
+                matches.append((start, end, value))
+                position = end
+        return matches
+
+    def min_value(self, *texts: str) -> Optional[V]:
+        """各文本中所有（可能重叠的）匹配里最小的值，没有匹配时返回 None
+
+        值为词在词典中的序号（或以序号开头的元组）时，得到的是词典中最靠前的、出现在任一文本中的词，
+        与按词典顺序逐个 `word in text` 的结果相同。
+        """
+        best: Optional[V] = None
+        for text in texts:
+            for _, _, value in self.iter_matches(text):
+                if best is None or value < best:
+                    best = value
+        return best
+
+    def replace(self, text: str) -> str:
+        """把最左最长的每个匹配替换为对应的值（值必须是字符串）"""
+        parts = []
+        position = 0
+        for start, end, value in self.leftmost_longest(text):
+            parts.append(text[position:start])
+            parts.append(value)
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel 导入性能基准测试
+按列解析、流式读取、增量导入和目录批量导入的耗时与峰值内存
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import pandas as pd
+
+from excel_data_loader import ExcelDataLoader
+from reference_utils import read_sheet_rows
+
+
+def run_excel_ingest_benchmark(rows: List[int] = (2_377, 500_000), legacy_max_rows: int = 50_000):
+    """Excel 解析：逐行 iterrows + _parse_row_to_hotel 与按列 parse_dataframe 的对比
+
+    把自带的表格在内存中复制到指定行数（不含读取 xlsx 的耗时）；
+    逐行解析超过 legacy_max_rows 行时耗时过长，只测按列解析。
+    """
+    print("\n\n📥 Excel 解析基准测试")
+    print("=" * 70)
+
+    loader = ExcelDataLoader()
+    try:
+        sheet = pd.read_excel(loader.excel_file, engine='openpyxl')
+    except FileNotFoundError:
+        print(f"❌ Excel文件未找到: {loader.excel_file}")
+        return
+
+    for target in rows:
+        # 复制出的行使用不同的酒店名称和地址，避免按不同取值去重的列运算因重复数据而显得更快
+        copies = []
+        for copy_no in range(-(-target // len(sheet))):
+            copy = sheet.copy()
+            if copy_no:
+                for col in ('酒店名称(中)', '酒店名称(英)', '酒店详细地址'):
+                    copy[col] = copy[col].astype(str) + f" {copy_no}"
+            copies.append(copy)
+        df = pd.concat(copies, ignore_index=True).iloc[:target]
+
+        start = time.perf_counter()
+        hotels = loader.parse_dataframe(df)
+        columnar_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loader.parse_dataframe(df, keep_original_data=False)
+        lean_seconds = time.perf_counter() - start
+
+        if target <= legacy_max_rows:
+            start = time.perf_counter()
+            legacy = [loader._parse_row_to_hotel(row, index) for index, row in df.iterrows()]
+            legacy_text = f"{time.perf_counter() - start:7.2f}秒"
+            assert len(legacy) == len(hotels)
+        else:
+            legacy_text = "   (跳过)"
+
+        print(f"  {len(df):>9,} 行: 逐行 {legacy_text} | 按列 {columnar_seconds:6.2f}秒 "
+              f"| 按列且不保留原始数据 {lean_seconds:6.2f}秒")
+
+
+def _excel_to_json(mode: str, excel_path: str, json_path: str):
+    """子进程入口：把 Excel 转成 JSON，把耗时和峰值 RSS 以 JSON 打印到最后一行
+
+    dataframe 为 load_excel_data 读入整张表后保存，stream 为只读模式逐行解析、边解析边写出。
+    """
+    import resource
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    loader = ExcelDataLoader(excel_path)
+    start = time.perf_counter()
+    if mode == 'dataframe':
+        loader.save_to_json(loader.load_excel_data(), json_path)
+    else:
+        loader.save_to_json(loader.iter_excel_hotels(keep_original_data=False), json_path)
+    # ru_maxrss 在 Linux 上以 kB 为单位
+    print(json.dumps({'seconds': time.perf_counter() - start, 'baseline': baseline * 1024,
+                      'peak': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}))
+
+
+def write_scaled_workbook(path: str, header: tuple, data: List[tuple], scale: int, edited_rows: int = 0):
+    """把数据行复制 scale 份写成 xlsx（复制出的行使用不同的名称和地址），前 edited_rows 行的名称加上修改标记"""
+    import openpyxl
+
+    renamed = [header.index(col) for col in ('酒店名称(中)', '酒店名称(英)', '酒店详细地址')]
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    row_no = 0
+    for copy_no in range(scale):
+        for row in data:
+            if copy_no or row_no < edited_rows:
+                row = list(row)
+                for position in renamed:
+                    row[position] = f"{row[position]} {copy_no}"
+                if row_no < edited_rows:
+                    row[renamed[0]] += "（已修改）"
+            sheet.append(row)
+            row_no += 1
+    workbook.save(path)
+
+
+def run_streaming_ingest_benchmark(scales: List[int] = (1, 10, 40)):
+    """Excel 转 JSON：pandas 读入整张表 与 openpyxl 只读模式流式解析 的耗时和峰值内存
+
+    把自带的表格复制 scale 份写成新的 xlsx，每种方式在新的 Python 进程中测量，
+    峰值 RSS 扣除导入模块后的基线。
+    """
+    print("\n\n🌊 流式 Excel 读取基准测试")
+    print("=" * 70)
+
+    loader = ExcelDataLoader()
+    if not os.path.exists(loader.excel_file):
+        print(f"❌ Excel文件未找到: {loader.excel_file}")
+        return
+    header, data = read_sheet_rows(loader.excel_file)
+
+    with tempfile.TemporaryDirectory(prefix='hotel_excel_') as workdir:
+        for scale in scales:
+            excel_path = os.path.join(workdir, f'hotels_{scale}.xlsx')
+            write_scaled_workbook(excel_path, header, data, scale)
+
+            print(f"\n  {len(data) * scale:,} 行（xlsx {os.path.getsize(excel_path) / 2 ** 20:.1f}MB）:")
+            for mode in ('dataframe', 'stream'):
+                json_path = os.path.join(workdir, f'hotels_{scale}_{mode}.json')
+                output = subprocess.run(
+                    [sys.executable, '-c',
+                     f"import benchmark_ingest; benchmark_ingest._excel_to_json({mode!r}, {excel_path!r}, {json_path!r})"],
+                    capture_output=True, text=True, check=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"    {mode:<9} {result['seconds']:6.2f}秒 | "
+                      f"峰值内存增长 {(result['peak'] - result['baseline']) / 2 ** 20:7.1f}MB")
+
+
+def run_incremental_ingest_benchmark(scales: List[int] = (1, 10), edited_rows: int = 10):
+    """增量导入：首次全量、文件未变化、修改 edited_rows 行后重新导入 的耗时"""
+    from incremental_ingest import IncrementalIngest
+
+    print("\n\n🔁 增量导入基准测试")
+    print("=" * 70)
+
+    loader = ExcelDataLoader()
+    if not os.path.exists(loader.excel_file):
+        print(f"❌ Excel文件未找到: {loader.excel_file}")
+        return
+    header, data = read_sheet_rows(loader.excel_file)
+
+    with tempfile.TemporaryDirectory(prefix='hotel_incremental_') as workdir:
+        for scale in scales:
+            excel_path = os.path.join(workdir, f'hotels_{scale}.xlsx')
+            json_path = os.path.join(workdir, f'hotels_{scale}.json')
+            write_scaled_workbook(excel_path, header, data, scale)
+            ingest = IncrementalIngest(ExcelDataLoader(excel_path), json_path)
+            full = ingest.run()
+            unchanged = ingest.run()
+            write_scaled_workbook(excel_path, header, data, scale, edited_rows)
+            edited = ingest.run()
+
+            # 只读取工作表、不解析的耗时：增量导入无法省掉的部分
+            start = time.perf_counter()
+            for _ in ingest.loader.iter_excel_rows():
+                pass
+            scan_seconds = time.perf_counter() - start
+
+            print(f"  {len(data) * scale:>7,} 行: 全量 {full.seconds:6.2f}秒 | 文件未变化 {unchanged.seconds * 1000:5.0f}毫秒 | "
+                  f"修改 {len(edited.changed)} 行 {edited.seconds:6.2f}秒（其中读取工作表 {scan_seconds:5.2f}秒）")
+
+
+def run_directory_ingest_benchmark(files: int = 8, worker_counts: List[int] = (1, 2, 4)):
+    """目录批量导入：同一目录下 files 个 xlsx 在不同进程数下的总耗时（受 CPU 核数限制）"""
+    import shutil
+    from excel_ingest import ingest_directory
+
+    print("\n\n🗂️ 目录批量导入基准测试")
+    print("=" * 70)
+
+    source = ExcelDataLoader().excel_file
+    if not os.path.exists(source):
+        print(f"❌ Excel文件未找到: {source}")
+        return
+
+    with tempfile.TemporaryDirectory(prefix='hotel_excel_dir_') as workdir:
+        for file_no in range(files):
+            shutil.copy(source, os.path.join(workdir, f'region_{file_no:02d}.xlsx'))
+        print(f"  {files} 个文件, CPU 核数 {os.cpu_count()}")
+
+        baseline = None
+        for workers in worker_counts:
+            report = ingest_directory(workdir, workers)
+            baseline = baseline or report.seconds
+            print(f"    {workers} 个进程: {report.seconds:6.2f}秒 | 加速比 {baseline / report.seconds:4.2f}x | "
+                  f"{len(report.hotels):,} 家酒店")
+
+
+if __name__ == "__main__":
+    run_excel_ingest_benchmark()
+    run_streaming_ingest_benchmark()
+    run_incremental_ingest_benchmark()
+    run_directory_ingest_benchmark()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP服务器性能基准测试
+多个并发客户端混合发送建议（逐键）和搜索请求，对比各服务模式的吞吐量和延迟分位数
+"""
+
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import quote
+
+from hotel_dataset import HotelDatasetHolder
+from negative_cache import NegativePrefixCache
+from prefork_server import PreforkSupervisor
+from response_cache import DEFAULT_CACHE_SIZE, ResponseCache
+from simple_server import SERVER_MODES, HotelSearchApi, HotelSearchHandler, create_server
+
+SUGGEST_QUERIES = ["东京", "新宿", "秋叶原", "tokyo", "shinjuku", "akihabara", "华盛顿", "上野"]
+SEARCH_QUERIES = ["酒店", "hotel", "东京", "inn"]
+
+# 请求中搜索请求的比例
+SEARCH_RATIO = 0.1
+
+
+class QuietHandler(HotelSearchHandler):
+    """不打印访问日志的处理器"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_scaled_dataset(scale: int) -> Tuple[str, int]:
+    """把 excel_hotels.json 复制 scale 倍写入临时文件，返回 (文件路径, 酒店数)"""
+    with open('data/excel_hotels.json', 'r', encoding='utf-8') as f:
+        hotels = json.load(f)['hotels']
+
+    scaled = []
+    for copy_no in range(scale):
+        for hotel in hotels:
+            if copy_no:
+                hotel = {**hotel,
+                         'hotel_id': f"{hotel['hotel_id']}_{copy_no}",
+                         'hotel_name_cn': f"{hotel['hotel_name_cn']}{copy_no}",
+                         'hotel_name_en': f"{hotel['hotel_name_en']} {copy_no}"}
+            scaled.append(hotel)
+
+    fd, path = tempfile.mkstemp(suffix='.json', prefix='hotels_')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'hotels': scaled}, f, ensure_ascii=False)
+    return path, len(scaled)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """分位数（最近秩）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_load(port: int, clients: int, duration: float, seed: int = 0) -> Dict[str, List[float]]:
+    """并发客户端持续发送请求，返回各接口的延迟（毫秒）"""
+    latencies: Dict[str, List[float]] = {'suggest': [], 'search': []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(client_no: int):
+        rnd = random.Random(seed * 1000 + client_no)
+        local = {'suggest': [], 'search': []}
+        while time.perf_counter() < deadline:
+            if rnd.random() < SEARCH_RATIO:
+                # 加随机后缀保证每次搜索都是一次完整扫描，不会命中响应缓存
+                endpoint, query = 'search', f"{rnd.choice(SEARCH_QUERIES)}{rnd.randrange(10 ** 9)}"
+            else:
+                word = rnd.choice(SUGGEST_QUERIES)
+                endpoint, query = 'suggest', word[:rnd.randint(1, len(word))]
+
+            start = time.perf_counter()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            try:
+                conn.request('GET', f'/api/{endpoint}?q={quote(query)}')
+                conn.getresponse().read()
+            finally:
+                conn.close()
+            local[endpoint].append((time.perf_counter() - start) * 1000)
+
+        with lock:
+            for endpoint, values in local.items():
+                latencies[endpoint].extend(values)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def serve_in_process(mode: str, data_file: str, cache_size: int, ports):
+    """子进程入口：加载数据并按指定模式提供服务，监听端口通过队列告知父进程
+
+    服务器与压测客户端放在不同进程，客户端线程不会与服务器争用同一个 GIL。
+    """
+    holder = HotelDatasetHolder(data_file, check_interval=0)
+    holder.start()
+    api = HotelSearchApi(holder, ResponseCache(cache_size), negative_cache=NegativePrefixCache(0))
+    server = create_server(mode, ('127.0.0.1', 0), api, handler_class=QuietHandler)
+    ports.put(server.server_address[1])
+    with server:
+        server.serve_forever()
+
+
+def run_server_mode_benchmark(clients: int = 16, duration: float = 3.0, scale: int = 4):
+    """各服务模式在并发客户端下的吞吐量与 p50 / p99 延迟
+
+    两种场景：关闭响应缓存时每个请求都是一次完整扫描；开启响应缓存时热门建议前缀直接命中缓存，
+    只有搜索需要扫描，此时单线程服务器中廉价的建议请求会排在慢搜索之后。
+    """
+    print("\n\n🧵 服务模式并发基准测试")
+    print("=" * 70)
+
+    data_file, hotel_count = write_scaled_dataset(scale)
+    try:
+        print(f"  {hotel_count:,} 家酒店, {clients} 个并发客户端, 每种模式 {duration:.0f} 秒, "
+              f"搜索请求占 {SEARCH_RATIO:.0%}（搜索每次都是完整扫描）")
+
+        for label, cache_size in (("关闭响应缓存", 0), ("开启响应缓存", DEFAULT_CACHE_SIZE)):
+            print(f"\n  {label}:")
+            for mode in SERVER_MODES:
+                ports = multiprocessing.Queue()
+                process = multiprocessing.Process(target=serve_in_process,
+                                                  args=(mode, data_file, cache_size, ports), daemon=True)
+                process.start()
+                try:
+                    latencies = run_load(ports.get(timeout=60), clients, duration)
+                finally:
+                    process.terminate()
+                    process.join()
+
+                total = sum(len(values) for values in latencies.values())
+                print(f"    {mode:<9} {total / duration:7.0f} 请求/秒 | "
+                      f"建议 p50 {percentile(latencies['suggest'], 0.5):6.1f}毫秒 "
+                      f"p99 {percentile(latencies['suggest'], 0.99):7.1f}毫秒 | "
+                      f"搜索 p50 {percentile(latencies['search'], 0.5):6.1f}毫秒 "
+                      f"p99 {percentile(latencies['search'], 0.99):7.1f}毫秒")
+    finally:
+        os.unlink(data_file)
+
+def run_prefork_benchmark(worker_counts: List[int] = (1, 2, 4), clients: int = 16,
+                          duration: float = 3.0, scale: int = 4):
+    """prefork 模式：不同工作进程数下的总 QPS、p99 延迟以及每个工作进程的内存"""
+    print("\n\n🍴 prefork 多进程基准测试")
+    print("=" * 70)
+
+    data_file, hotel_count = write_scaled_dataset(scale)
+    try:
+        # 数据只在本进程加载一次，工作进程 fork 后共享；压测客户端线程在工作进程之外
+        holder = HotelDatasetHolder(data_file, check_interval=0)
+        holder.start()
+        print(f"  {hotel_count:,} 家酒店, {clients} 个并发客户端, 每组 {duration:.0f} 秒, "
+              f"CPU 核数 {os.cpu_count()}（关闭响应缓存和负缓存）")
+
+        for workers in worker_counts:
+            api = HotelSearchApi(holder, ResponseCache(0), negative_cache=NegativePrefixCache(0))
+            supervisor = PreforkSupervisor(('127.0.0.1', 0), api, workers,
+                                           handler_class=QuietHandler, report_interval=0)
+            thread = threading.Thread(target=supervisor.serve_forever, daemon=True)
+            thread.start()
+            try:
+                while len(supervisor.worker_pids()) < workers:
+                    time.sleep(0.05)
+                latencies = run_load(supervisor.server_address[1], clients, duration)
+                served = supervisor.total_requests()
+                memory = supervisor.memory_report()
+            finally:
+                supervisor.shutdown()
+                thread.join()
+                supervisor.server_close()
+
+            suggest = latencies['suggest']
+            print(f"  {workers} 个工作进程: {served / duration:7.0f} 请求/秒 | "
+                  f"建议 p50 {percentile(suggest, 0.5):6.1f}毫秒 p99 {percentile(suggest, 0.99):7.1f}毫秒")
+            for item in memory:
+                private = item.get('Private_Clean', 0) + item.get('Private_Dirty', 0)
+                print(f"      pid {item['pid']}: RSS {item.get('Rss', 0) / 2 ** 20:6.1f}MB | "
+                      f"PSS {item.get('Pss', 0) / 2 ** 20:6.1f}MB | 私有 {private / 2 ** 20:6.1f}MB")
+    finally:
+        os.unlink(data_file)
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    run_server_mode_benchmark(clients=clients)
+    run_prefork_benchmark(clients=clients)
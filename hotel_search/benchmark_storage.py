@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+存储与统计性能基准测试
+列式酒店表的内存、统计接口的耗时，以及各种数据来源的冷启动耗时
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import List
+
+import pandas as pd
+
+from benchmark_suggest import BENCHMARK_QUERIES, scale_hotels
+from excel_data_loader import ExcelDataLoader, ExcelHotelData
+from hotel_store import HotelStore
+from test_excel_hotels import ExcelHotelSearchSystem
+
+
+def _deep_size(obj, seen: set) -> int:
+    """对象及其引用的字典、列表、数据类字段的内存（字节），同一对象只计一次"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(key, seen) + _deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += _deep_size(vars(obj), seen)
+    return size
+
+
+def run_hotel_table_memory_benchmark(sizes: List[int] = (100_000, 500_000)):
+    """每家酒店的内存：数据类对象列表 + HotelStore 与列式 HotelTable 的对比
+
+    酒店先序列化为 JSON 再读回，与从数据文件加载时一样每条记录持有各自的字符串对象。
+    """
+    from hotel_table import HotelTable
+
+    print("\n\n🧮 酒店表内存基准测试")
+    print("=" * 70)
+
+    loader = ExcelDataLoader()
+    with open('data/excel_hotels.json', 'r', encoding='utf-8') as f:
+        base = [ExcelHotelData(**hotel) for hotel in json.load(f)['hotels']]
+
+    for size in sizes:
+        dicts = json.loads(json.dumps([loader._hotel_to_dict(hotel) for hotel in scale_hotels(base, size)],
+                                      ensure_ascii=False))
+        records = [ExcelHotelData(**hotel) for hotel in dicts]
+        del dicts
+        store = HotelStore(records)
+        seen = set()
+        record_bytes = _deep_size(records, seen)
+        store_bytes = record_bytes + _deep_size(store._doc_ids, seen)
+
+        start = time.perf_counter()
+        table = HotelTable.from_records(records, ExcelHotelData)
+        build_seconds = time.perf_counter() - start
+        report = table.memory_bytes()
+        table_bytes = sum(report.values()) + sys.getsizeof(table)
+
+        # 纯文本负载：各字符串字段的 UTF-8 字节数
+        text_bytes = sum(len(value.encode('utf-8')) for record in records for value in vars(record).values()
+                         if isinstance(value, str))
+
+        print(f"  {size:>9,} 家酒店（文本负载 {text_bytes / size:5.0f} 字节/家）:")
+        print(f"    数据类 + HotelStore {store_bytes / size:7.0f} 字节/家 | "
+              f"HotelTable {table_bytes / size:7.0f} 字节/家 ({table_bytes / store_bytes:.0%}) | "
+              f"建表 {build_seconds:.2f}秒")
+        top = sorted(report.items(), key=lambda item: -item[1])[:5]
+        print("    HotelTable 最大的列: " + ", ".join(f"{name} {value / size:.0f}" for name, value in top))
+        del records, store, table
+
+    # Excel 解析结果默认保存每行的原始数据字典
+    try:
+        sheet = pd.read_excel(loader.excel_file, engine='openpyxl')
+    except FileNotFoundError:
+        return
+    with_original = loader.parse_dataframe(sheet)
+    print(f"  Excel 解析结果（含 original_data）: "
+          f"{_deep_size(with_original, set()) / len(with_original):7.0f} 字节/家")
+
+
+def run_stats_benchmark(sizes: List[int] = (100_000, 1_000_000), repeat: int = 5):
+    """统计接口：逐个酒店字典计数 与 对快照中字典编码列一次 bincount 的耗时"""
+    from hotel_dataset import CATEGORY_DEFAULTS
+    from hotel_table import categorical_columns
+    from simple_server import HotelSearchApi
+
+    print("\n\n📊 统计基准测试")
+    print("=" * 70)
+
+    with open('data/excel_hotels.json', 'r', encoding='utf-8') as f:
+        base = json.load(f)['hotels']
+    api = HotelSearchApi.__new__(HotelSearchApi)
+
+    for size in sizes:
+        hotels = [{**hotel, 'hotel_id': f"{hotel['hotel_id']}_{copy_no}"}
+                  for copy_no in range(-(-size // len(base))) for hotel in base][:size]
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            cities, regions = defaultdict(int), defaultdict(int)
+            for hotel in hotels:
+                cities[hotel.get('city_name_cn', '未知城市')] += 1
+                regions[hotel.get('region_name', '未知区域')] += 1
+            sorted(cities.items(), key=lambda item: item[1], reverse=True)[:10]
+            sorted(regions.items(), key=lambda item: item[1], reverse=True)[:10]
+        dict_seconds = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        categories = categorical_columns(hotels, CATEGORY_DEFAULTS)
+        encode_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            api.calculate_stats(hotels, categories)
+        bincount_seconds = (time.perf_counter() - start) / repeat
+
+        print(f"  {size:>9,} 家酒店: 字典计数 {dict_seconds * 1000:8.1f}毫秒 | "
+              f"bincount {bincount_seconds * 1000:6.2f}毫秒 | 加载时编码 {encode_seconds * 1000:7.1f}毫秒")
+
+
+def _cold_start(mode: str, path: str):
+    """子进程入口：按 mode 创建 ExcelHotelSearchSystem 并执行第一次查询，把耗时和内存以 JSON 打印到最后一行"""
+    from prefork_server import process_memory
+
+    start = time.perf_counter()
+    if mode == 'xlsx':
+        system = ExcelHotelSearchSystem()
+    elif mode == 'json':
+        with open(path, 'r', encoding='utf-8') as f:
+            system = ExcelHotelSearchSystem([ExcelHotelData(**hotel) for hotel in json.load(f)['hotels']])
+    else:
+        system = ExcelHotelSearchSystem.from_index_file(path)
+    ready = time.perf_counter()
+    system.suggest(BENCHMARK_QUERIES[0])
+    system.complete(BENCHMARK_QUERIES[3])
+    done = time.perf_counter()
+    print(json.dumps({'open': ready - start, 'first_query': done - ready,
+                      'rss': process_memory(os.getpid()).get('Rss', 0)}))
+
+
+def run_cold_start_benchmark(scales: List[int] = (1, 10)):
+    """冷启动：读取 Excel / 读取 JSON 后重建索引 与 mmap 打开二进制索引文件，到第一次查询完成的耗时
+
+    每种方式在新的 Python 进程中测量（不含模块导入）。
+    """
+    print("\n\n🧊 冷启动基准测试")
+    print("=" * 70)
+
+    with open('data/excel_hotels.json', 'r', encoding='utf-8') as f:
+        base = [ExcelHotelData(**hotel) for hotel in json.load(f)['hotels']]
+
+    with tempfile.TemporaryDirectory(prefix='hotel_index_') as workdir:
+        for scale in scales:
+            hotels = scale_hotels(base, len(base) * scale)
+            json_path = os.path.join(workdir, f'hotels_{scale}.json')
+            ExcelDataLoader().save_to_json(hotels, json_path)
+            index_path = os.path.join(workdir, f'hotels_{scale}.idx')
+            start = time.perf_counter()
+            size = ExcelHotelSearchSystem(hotels).save_index_file(index_path)
+            build_seconds = time.perf_counter() - start
+
+            print(f"\n  {len(hotels):,} 家酒店（离线构建并写入索引文件 {build_seconds:.1f}秒, {size / 2 ** 20:.1f}MB）:")
+            modes = [('xlsx', None)] if scale == 1 else []
+            modes += [('json', json_path), ('mmap', index_path)]
+            for mode, path in modes:
+                output = subprocess.run(
+                    [sys.executable, '-c', f"import benchmark_storage; benchmark_storage._cold_start({mode!r}, {path!r})"],
+                    capture_output=True, text=True, check=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"    {mode:<5} 启动 {result['open'] * 1000:8.1f}毫秒 | 首次查询 {result['first_query'] * 1000:6.1f}毫秒 | "
+                      f"RSS {result['rss'] / 2 ** 20:6.1f}MB")
+
+
+if __name__ == "__main__":
+    run_hotel_table_memory_benchmark()
+    run_stats_benchmark()
+    run_cold_start_benchmark()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+建议搜索性能基准测试
+把 excel_hotels.json 放大到 10万 / 100万 家酒店，对比索引查找的耗时
+"""
+
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+from typing import List
+
+from aho_corasick import AhoCorasickMatcher
+from bk_tree import BKTree, FALLBACK_NODE_BUDGET, fallback_distance
+from completion_trie import build_completion_trie
+from data_loader import DataLoader, HotelData
+from deletion_index import DeletionIndex
+from excel_data_loader import ExcelDataLoader
+from reference_utils import build_suggest_index, linear_matching_keys, matrix_edit_distance, reference_suggest_score
+from suggest_index import SortedPrefixIndex
+from test_excel_hotels import ExcelHotelSearchSystem, QueryNormalizer
+from score_features import rank_candidates
+from string_compute_utils import StringComputeUtils
+
+BENCHMARK_QUERIES = ["东京", "新宿", "秋叶原", "tokyo", "shinjuku", "akihabara",
+                     "华盛顿", "Washington", "MYSTAYS", "三井花园", "xqz", "上野"]
+
+
+def load_base_hotels() -> List[HotelData]:
+    """加载Excel导出的基础酒店数据"""
+    return DataLoader().load_hotel_data("excel_hotels.json")
+
+
+def scale_hotels(hotels: List[HotelData], target: int) -> List[HotelData]:
+    """复制基础数据直到达到目标规模，复制出的酒店使用不同的ID和名称"""
+    scaled = []
+    copy_no = 0
+    while len(scaled) < target:
+        for hotel in hotels:
+            if len(scaled) >= target:
+                break
+            if copy_no == 0:
+                scaled.append(hotel)
+                continue
+            scaled.append(replace(
+                hotel,
+                hotel_id=f"{hotel.hotel_id}_{copy_no}",
+                hotel_name_cn=f"{hotel.hotel_name_cn}{copy_no}",
+                hotel_name_en=f"{hotel.hotel_name_en} {copy_no}"
+            ))
+        copy_no += 1
+    return scaled
+
+
+def _time_per_query(func, queries: List[str], repeat: int) -> float:
+    """返回平均每次查询的毫秒数"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - start) / (repeat * len(queries)) * 1000
+
+
+def run_prefix_lookup_benchmark(sizes: List[int] = (100_000, 1_000_000)):
+    """对比线性扫描与排序前缀索引的查找耗时"""
+    print("⚡ 建议索引前缀查找基准测试")
+    print("=" * 70)
+
+    base_hotels = load_base_hotels()
+    if not base_hotels:
+        print("❌ 无法加载酒店数据，基准测试终止")
+        return
+
+    normalizer = QueryNormalizer()
+    queries = sorted({q for query in BENCHMARK_QUERIES for q in normalizer.normalize(query, False)})
+
+    for size in sizes:
+        hotels = scale_hotels(base_hotels, size)
+
+        start = time.perf_counter()
+        suggest_index = build_suggest_index(hotels, normalizer)
+        index_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        prefix_index = SortedPrefixIndex(suggest_index)
+        sort_time = time.perf_counter() - start
+
+        # 结果一致性检查
+        for query in queries:
+            assert prefix_index.matching_keys(query) == linear_matching_keys(suggest_index, query), query
+
+        linear_ms = _time_per_query(lambda q: linear_matching_keys(suggest_index, q), queries, 1)
+        bisect_ms = _time_per_query(prefix_index.matching_keys, queries, 20)
+
+        print(f"\n📊 酒店数: {len(hotels):,} | 索引键数: {len(prefix_index):,}")
+        print(f"  构建索引: {index_time:.2f}秒 | 排序词面: {sort_time:.2f}秒")
+        print(f"  线性扫描: {linear_ms:.3f}毫秒/查询")
+        print(f"  二分查找: {bisect_ms:.3f}毫秒/查询")
+        print(f"  加速比: {linear_ms / bisect_ms:.0f}x")
+
+
+def run_completion_benchmark(sizes: List[int] = (100_000,)):
+    """对比补全前缀树与“收集全部候选再按热度排序”的短前缀查询耗时"""
+    print("\n\n⚡ 补全前缀树基准测试")
+    print("=" * 70)
+
+    base_hotels = load_base_hotels()
+    if not base_hotels:
+        print("❌ 无法加载酒店数据，基准测试终止")
+        return
+
+    normalizer = QueryNormalizer()
+    short_prefixes = ["东", "新", "to", "sh", "东京", "tokyo"]
+
+    for size in sizes:
+        hotels = scale_hotels(base_hotels, size)
+        suggest_index = build_suggest_index(hotels, normalizer)
+        prefix_index = SortedPrefixIndex(suggest_index)
+
+        start = time.perf_counter()
+        trie = build_completion_trie(hotels, normalizer)
+        build_time = time.perf_counter() - start
+
+        def collect_and_sort(prefix: str) -> List[HotelData]:
+            candidates = {}
+            for key in prefix_index.keys_with_prefix(prefix):
+                for hotel in suggest_index[key]:
+                    candidates[hotel.hotel_id] = hotel
+            return sorted(candidates.values(), key=lambda h: h.search_count, reverse=True)[:10]
+
+        collect_ms = _time_per_query(collect_and_sort, short_prefixes, 1)
+        trie_ms = _time_per_query(lambda q: trie.lookup(q, 10), short_prefixes, 100)
+
+        print(f"\n📊 酒店数: {len(hotels):,}")
+        print(f"  构建前缀树: {build_time:.2f}秒")
+        print(f"  收集候选并排序: {collect_ms:.3f}毫秒/查询")
+        print(f"  前缀树 top-k: {trie_ms:.4f}毫秒/查询")
+
+
+def run_topk_pruning_benchmark(sizes: List[int] = (2_377, 20_000)):
+    """对比全量打分排序与“静态特征向量化 + 堆 top-k + 上界剪枝”的打分次数和耗时"""
+    print("\n\n⚡ Top-K 上界剪枝基准测试")
+    print("=" * 70)
+
+    base_hotels = load_base_hotels()
+    if not base_hotels:
+        print("❌ 无法加载酒店数据，基准测试终止")
+        return
+
+    broad_queries = ["东京", "tokyo", "Tokyo", "新宿", "shinjuku"]
+
+    for size in sizes:
+        system = ExcelHotelSearchSystem(scale_hotels(base_hotels, size))
+        store = system.store
+        print(f"\n📊 酒店数: {len(store):,}")
+
+        for query in broad_queries:
+            candidates = system._collect_candidates(query)
+            score = lambda doc_id: reference_suggest_score(system, store[doc_id], query)
+
+            start = time.perf_counter()
+            scores = {doc_id: score(doc_id) for doc_id in candidates}
+            full = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:10]
+            full_ms = (time.perf_counter() - start) * 1000
+
+            stats = {}
+            start = time.perf_counter()
+            pruned = rank_candidates(
+                candidates, 10, system.static_features,
+                distance_score=lambda doc_id: system._distance_score(store[doc_id], query),
+                distance_upper_bound=lambda doc_id: system._distance_upper_bound(store[doc_id], query),
+                contain_boost=lambda doc_id: system._contain_boost(store[doc_id], query),
+                stats=stats
+            )
+            topk_ms = (time.perf_counter() - start) * 1000
+
+            assert pruned == full, query
+            print(f"  '{query}': 候选 {len(candidates):,} | 打分 {stats.get('scored', 0):,} | "
+                  f"全量排序 {full_ms:.1f}毫秒 | 堆+剪枝 {topk_ms:.1f}毫秒")
+
+
+def run_edit_distance_benchmark():
+    """按真实酒店名称长度对比矩阵动态规划、位并行编辑距离、带最大距离的提前停止以及 NumPy 批量计算"""
+    print("\n\n✏️ 编辑距离基准测试")
+    print("=" * 70)
+
+    hotels = load_base_hotels()
+    if not hotels:
+        print("❌ 无法加载酒店数据，基准测试终止")
+        return
+
+    fields = [field for hotel in hotels
+              for field in (hotel.hotel_name_cn, hotel.hotel_name_en,
+                            hotel.city_name_cn, hotel.city_name_en, hotel.region_name)
+              if field]
+    lengths = sorted(len(field) for field in fields)
+    print(f"📊 字段数: {len(fields):,} | 平均长度 {sum(lengths) / len(lengths):.1f} | "
+          f"中位数 {lengths[len(lengths) // 2]} | 最长 {lengths[-1]}")
+
+    queries = ["东京", "新宿", "shinjuku", "MYSTAYS", "三井花园酒店", "Tokyo Station Hotel"]
+    for query in queries:
+        start = time.perf_counter()
+        expected = [matrix_edit_distance(field, query) for field in fields]
+        matrix_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        actual = [StringComputeUtils.compute_levenshtein_distance(field, query) for field in fields]
+        bit_parallel_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for field in fields:
+            StringComputeUtils.compute_similarity(field, query, min_similarity=0.5)
+        bounded_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        batched = StringComputeUtils.batch_levenshtein_distance(query, fields).tolist()
+        batch_ms = (time.perf_counter() - start) * 1000
+
+        assert actual == expected and batched == expected, query
+        print(f"  '{query}': 矩阵DP {matrix_ms:.1f}毫秒 | 位并行 {bit_parallel_ms:.1f}毫秒 | "
+              f"相似度>0.5提前停止 {bounded_ms:.1f}毫秒 | NumPy批量 {batch_ms:.1f}毫秒 | "
+              f"加速 {matrix_ms / bit_parallel_ms:.1f}x / {matrix_ms / batch_ms:.1f}x")
+
+
+def run_deletion_index_benchmark(sizes: List[int] = (2_377, 1_000_000)):
+    """删除邻域索引的构建耗时、内存占用以及拼写纠错查询耗时"""
+    print("\n\n🔤 删除邻域索引（拼写纠错）基准测试")
+    print("=" * 70)
+
+    base_hotels = load_base_hotels()
+    if not base_hotels:
+        print("❌ 无法加载酒店数据，基准测试终止")
+        return
+
+    normalizer = QueryNormalizer()
+    typo_queries = ["shinjyuku", "akihabra", "秋叶元", "华盛屯", "tokio", "mystay", "三井花圆"]
+
+    for size in sizes:
+        surfaces = list(build_suggest_index(scale_hotels(base_hotels, size), normalizer))
+        print(f"\n📊 酒店数: {size:,} | 归一化词面: {len(surfaces):,}")
+
+        start = time.perf_counter()
+        index = DeletionIndex(surfaces)
+        build_s = time.perf_counter() - start
+        del index
+
+        tracemalloc.start()
+        index = DeletionIndex(surfaces)
+        memory_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+        tracemalloc.stop()
+
+        print(f"  构建: {build_s:.2f}秒 | 删除变体: {index.delete_count:,} | 内存: {memory_mb:.1f}MB")
+
+        for query in typo_queries:
+            lookup_ms = _time_per_query(index.lookup, [query], repeat=20)
+            matches = index.lookup(query)
+            print(f"  '{query}': {len(matches)} 个词面 | {lookup_ms:.3f}毫秒 | {matches[:3]}")
+
+
+def run_bk_tree_benchmark():
+    """BK 树兜底召回：构建耗时、每次查询耗时，以及节点预算截断的情况"""
+    print("\n\n🌳 BK 树兜底召回基准测试")
+    print("=" * 70)
+
+    base_hotels = load_base_hotels()
+    if not base_hotels:
+        print("❌ 无法加载酒店数据，基准测试终止")
+        return
+
+    names = list(build_suggest_index(base_hotels, QueryNormalizer()))
+    start = time.perf_counter()
+    tree = BKTree(names)
+    print(f"📊 名称数: {len(tree):,} | 构建: {time.perf_counter() - start:.2f}秒 | "
+          f"节点预算: {FALLBACK_NODE_BUDGET}")
+
+    for query in ["shinjyuku", "akihabra", "秋叶元", "mystay", "washingten", "三井花园酒"]:
+        distance = fallback_distance(query)
+        start = time.perf_counter()
+        full = tree.search(query, distance)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        budgeted = tree.search(query, distance, FALLBACK_NODE_BUDGET)
+        budget_ms = (time.perf_counter() - start) * 1000
+        truncated = "（预算截断）" if tree.last_search_truncated else ""
+
+        print(f"  '{query}' d={distance}: 无预算 {len(full)} 个 {full_ms:.2f}毫秒 | "
+              f"有预算 {len(budgeted)} 个 {budget_ms:.2f}毫秒{truncated} | {full[:3]}")
+
+
+def legacy_normalize(normalizer: QueryNormalizer, input_text: str, remove_stop_words: bool = True) -> set:
+    """原实现：逐个停用词 str.replace，逐字符比较检测文字种类"""
+    if not input_text:
+        return set()
+    cleaned = input_text.lower().strip()
+    if remove_stop_words:
+        for stop_word in normalizer.STOP_WORDS:
+            cleaned = cleaned.replace(stop_word.lower(), '')
+        cleaned = cleaned.strip()
+    result = {cleaned} if cleaned else set()
+    if any('\u4e00' <= char <= '\u9fff' for char in cleaned):
+        pinyin = normalizer.JAPAN_PINYIN_MAP.get(cleaned, '')
+        if pinyin:
+            result.add(pinyin)
+    if any(char.isalpha() and ord(char) < 128 for char in cleaned):
+        result.add(cleaned.lower())
+        if cleaned:
+            result.add(cleaned[0].upper() + cleaned[1:].lower())
+    return result
+
+
+def run_normalizer_benchmark():
+    """归一化器：建索引（所有字段）与查询侧（按键前缀）的耗时对比"""
+    print("\n\n🔄 查询归一化基准测试")
+    print("=" * 70)
+
+    hotels = load_base_hotels()
+    if not hotels:
+        print("❌ 无法加载酒店数据，基准测试终止")
+        return
+
+    fields = [field for hotel in hotels
+              for field in (hotel.hotel_name_cn, hotel.hotel_name_en,
+                            hotel.city_name_cn, hotel.city_name_en, hotel.region_name)]
+    keystrokes = [query[:i] for query in BENCHMARK_QUERIES for i in range(1, len(query) + 1)] * 20
+    normalizer = QueryNormalizer()
+
+    for label, texts, remove_stop_words in (("建索引", fields, True), ("查询按键", keystrokes, False)):
+        start = time.perf_counter()
+        for text in texts:
+            legacy_normalize(normalizer, text, remove_stop_words)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for text in texts:
+            normalizer._normalize(text, remove_stop_words)
+        compiled_ms = (time.perf_counter() - start) * 1000
+
+        normalizer = QueryNormalizer()
+        start = time.perf_counter()
+        for text in texts:
+            normalizer.normalize(text, remove_stop_words)
+        cached_ms = (time.perf_counter() - start) * 1000
+
+        print(f"  {label} {len(texts):,} 次: 逐个replace {legacy_ms:.1f}毫秒 | 单次正则 {compiled_ms:.1f}毫秒 | "
+              f"加LRU缓存 {cached_ms:.1f}毫秒")
+
+
+def run_enrichment_benchmark(extra_entries: List[int] = (0, 10_000)):
+    """数据补全：逐词 str.replace / in 扫描 与 Aho–Corasick 单次扫描的对比"""
+    print("\n\n📚 数据补全词典匹配基准测试")
+    print("=" * 70)
+
+    hotels = load_base_hotels()
+    if not hotels:
+        print("❌ 无法加载酒店数据，基准测试终止")
+        return
+
+    texts = [text for hotel in hotels for text in (hotel.hotel_name_cn, hotel.address)]
+    for extra in extra_entries:
+        # 用不会命中的合成词条扩充词典，观察耗时随词典大小的变化
+        translations = dict(ExcelDataLoader.NAME_TRANSLATIONS)
+        translations.update((f"合成词条{i}号", f"Synthetic{i}") for i in range(extra))
+        matcher = AhoCorasickMatcher(translations)
+
+        start = time.perf_counter()
+        for text in texts:
+            result = text
+            for cn, en in translations.items():
+                result = result.replace(cn, en)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for text in texts:
+            matcher.replace(text)
+        matcher_ms = (time.perf_counter() - start) * 1000
+
+        print(f"  词典 {len(translations):,} 条, {len(texts):,} 个字符串: 逐词replace {legacy_ms:.1f}毫秒 | "
+              f"Aho–Corasick {matcher_ms:.1f}毫秒")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    run_prefix_lookup_benchmark(sizes)
+    run_completion_benchmark(sizes)
+    run_topk_pruning_benchmark()
+    run_edit_distance_benchmark()
+    run_deletion_index_benchmark()
+    run_bk_tree_benchmark()
+    run_normalizer_benchmark()
+    run_enrichment_benchmark()
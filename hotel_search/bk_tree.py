@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BK 树
+以编辑距离为度量组织归一化后的酒店、城市、区域名称，查询“距离不超过 d 的所有名称”时
+利用三角不等式只进入边距离落在 [dist - d, dist + d] 内的子树
+"""
+
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from string_compute_utils import StringComputeUtils
+
+# 建议搜索兜底召回每次 search 最多计算编辑距离的节点数（约 10 毫秒），
+# 按节点数而不是时间截断，召回结果不受机器负载影响
+FALLBACK_NODE_BUDGET = 1024
+
+# 兜底召回的时间上限（秒），只作为节点预算之外的安全上限，正常情况下不会触发
+FALLBACK_TIME_BUDGET = 0.1
+
+# 兜底召回允许的最大编辑距离
+MAX_FALLBACK_DISTANCE = 3
+
+# 每访问多少个节点检查一次时间
+_DEADLINE_CHECK_INTERVAL = 32
+
+
+def fallback_distance(query: str) -> int:
+    """兜底召回的编辑距离：每 3 个字符容忍 1 处，至多 MAX_FALLBACK_DISTANCE；不足 3 个字符不做兜底"""
+    return min(MAX_FALLBACK_DISTANCE, len(query) // 3)
+
+
+def _search_exhausted(visited: int, max_nodes: Optional[int], deadline: Optional[float]) -> bool:
+    """已访问 visited 个节点后是否应停止遍历"""
+    if max_nodes is not None and visited >= max_nodes:
+        return True
+    return deadline is not None and visited % _DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline
+
+
+class BKTables(NamedTuple):
+    """BK 树的全部数据（下标即节点插入顺序，0 为根节点），用于写入二进制索引文件"""
+    words: List[str]
+    max_edges: List[int]
+    # 每个节点的 [(边距离, 子节点编号), ...]
+    children: List[List[Tuple[int, int]]]
+
+
+class _BKNode:
+    """BK 树节点"""
+    __slots__ = ('word', 'order', 'children', 'max_edge')
+
+    def __init__(self, word: str, order: int):
+        self.word = word
+        # 插入顺序，用于同距离结果的稳定排序
+        self.order = order
+        # {到子节点的编辑距离: 子节点}
+        self.children: Dict[int, '_BKNode'] = {}
+        self.max_edge = 0
+
+
+class BKTreeBase(ABC):
+    """BK 树的只读查询接口，内存中的 BKTree 与 mmap 索引文件中的 MappedBKTree 查询结果完全一致
+
+    search 访问的节点数达到预算（或到达截止时间）后停止遍历并返回已找到的结果，用于限制兜底召回的尾延迟。
+    """
+
+    # 最近一次 search 是否因节点预算或超时提前结束
+    last_search_truncated = False
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """名称数量"""
+
+    @abstractmethod
+    def search(self, query: str, max_distance: int, max_nodes: Optional[int] = None,
+               deadline: Optional[float] = None) -> List[str]:
+        """返回与 query 编辑距离不超过 max_distance 的名称，按距离、插入顺序排列"""
+
+    @abstractmethod
+    def tables(self) -> BKTables:
+        """导出树结构"""
+
+
+class BKTree(BKTreeBase):
+    """编辑距离 BK 树"""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self._root: Optional[_BKNode] = None
+        self._size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, word: str):
+        """插入一个名称（重复或空名称忽略）"""
+        if not word:
+            return
+        if self._root is None:
+            self._root = _BKNode(word, self._size)
+            self._size += 1
+            return
+
+        node = self._root
+        while True:
+            distance = StringComputeUtils.compute_levenshtein_distance(word, node.word)
+            if distance == 0:
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(word, self._size)
+                node.max_edge = max(node.max_edge, distance)
+                self._size += 1
+                return
+            node = child
+
+    def tables(self) -> BKTables:
+        """导出树结构"""
+        words: List[str] = [''] * self._size
+        max_edges = [0] * self._size
+        children: List[List[Tuple[int, int]]] = [[] for _ in range(self._size)]
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            words[node.order] = node.word
+            max_edges[node.order] = node.max_edge
+            children[node.order] = [(edge, child.order) for edge, child in node.children.items()]
+            stack.extend(node.children.values())
+        return BKTables(words, max_edges, children)
+
+    def search(self, query: str, max_distance: int, max_nodes: Optional[int] = None,
+               deadline: Optional[float] = None) -> List[str]:
+        """返回与 query 编辑距离不超过 max_distance 的名称，按距离、插入顺序排列
+
+        max_nodes 为最多计算编辑距离的节点数，遍历顺序固定，同一棵树同一查询的截断结果总是相同；
+        deadline 为 time.perf_counter() 的截止时间，只作为安全上限。两者任一到达后返回已找到的部分结果。
+        """
+        self.last_search_truncated = False
+        if self._root is None or not query or max_distance < 0:
+            return []
+
+        matches: List[Tuple[int, int, str]] = []
+        stack = [self._root]
+        visited = 0
+
+        while stack:
+            node = stack.pop()
+
+            # 距离超过 max_distance + 最大边长时既不是结果也没有可进入的子树，提前停止计算
+            limit = max_distance + node.max_edge
+            distance = StringComputeUtils.compute_levenshtein_distance(query, node.word, limit)
+            if distance <= max_distance:
+                matches.append((distance, node.order, node.word))
+
+            low, high = distance - max_distance, distance + max_distance
+            for edge, child in node.children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+
+            visited += 1
+            if _search_exhausted(visited, max_nodes, deadline):
+                self.last_search_truncated = bool(stack)
+                break
+
+        matches.sort()
+        return [word for _, _, word in matches]
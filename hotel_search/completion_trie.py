@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+加权补全前缀树
+对应 Java hs-core 中 HotelPrefixIndexBuilder / FSTCompletion 的 Python 实现：
+每个节点预先缓存按搜索热度排序的 top-k 酒店，查询耗时只与前缀长度有关
+"""
+
+import heapq
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class _TrieNode:
+    """前缀树节点"""
+    __slots__ = ('children', 'entries', 'top')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        # 以该节点结尾的词面对应的酒店 {doc_id: weight}
+        self.entries: Optional[Dict[int, int]] = None
+        # 子树内权重最高的 top-k 酒店 [(weight, doc_id), ...]
+        self.top: List[Tuple[int, int]] = []
+
+
+class TrieTables(NamedTuple):
+    """前缀树的全部数据（节点按广度优先编号，0 为根节点），用于写入二进制索引文件"""
+    # 每个节点的 [(字符, 子节点编号), ...]，按字符排序
+    children: List[List[Tuple[str, int]]]
+    # 每个节点缓存的 top-k [(weight, doc_id), ...]
+    top: List[List[Tuple[int, int]]]
+    # 以每个节点结尾的词面对应的 [(doc_id, weight), ...]
+    entries: List[List[Tuple[int, int]]]
+
+
+def _rank(item: Tuple[int, int]) -> Tuple[int, int]:
+    """排序键：权重高的在前，权重相同按 doc_id 升序"""
+    return -item[0], item[1]
+
+
+class CompletionTrieBase(ABC):
+    """补全前缀树的只读查询接口，内存中的 CompletionTrie 与 mmap 索引文件中的 MappedCompletionTrie 查询结果完全一致"""
+
+    # 每个节点缓存的酒店数
+    top_k: int
+
+    @abstractmethod
+    def lookup_weighted(self, prefix: str, count: int) -> List[Tuple[int, int]]:
+        """返回以 prefix 开头的词面中权重最高的 count 个 (weight, doc_id)"""
+
+    @abstractmethod
+    def tables(self) -> TrieTables:
+        """导出树结构"""
+
+    def lookup(self, prefix: str, count: int) -> List[int]:
+        """返回以 prefix 开头的词面中权重最高的 count 个 doc_id"""
+        return [doc_id for _, doc_id in self.lookup_weighted(prefix, count)]
+
+    def complete(self, prefixes: Iterable[str], count: int) -> List[int]:
+        """合并多个归一化前缀（如拼音、英文变体）的结果"""
+        best: Dict[int, int] = {}
+        for prefix in prefixes:
+            for weight, doc_id in self.lookup_weighted(prefix, count):
+                if weight > best.get(doc_id, -1):
+                    best[doc_id] = weight
+        items = [(weight, doc_id) for doc_id, weight in best.items()]
+        return [doc_id for _, doc_id in heapq.nsmallest(count, items, key=_rank)]
+
+
+class CompletionTrie(CompletionTrieBase):
+    """加权补全前缀树
+
+    用法与 FSTCompletionBuilder 相同：先 add 所有 (词面, 酒店, 权重)，再 build。
+    build 自底向上为每个节点合并子节点的 top-k，之后 lookup 只需沿前缀走到
+    对应节点并读取缓存列表，不再收集、重新打分整棵子树的候选。
+    """
+
+    def __init__(self, top_k: int = 10):
+        self.top_k = top_k
+        self._root = _TrieNode()
+        self._built = False
+
+    def add(self, surface: str, doc_id: int, weight: int):
+        """添加一个词面"""
+        if not surface:
+            return
+        node = self._root
+        for char in surface:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        if node.entries is None:
+            node.entries = {}
+        node.entries[doc_id] = max(weight, node.entries.get(doc_id, weight))
+        self._built = False
+
+    def build(self) -> 'CompletionTrie':
+        """自底向上计算每个节点的 top-k"""
+        # 迭代后序遍历，避免长词面触发递归深度限制
+        stack = [(self._root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+            node.top = self._merge_top(node)
+        self._built = True
+        return self
+
+    def _merge_top(self, node: _TrieNode) -> List[Tuple[int, int]]:
+        """合并本节点词面与子节点缓存，同一酒店只保留最高权重"""
+        best: Dict[int, int] = {}
+        if node.entries:
+            best.update(node.entries)
+        for child in node.children.values():
+            for weight, doc_id in child.top:
+                if weight > best.get(doc_id, -1):
+                    best[doc_id] = weight
+        items = [(weight, doc_id) for doc_id, weight in best.items()]
+        return heapq.nsmallest(self.top_k, items, key=_rank)
+
+    def tables(self) -> TrieTables:
+        """导出树结构（会先完成 build）"""
+        if not self._built:
+            self.build()
+        nodes = [self._root]
+        children, top, entries = [], [], []
+        for node in nodes:
+            edges = []
+            for char in sorted(node.children):
+                edges.append((char, len(nodes)))
+                nodes.append(node.children[char])
+            children.append(edges)
+            top.append(list(node.top))
+            entries.append(list(node.entries.items()) if node.entries else [])
+        return TrieTables(children, top, entries)
+
+    def _find(self, prefix: str) -> Optional[_TrieNode]:
+        """沿前缀查找节点"""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def lookup_weighted(self, prefix: str, count: int) -> List[Tuple[int, int]]:
+        """返回以 prefix 开头的词面中权重最高的 count 个 (weight, doc_id)"""
+        if not self._built:
+            self.build()
+        node = self._find(prefix)
+        if node is None or count <= 0:
+            return []
+        if count <= self.top_k:
+            return node.top[:count]
+        return self._collect(node, count)
+
+    def _collect(self, node: _TrieNode, count: int) -> List[Tuple[int, int]]:
+        """请求数量超过缓存的 top-k 时，遍历整棵子树"""
+        best: Dict[int, int] = {}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.entries:
+                for doc_id, weight in current.entries.items():
+                    if weight > best.get(doc_id, -1):
+                        best[doc_id] = weight
+            stack.extend(current.children.values())
+        items = [(weight, doc_id) for doc_id, weight in best.items()]
+        return heapq.nsmallest(count, items, key=_rank)
+
+
+# 建索引时使用的字段，与各搜索系统的 _build_suggest_index 一致
+SUGGEST_FIELDS = ('hotel_name_cn', 'hotel_name_en', 'city_name_cn', 'city_name_en', 'region_name')
+
+
+def build_completion_trie(hotels: Sequence, normalizer, top_k: int = 10,
+                          fields: Sequence[str] = SUGGEST_FIELDS) -> CompletionTrie:
+    """从 DataLoader / ExcelDataLoader 加载的酒店列表构建补全前缀树
+
+    doc_id 即酒店在列表中的下标，权重取 search_count。
+    """
+    trie = CompletionTrie(top_k)
+    for doc_id, hotel in enumerate(hotels):
+        for field in fields:
+            for normalized in normalizer.normalize(getattr(hotel, field)):
+                trie.add(normalized, doc_id, hotel.search_count)
+    return trie.build()
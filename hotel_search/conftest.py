@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试共用的 fixture
+"""
+
+import os
+
+import pytest
+
+from reference_utils import SAMPLE_EXCEL, read_sheet_rows
+
+
+@pytest.fixture(scope='session')
+def sample_sheet_rows():
+    """自带 Excel 样例第一个工作表的 (表头, 数据行列表)；文件不存在时跳过"""
+    if not os.path.exists(SAMPLE_EXCEL):
+        pytest.skip(f"Excel文件未找到: {SAMPLE_EXCEL}")
+    return read_sheet_rows(SAMPLE_EXCEL)
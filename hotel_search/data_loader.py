@@ -10,6 +10,8 @@ import os
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 
+from hotel_table import hotel_statistics
+
 @dataclass
 class HotelData:
     """酒店数据结构"""
@@ -139,39 +141,12 @@ class DataLoader:
             return False
     
     def get_data_statistics(self, hotels: List[HotelData]) -> Dict:
-        """获取数据统计信息"""
-        if not hotels:
-            return {}
-        
-        # 城市统计
-        cities = {}
-        for hotel in hotels:
-            city = hotel.city_name_cn
-            if city not in cities:
-                cities[city] = {'count': 0, 'hotels': []}
-            cities[city]['count'] += 1
-            cities[city]['hotels'].append(hotel.hotel_name_cn)
-        
-        # 星级统计
-        star_ratings = {}
-        for hotel in hotels:
-            rating = hotel.star_rating
-            star_ratings[rating] = star_ratings.get(rating, 0) + 1
-        
-        # 价格范围统计
-        price_ranges = {}
-        for hotel in hotels:
-            price_range = hotel.price_range
-            price_ranges[price_range] = price_ranges.get(price_range, 0) + 1
+        """获取数据统计信息
         
-        return {
-            'total_hotels': len(hotels),
-            'total_cities': len(cities),
-            'cities': cities,
-            'star_ratings': star_ratings,
-            'price_ranges': price_ranges,
-            'countries': list(set(hotel.country for hotel in hotels))
-        }
+        各维度先按字典编码（hotels 为 HotelTable 时直接用表中的编码列），再一次 bincount 得到全部计数；
+        cities 中每个城市只有酒店数，不再附带酒店名称列表。
+        """
+        return hotel_statistics(hotels)
     
     def filter_hotels_by_city(self, hotels: List[HotelData], city: str) -> List[HotelData]:
         """按城市筛选酒店"""
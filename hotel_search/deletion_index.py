@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+删除邻域索引（SymSpell）
+建索引时为每个归一化词面生成最多删除 max_distance 个字符的所有变体，
+查询时只需生成查询词的删除变体并查表，即可找出编辑距离不超过 max_distance 的词面，
+耗时与词典大小无关
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+from string_compute_utils import StringComputeUtils
+
+# 默认最大编辑距离
+MAX_EDIT_DISTANCE = 2
+
+# 只对词面的前若干个字符生成删除变体，控制长酒店名的变体数量；
+# 编辑距离不超过 d 的两个串，其前缀的 d 删除邻域必有交集，因此不会漏召回
+PREFIX_LENGTH = 7
+
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """删除最多 max_distance 个字符得到的所有变体（包含原词）"""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            for i in range(len(item)):
+                variant = item[:i] + item[i + 1:]
+                if variant not in result:
+                    next_frontier.add(variant)
+        result.update(next_frontier)
+        frontier = next_frontier
+    return result
+
+
+def typo_distance(query: str, max_distance: int = MAX_EDIT_DISTANCE) -> int:
+    """按查询词长度允许的编辑距离：2 个字符以下不纠错，3-4 个字符容忍 1 处，更长容忍 2 处"""
+    return max(0, min(max_distance, (len(query) - 1) // 2))
+
+
+class DeletionTables(NamedTuple):
+    """删除邻域索引的全部数据，用于写入二进制索引文件"""
+    # 词面，下标即词面编号
+    surfaces: List[str]
+    # 前缀，下标即前缀编号
+    prefixes: List[str]
+    # 每个前缀下的词面编号（按长度、编号升序）
+    prefix_surfaces: List[List[int]]
+    # 删除变体 -> 前缀编号
+    deletes: Dict[str, Sequence[int]]
+
+
+class DeletionIndexBase(ABC):
+    """删除邻域索引的只读查询接口
+
+    lookup 只通过 _lookup_prefixes / _candidate_ids 访问删除变体表和前缀分桶，
+    内存中的 DeletionIndex 与 mmap 索引文件中的 MappedDeletionIndex 各自实现存储。
+    lookup 返回的词面按编辑距离升序、同距离按原索引插入顺序排列。
+    """
+
+    max_distance: int
+    prefix_length: int
+    # 词面，下标即词面编号
+    _surfaces: Sequence[str]
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    @property
+    @abstractmethod
+    def delete_count(self) -> int:
+        """删除变体（索引键）数量"""
+
+    @abstractmethod
+    def tables(self) -> DeletionTables:
+        """导出索引数据"""
+
+    @abstractmethod
+    def _lookup_prefixes(self, variants: Iterable[str]) -> Set[int]:
+        """删除变体对应的前缀编号"""
+
+    @abstractmethod
+    def _candidate_ids(self, prefix_ids: Iterable[int], lengths: range) -> List[int]:
+        """这些前缀下长度落在 lengths 内的词面编号"""
+
+    def lookup(self, query: str, max_distance: Optional[int] = None) -> List[str]:
+        """返回与 query 编辑距离不超过 max_distance 的所有词面
+
+        max_distance 默认按查询词长度取 typo_distance，且不超过建索引时的最大距离。
+        """
+        if max_distance is None:
+            max_distance = typo_distance(query, self.max_distance)
+        max_distance = min(max_distance, self.max_distance)
+        if not query or max_distance <= 0:
+            return []
+
+        prefix_ids = self._lookup_prefixes(deletes(query[:self.prefix_length], max_distance))
+        lengths = range(len(query) - max_distance, len(query) + max_distance + 1)
+
+        matches = []
+        surfaces = self._surfaces
+        for surface_id in self._candidate_ids(prefix_ids, lengths):
+            distance = StringComputeUtils.compute_levenshtein_distance(surfaces[surface_id], query, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, surface_id))
+
+        matches.sort()
+        return [surfaces[surface_id] for _, surface_id in matches]
+
+
+class DeletionIndex(DeletionIndexBase):
+    """删除邻域索引
+
+    两级结构：删除变体 -> 前缀编号，前缀 -> 按长度分桶的词面编号。
+    批量生成的酒店名往往共享前缀，删除变体按不同前缀生成一次即可；
+    查询时只需检查长度差不超过最大距离的桶。
+    """
+
+    def __init__(self, surfaces: Iterable[str], max_distance: int = MAX_EDIT_DISTANCE,
+                 prefix_length: int = PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+
+        self._surfaces: List[str] = []
+        self._prefixes: List[str] = []
+        self._prefix_surfaces: Dict[str, Dict[int, array]] = {}
+        self._deletes: Dict[str, array] = {}
+
+        for surface in surfaces:
+            if not surface:
+                continue
+            surface_id = len(self._surfaces)
+            self._surfaces.append(surface)
+
+            prefix = surface[:prefix_length]
+            buckets = self._prefix_surfaces.get(prefix)
+            if buckets is None:
+                buckets = self._prefix_surfaces[prefix] = {}
+                self._add_prefix(prefix)
+            posting = buckets.get(len(surface))
+            if posting is None:
+                posting = buckets[len(surface)] = array('I')
+            posting.append(surface_id)
+
+    def _add_prefix(self, prefix: str):
+        """登记新前缀的全部删除变体"""
+        prefix_id = len(self._prefixes)
+        self._prefixes.append(prefix)
+        for variant in deletes(prefix, self.max_distance):
+            posting = self._deletes.get(variant)
+            if posting is None:
+                posting = self._deletes[variant] = array('I')
+            posting.append(prefix_id)
+
+    @property
+    def delete_count(self) -> int:
+        """删除变体（索引键）数量"""
+        return len(self._deletes)
+
+    def tables(self) -> DeletionTables:
+        """导出索引数据"""
+        prefix_surfaces = []
+        for prefix in self._prefixes:
+            buckets = self._prefix_surfaces[prefix]
+            prefix_surfaces.append([surface_id for length in sorted(buckets) for surface_id in buckets[length]])
+        return DeletionTables(self._surfaces, self._prefixes, prefix_surfaces, self._deletes)
+
+    def _lookup_prefixes(self, variants: Iterable[str]) -> Set[int]:
+        """删除变体对应的前缀编号"""
+        prefix_ids: Set[int] = set()
+        for variant in variants:
+            posting = self._deletes.get(variant)
+            if posting is not None:
+                prefix_ids.update(posting)
+        return prefix_ids
+
+    def _candidate_ids(self, prefix_ids: Iterable[int], lengths: range) -> List[int]:
+        """这些前缀下长度落在 lengths 内的词面编号"""
+        candidates = []
+        for prefix_id in prefix_ids:
+            buckets = self._prefix_surfaces[self._prefixes[prefix_id]]
+            for length in lengths:
+                posting = buckets.get(length)
+                if posting is not None:
+                    candidates.extend(posting)
+        return candidates
@@ -8,9 +8,16 @@ Excel数据读取器
 import pandas as pd
 import json
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Iterator, Mapping, Optional, Tuple
 from dataclasses import dataclass
 import re
+from itertools import chain, repeat
+
+import numpy as np
+import openpyxl
+
+from aho_corasick import AhoCorasickMatcher
+from hotel_table import hotel_statistics
 
 @dataclass
 class ExcelHotelData:
@@ -33,15 +40,190 @@ class ExcelHotelData:
     # Excel特有字段
     original_data: Dict = None
 
+_DIGITS_PATTERN = re.compile(r'\d+')
+
+def _parse_float(value) -> Optional[float]:
+    """float(value)，无法转换时返回 None"""
+    try:
+        return float(value)
+    except Exception:
+        return None
+
 class ExcelDataLoader:
     """Excel数据加载器"""
     
-    def __init__(self, excel_file: str = "../日本东京酒店v2.xlsx"):
+    # 酒店名称中译英词典
+    NAME_TRANSLATIONS = {
+        "酒店": "Hotel",
+        "旅馆": "Inn",
+        "宾馆": "Guesthouse",
+        "度假村": "Resort",
+        "新宿": "Shinjuku",
+        "华盛顿": "Washington",
+        "利夫马克斯": "LiVEMAX",
+        "秋叶原": "Akihabara",
+        "浅草": "Asakusa",
+        "吉居": "YOSHII",
+        "琢居": "Takumi",
+        "上野": "Ueno",
+        "入谷口": "Iriyaguchi",
+        "王子": "Prince",
+        "品川": "Shinagawa",
+        "日本桥": "Nihonbashi",
+        "阿尔蒙特": "Almont",
+        "日暮里": "Nippori",
+        "三井花园": "Mitsui Garden",
+        "银座": "Ginza",
+        "筑地": "Tsukiji"
+    }
+    
+    # 东京主要区域
+    TOKYO_REGIONS = ["新宿", "涩谷", "池袋", "秋叶原", "浅草", "上野", "银座", "筑地", 
+                     "品川", "日本桥", "日暮里", "台场", "丰洲", "六本木", "原宿", 
+                     "表参道", "青山", "代官山", "惠比寿", "中目黑", "目黑", "五反田", 
+                     "大崎", "田町", "滨松町", "有乐町", "新桥", "汐留"]
+    
+    # 东京主要区域的坐标
+    TOKYO_COORDINATES = {
+        "新宿": (35.6938, 139.7034),
+        "涩谷": (35.6580, 139.7016),
+        "池袋": (35.7314, 139.7289),
+        "秋叶原": (35.7023, 139.7745),
+        "浅草": (35.7148, 139.7967),
+        "上野": (35.7138, 139.7770),
+        "银座": (35.6654, 139.7704),
+        "筑地": (35.6654, 139.7704),
+        "品川": (35.6286, 139.7389),
+        "日本桥": (35.6812, 139.7671),
+        "日暮里": (35.7278, 139.7668),
+        "台场": (35.6300, 139.7800),
+        "丰洲": (35.6580, 139.7960),
+        "六本木": (35.6614, 139.7300),
+        "原宿": (35.6702, 139.7016),
+        "表参道": (35.6654, 139.7120),
+        "青山": (35.6654, 139.7120),
+        "代官山": (35.6480, 139.7030),
+        "惠比寿": (35.6470, 139.7100),
+        "中目黑": (35.6430, 139.6980),
+        "目黑": (35.6410, 139.6980),
+        "五反田": (35.6260, 139.7230),
+        "大崎": (35.6190, 139.7280),
+        "田町": (35.6450, 139.7470),
+        "滨松町": (35.6550, 139.7570),
+        "有乐町": (35.6750, 139.7630),
+        "新桥": (35.6660, 139.7590),
+        "汐留": (35.6640, 139.7600)
+    }
+    
+    # 地址中的城市关键词（包括日文写法）
+    CITY_KEYWORDS = [
+        ("东京", "东京"), ("東京都", "东京"), ("大阪", "大阪"), ("京都", "京都"),
+        ("横滨", "横滨"), ("横浜", "横滨"), ("名古屋", "名古屋"), ("神户", "神户"),
+        ("神戸", "神户"), ("福冈", "福冈"), ("福岡", "福冈"), ("札幌", "札幌"),
+        ("仙台", "仙台"), ("广岛", "广岛"), ("広島", "广岛")
+    ]
+    
+    # 各字段依次尝试的列名（取第一个有值的列）
+    ID_COLUMNS = ['ID', 'id', 'hotel_id', 'Hotel ID', '酒店ID', '编号']
+    NAME_CN_COLUMNS = ['酒店名称(中)', '酒店名称', 'Hotel Name CN', '中文名称', '名称', 'name_cn']
+    NAME_EN_COLUMNS = ['酒店名称(英)', 'Hotel Name EN', '英文名称', 'English Name', 'name_en']
+    NAME_JP_COLUMNS = ['Hotel Name JP', '日文名称', 'Japanese Name', 'name_jp']
+    CITY_CN_COLUMNS = ['城市名称(中)', '城市', 'City CN', '中文城市', 'city_cn']
+    CITY_EN_COLUMNS = ['城市名称(英)', 'City EN', '英文城市', 'English City', 'city_en']
+    CITY_JP_COLUMNS = ['City JP', '日文城市', 'Japanese City', 'city_jp']
+    REGION_COLUMNS = ['所属区域', '区域', 'Region', '地区', 'area', 'district']
+    ADDRESS_COLUMNS = ['酒店详细地址', '地址描述', '地址', 'Address', '详细地址', 'location']
+    PRICE_COLUMNS = ['价格', 'Price', '价格范围', 'price_range', '费用']
+    STAR_COLUMNS = ['星级', 'Star Rating', '星级评定', 'stars', '等级']
+    LATITUDE_COLUMNS = ['纬度', 'latitude', 'lat']
+    LONGITUDE_COLUMNS = ['经度', 'longitude', 'lng']
+    
+    # 城市名翻译
+    CITY_TRANSLATIONS_EN = {
+        "东京": "Tokyo",
+        "大阪": "Osaka",
+        "京都": "Kyoto",
+        "横滨": "Yokohama",
+        "名古屋": "Nagoya",
+        "神户": "Kobe",
+        "福冈": "Fukuoka",
+        "札幌": "Sapporo",
+        "仙台": "Sendai",
+        "广岛": "Hiroshima",
+        "奈良": "Nara",
+        "长野": "Nagano",
+        "金泽": "Kanazawa",
+        "冲绳": "Okinawa",
+        "函馆": "Hakodate"
+    }
+    CITY_TRANSLATIONS_JP = {
+        "东京": "東京",
+        "大阪": "大阪",
+        "京都": "京都",
+        "横滨": "横浜",
+        "名古屋": "名古屋",
+        "神户": "神戸",
+        "福冈": "福岡",
+        "札幌": "札幌",
+        "仙台": "仙台",
+        "广岛": "広島",
+        "奈良": "奈良",
+        "长野": "長野",
+        "金泽": "金沢",
+        "冲绳": "沖縄",
+        "函馆": "函館"
+    }
+    
+    # 星级对搜索热度的影响
+    STAR_SEARCH_MULTIPLIERS = {1: 0.5, 2: 0.8, 3: 1.0, 4: 1.5, 5: 2.0}
+    
+    # 没有价格列时按星级生成的价格范围
+    STAR_PRICE_RANGES = {
+        1: "¥3,000-6,000",
+        2: "¥5,000-10,000", 
+        3: "¥8,000-15,000",
+        4: "¥15,000-30,000",
+        5: "¥25,000-50,000"
+    }
+    DEFAULT_PRICE_RANGE = "¥8,000-15,000"
+    
+    # 每个词典编译成一个多模式匹配器，每个字符串只扫描一遍；
+    # 区域、坐标、城市词典靠前的词优先，值为 (词典中的序号, 结果)，用 min_value 取序号最小的匹配
+    _TRANSLATION_MATCHER = AhoCorasickMatcher(NAME_TRANSLATIONS)
+    _REGION_MATCHER = AhoCorasickMatcher((region, (rank, region)) for rank, region in enumerate(TOKYO_REGIONS))
+    _COORDINATE_MATCHER = AhoCorasickMatcher(
+        (region, (rank, coords)) for rank, (region, coords) in enumerate(TOKYO_COORDINATES.items()))
+    _CITY_MATCHER = AhoCorasickMatcher((word, (rank, city)) for rank, (word, city) in enumerate(CITY_KEYWORDS))
+    
+    def __init__(self, excel_file: str = "../日本东京酒店v2.xlsx", id_prefix: str = "excel"):
         self.excel_file = excel_file
+        # 没有ID列时生成 "{id_prefix}_{行号}"，合并多个文件时用不同前缀避免ID冲突
+        self.id_prefix = id_prefix
         self.data = None
     
-    def load_excel_data(self) -> List[ExcelHotelData]:
-        """从Excel文件加载酒店数据"""
+    def parse_config(self) -> Dict:
+        """影响解析结果的配置（列名、词典、默认值），用于判断已有的解析结果能否复用"""
+        return {
+            'columns': {
+                'id': self.ID_COLUMNS, 'name_cn': self.NAME_CN_COLUMNS, 'name_en': self.NAME_EN_COLUMNS,
+                'name_jp': self.NAME_JP_COLUMNS, 'city_cn': self.CITY_CN_COLUMNS,
+                'city_en': self.CITY_EN_COLUMNS, 'city_jp': self.CITY_JP_COLUMNS,
+                'region': self.REGION_COLUMNS, 'address': self.ADDRESS_COLUMNS, 'price': self.PRICE_COLUMNS,
+                'star': self.STAR_COLUMNS, 'latitude': self.LATITUDE_COLUMNS, 'longitude': self.LONGITUDE_COLUMNS
+            },
+            'translations': self.NAME_TRANSLATIONS,
+            'regions': self.TOKYO_REGIONS,
+            'coordinates': self.TOKYO_COORDINATES,
+            'city_keywords': self.CITY_KEYWORDS,
+            'city_translations': [self.CITY_TRANSLATIONS_EN, self.CITY_TRANSLATIONS_JP],
+            'star_search_multipliers': self.STAR_SEARCH_MULTIPLIERS,
+            'star_price_ranges': self.STAR_PRICE_RANGES,
+            'default_price_range': self.DEFAULT_PRICE_RANGE,
+            'id_prefix': self.id_prefix
+        }
+    
+    def load_excel_data(self, keep_original_data: bool = True) -> List[ExcelHotelData]:
+        """从Excel文件加载酒店数据（keep_original_data=False 时不保存每行的原始数据字典）"""
         try:
             print(f"📖 正在读取Excel文件: {self.excel_file}")
             
@@ -55,16 +237,7 @@ class ExcelDataLoader:
             print(f"\n📋 数据预览:")
             print(df.head())
             
-            hotels = []
-            
-            for index, row in df.iterrows():
-                try:
-                    hotel = self._parse_row_to_hotel(row, index)
-                    if hotel:
-                        hotels.append(hotel)
-                except Exception as e:
-                    print(f"⚠️ 解析第 {index+1} 行数据时出错: {e}")
-                    continue
+            hotels = self.parse_dataframe(df, keep_original_data)
             
             print(f"\n✅ 成功解析 {len(hotels)} 家酒店数据")
             return hotels
@@ -76,11 +249,229 @@ class ExcelDataLoader:
             print(f"❌ 读取Excel文件时发生错误: {e}")
             return []
     
-    def _parse_row_to_hotel(self, row: pd.Series, index: int) -> Optional[ExcelHotelData]:
-        """将Excel行数据解析为酒店对象"""
+    def iter_excel_hotels(self, keep_original_data: bool = True,
+                          sheet_name: Optional[str] = None) -> Iterator[ExcelHotelData]:
+        """以 openpyxl 只读模式逐行读取工作表，逐个产出酒店对象
+        
+        只读模式边解压边解析工作表 XML，不建 DataFrame，内存占用与表的行数无关，
+        可以直接交给 save_to_json 或索引构建。每行按表头组成字典后走与 load_excel_data
+        相同的逐行解析。单元格保留 openpyxl 的原始类型，因此整数列即使有空单元格
+        也不会像 pandas 那样变成浮点数。
+        """
+        for index, row in self.iter_excel_rows(sheet_name):
+            hotel = self._parse_row_to_hotel(row, index)
+            if hotel is None:
+                continue
+            if not keep_original_data:
+                hotel.original_data = None
+            yield hotel
+    
+    def iter_excel_rows(self, sheet_name: Optional[str] = None) -> Iterator[Tuple[int, Dict]]:
+        """以只读模式逐行产出 (行号, {列名: 值})
+        
+        与 pandas 一样，表中间的全空行照常产出，表尾的全空行丢弃；行比表头短时补齐空值。
+        """
+        workbook = openpyxl.load_workbook(self.excel_file, read_only=True, data_only=True)
+        try:
+            sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = self._header_names(header)
+            
+            index = 0
+            # 尚未产出的全空行：后面还有数据时照常产出，位于表尾时丢弃
+            blank_rows = 0
+            for values in rows:
+                if all(value is None for value in values):
+                    blank_rows += 1
+                    continue
+                for row in chain(repeat(dict.fromkeys(columns), blank_rows),
+                                 [dict(zip(columns, chain(values, repeat(None))))]):
+                    yield index, row
+                    index += 1
+                blank_rows = 0
+        finally:
+            workbook.close()
+    
+    @staticmethod
+    def _header_names(header: tuple) -> List:
+        """表头单元格转为列名：空表头命名为 "Unnamed: 列号"，重复列名加 ".1"、".2" 后缀（与 pandas 一致）"""
+        names = []
+        seen = {}
+        for position, name in enumerate(header):
+            if name is None:
+                name = f"Unnamed: {position}"
+            count = seen.get(name, 0)
+            seen[name] = count + 1
+            names.append(f"{name}.{count}" if count else name)
+        return names
+    
+    def parse_dataframe(self, df: pd.DataFrame, keep_original_data: bool = True) -> List[ExcelHotelData]:
+        """按列解析整张表，结果与逐行调用 _parse_row_to_hotel 相同
+        
+        每个字段的候选列名只在表头中解析一次，字段提取、价格格式化、星级解析、坐标补全
+        都是整列的 pandas / NumPy 运算；需要查词典的补全只对缺失的行、按不同取值各算一次，
+        最后才逐行创建酒店对象。
+        """
+        if df.empty:
+            return []
+        
+        # 酒店ID，没有ID列时使用行号
+        hotel_id = self._first_column_value(df, self.ID_COLUMNS, strip=False)
+        missing = hotel_id.isna()
+        hotel_id[missing] = [f"{self.id_prefix}_{index+1:06d}" for index in df.index[missing]]
+        
+        # 中文名称：括号前的中文部分
+        name_cn = self._first_column_value(df, self.NAME_CN_COLUMNS)
+        name_cn = self._map_unique(name_cn, self._chinese_name_part).fillna("未知酒店")
+        known_name = name_cn != "未知酒店"
+        
+        # 英文名称：英文列 -> 中文名称列括号内的英文 -> 翻译中文名称
+        name_en = self._first_column_value(df, self.NAME_EN_COLUMNS)
+        if '酒店名称(中)' in df.columns:
+            raw_cn = self._first_column_value(df, ['酒店名称(中)'])
+            name_en = name_en.fillna(self._map_unique(raw_cn, self._english_name_part))
+        missing = name_en.isna()
+        name_en[missing & known_name] = self._map_unique(name_cn[missing & known_name], self._translate_to_english)
+        name_en = name_en.fillna("Unknown Hotel")
+        
+        name_jp = self._first_column_value(df, self.NAME_JP_COLUMNS)
+        name_jp = name_jp.fillna((name_cn + "ホテル").where(known_name, "不明ホテル"))
+        
+        address = self._first_column_value(df, self.ADDRESS_COLUMNS, self._non_empty).fillna("地址不详")
+        
+        # 城市：城市列 -> 地址中的城市关键词；英文、日文城市名 -> 翻译中文城市名
+        city_cn = self._first_column_value(df, self.CITY_CN_COLUMNS)
+        missing = city_cn.isna()
+        city_cn[missing] = self._map_unique(address[missing], self._extract_city_from_address)
+        city_en = self._first_column_value(df, self.CITY_EN_COLUMNS)
+        city_en = city_en.fillna(city_cn.map(self.CITY_TRANSLATIONS_EN)).fillna(city_cn)
+        city_jp = self._first_column_value(df, self.CITY_JP_COLUMNS)
+        city_jp = city_jp.fillna(city_cn.map(self.CITY_TRANSLATIONS_JP)).fillna(city_cn)
+        
+        region_name = self._first_column_value(df, self.REGION_COLUMNS, self._non_empty)
+        missing = region_name.isna()
+        region_name[missing] = self._map_unique(address[missing], self._extract_region_from_address)
+        
+        # 星级：第一个含数字的星级列中的第一个数字，限制在1-5星，默认3星
+        star_digits = self._first_column_value(df, self.STAR_COLUMNS, self._first_number)
+        star_rating = np.clip(star_digits.astype(float).fillna(3).to_numpy(), 1, 5).astype(np.int64)
+        
+        # 价格：价格列格式化（按不同取值各算一次），没有价格时按星级生成
+        price_range = self._first_column_value(df, self.PRICE_COLUMNS)
+        price_range = self._map_unique(price_range, self._format_price_range)
+        price_range = price_range.fillna(pd.Series(star_rating, index=df.index).map(self.STAR_PRICE_RANGES))
+        
+        # 搜索热度（与 _generate_search_count 相同的浮点运算顺序）
+        count = 500 * pd.Series(star_rating).map(self.STAR_SEARCH_MULTIPLIERS).fillna(1.0).to_numpy()
+        count = count * self._map_unique(price_range, self._price_popularity).to_numpy(dtype=np.float64)
+        search_count = count.astype(np.int64)
+        
+        # 经纬度：两者都能从表中读到时使用实际坐标，否则按区域、城市生成
+        latitude = self._first_float_column(df, self.LATITUDE_COLUMNS)
+        longitude = self._first_float_column(df, self.LONGITUDE_COLUMNS)
+        generated = ~(latitude.notna() & longitude.notna())
+        if generated.any():
+            coordinates = self._map_unique(pd.Series(list(zip(region_name[generated], city_cn[generated])),
+                                                     index=df.index[generated]),
+                                           lambda pair: self._generate_coordinates(pair[1], pair[0]))
+            latitude[generated] = coordinates.str[0]
+            longitude[generated] = coordinates.str[1]
+        
+        original_data = df.to_dict('records') if keep_original_data else [None] * len(df)
+        
+        # 按字段顺序整列传入，由 map 在 C 层逐行调用构造函数
+        return list(map(ExcelHotelData, hotel_id.tolist(), name_cn.tolist(), name_en.tolist(), name_jp.tolist(),
+                        city_cn.tolist(), city_en.tolist(), city_jp.tolist(), region_name.tolist(),
+                        address.tolist(), repeat("Japan"), search_count.tolist(), latitude.tolist(),
+                        longitude.tolist(), price_range.tolist(), star_rating.tolist(), original_data))
+    
+    @classmethod
+    def _first_column_value(cls, df: pd.DataFrame, columns: List[str], convert=None,
+                            strip: bool = True) -> pd.Series:
+        """依次尝试候选列，取每行第一个有值（且转换后有效）的列的文本，都没有时为 NaN
+        
+        convert 把单个文本转换为取值，返回 None 表示该列无效、继续尝试下一列；
+        去除空白和 convert 只对每列的不同文本各算一次。
+        """
+        def prepare(text: str):
+            if strip:
+                text = text.strip()
+            return convert(text) if convert is not None else text
+        
+        result = pd.Series(np.nan, index=df.index, dtype=object)
+        missing = np.ones(len(df), dtype=bool)
+        for col in columns:
+            if col not in df.columns or not missing.any():
+                continue
+            values = df[col][missing]
+            values = values[values.notna()]
+            # 先逐个转成字符串再去重：1 与 1.0 取值相等但文本不同
+            text = cls._map_unique(values.map(str), prepare)
+            text = text[text.notna()]
+            result[text.index] = text
+            missing = result.isna().to_numpy()
+        return result
+    
+    @staticmethod
+    def _first_float_column(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+        """依次尝试候选列，取每行第一个能转换为浮点数的值，都没有时为 NaN"""
+        result = pd.Series(np.nan, index=df.index, dtype=object)
+        for col in columns:
+            if col not in df.columns:
+                continue
+            values = df[col]
+            if pd.api.types.is_numeric_dtype(values):
+                numbers = values.astype(float)
+            else:
+                numbers = values.map(_parse_float, na_action='ignore')
+            result = result.fillna(numbers.where(numbers.notna()))
+        return result
+    
+    @staticmethod
+    def _non_empty(text: str) -> Optional[str]:
+        """空字符串和 'nan' 视为无效"""
+        return text if text and text != 'nan' else None
+    
+    @staticmethod
+    def _first_number(text: str) -> Optional[str]:
+        """文本中的第一个数字串"""
+        match = _DIGITS_PATTERN.search(text)
+        return match.group() if match else None
+    
+    @staticmethod
+    def _chinese_name_part(name: str) -> str:
+        """同时包含 '(' 和 ')' 的名称取括号前的中文部分（为空时保留原名）"""
+        if '(' in name and ')' in name:
+            chinese_part = name.split('(')[0].strip()
+            if chinese_part:
+                return chinese_part
+        return name
+    
+    @staticmethod
+    def _english_name_part(name: str) -> Optional[str]:
+        """同时包含 '(' 和 ')' 的名称取括号内的英文部分，没有或为空时返回 None"""
+        if '(' in name and ')' in name:
+            english_part = name.split('(')[1].split(')')[0].strip()
+            if english_part:
+                return english_part
+        return None
+    
+    @staticmethod
+    def _map_unique(values: pd.Series, func) -> pd.Series:
+        """对每个不同的非空取值只调用一次 func（factorize 后按编码取回，NaN 保持为 NaN）"""
+        codes, uniques = pd.factorize(values)
+        # 末尾追加 NaN，缺失值的编码 -1 正好取到它
+        mapped = np.fromiter(chain(map(func, uniques.tolist()), [np.nan]), dtype=object, count=len(uniques) + 1)
+        return pd.Series(mapped.take(codes), index=values.index, dtype=object)
+    
+    def _parse_row_to_hotel(self, row: Mapping, index: int) -> Optional[ExcelHotelData]:
+        """将Excel行数据（pandas 行或 {列名: 值} 字典）解析为酒店对象"""
         try:
             # 获取原始数据字典
-            original_data = row.to_dict()
+            original_data = dict(row)
             
             # 提取酒店ID
             hotel_id = self._extract_hotel_id(row, index)
@@ -138,48 +529,37 @@ class ExcelDataLoader:
             print(f"⚠️ 解析第 {index+1} 行时出错: {e}")
             return None
     
-    def _extract_hotel_id(self, row: pd.Series, index: int) -> str:
+    def _extract_hotel_id(self, row: Mapping, index: int) -> str:
         """提取酒店ID"""
         # 尝试从不同列名中提取ID
-        id_columns = ['ID', 'id', 'hotel_id', 'Hotel ID', '酒店ID', '编号']
-        for col in id_columns:
+        for col in self.ID_COLUMNS:
             if col in row and pd.notna(row[col]):
                 return str(row[col])
         
         # 如果没有找到ID，使用行号
-        return f"excel_{index+1:06d}"
+        return f"{self.id_prefix}_{index+1:06d}"
     
-    def _extract_hotel_name_cn(self, row: pd.Series) -> str:
+    def _extract_hotel_name_cn(self, row: Mapping) -> str:
         """提取中文酒店名称"""
-        name_columns = ['酒店名称(中)', '酒店名称', 'Hotel Name CN', '中文名称', '名称', 'name_cn']
-        for col in name_columns:
+        for col in self.NAME_CN_COLUMNS:
             if col in row and pd.notna(row[col]):
-                name = str(row[col]).strip()
                 # 处理包含英文名称的情况，提取中文部分
-                if '(' in name and ')' in name:
-                    # 提取括号前的中文部分
-                    chinese_part = name.split('(')[0].strip()
-                    if chinese_part:
-                        return chinese_part
-                return name
+                return self._chinese_name_part(str(row[col]).strip())
         return "未知酒店"
     
-    def _extract_hotel_name_en(self, row: pd.Series) -> str:
+    def _extract_hotel_name_en(self, row: Mapping) -> str:
         """提取英文酒店名称"""
-        name_columns = ['酒店名称(英)', 'Hotel Name EN', '英文名称', 'English Name', 'name_en']
-        for col in name_columns:
+        for col in self.NAME_EN_COLUMNS:
             if col in row and pd.notna(row[col]):
                 return str(row[col]).strip()
         
         # 从中文名称中提取英文部分
         cn_name_col = '酒店名称(中)'
         if cn_name_col in row and pd.notna(row[cn_name_col]):
-            name = str(row[cn_name_col]).strip()
-            if '(' in name and ')' in name:
-                # 提取括号内的英文部分
-                english_part = name.split('(')[1].split(')')[0].strip()
-                if english_part:
-                    return english_part
+            # 提取括号内的英文部分
+            english_part = self._english_name_part(str(row[cn_name_col]).strip())
+            if english_part:
+                return english_part
         
         # 如果没有英文名称，尝试翻译中文名称
         cn_name = self._extract_hotel_name_cn(row)
@@ -187,10 +567,9 @@ class ExcelDataLoader:
             return self._translate_to_english(cn_name)
         return "Unknown Hotel"
     
-    def _extract_hotel_name_jp(self, row: pd.Series) -> str:
+    def _extract_hotel_name_jp(self, row: Mapping) -> str:
         """提取日文酒店名称"""
-        name_columns = ['Hotel Name JP', '日文名称', 'Japanese Name', 'name_jp']
-        for col in name_columns:
+        for col in self.NAME_JP_COLUMNS:
             if col in row and pd.notna(row[col]):
                 return str(row[col]).strip()
         
@@ -200,10 +579,9 @@ class ExcelDataLoader:
             return cn_name + "ホテル"
         return "不明ホテル"
     
-    def _extract_city_name_cn(self, row: pd.Series) -> str:
+    def _extract_city_name_cn(self, row: Mapping) -> str:
         """提取中文城市名称"""
-        city_columns = ['城市名称(中)', '城市', 'City CN', '中文城市', 'city_cn']
-        for col in city_columns:
+        for col in self.CITY_CN_COLUMNS:
             if col in row and pd.notna(row[col]):
                 return str(row[col]).strip()
         
@@ -211,10 +589,9 @@ class ExcelDataLoader:
         address = self._extract_address(row)
         return self._extract_city_from_address(address)
     
-    def _extract_city_name_en(self, row: pd.Series) -> str:
+    def _extract_city_name_en(self, row: Mapping) -> str:
         """提取英文城市名称"""
-        city_columns = ['城市名称(英)', 'City EN', '英文城市', 'English City', 'city_en']
-        for col in city_columns:
+        for col in self.CITY_EN_COLUMNS:
             if col in row and pd.notna(row[col]):
                 return str(row[col]).strip()
         
@@ -222,10 +599,9 @@ class ExcelDataLoader:
         cn_city = self._extract_city_name_cn(row)
         return self._translate_city_to_english(cn_city)
     
-    def _extract_city_name_jp(self, row: pd.Series) -> str:
+    def _extract_city_name_jp(self, row: Mapping) -> str:
         """提取日文城市名称"""
-        city_columns = ['City JP', '日文城市', 'Japanese City', 'city_jp']
-        for col in city_columns:
+        for col in self.CITY_JP_COLUMNS:
             if col in row and pd.notna(row[col]):
                 return str(row[col]).strip()
         
@@ -233,10 +609,9 @@ class ExcelDataLoader:
         cn_city = self._extract_city_name_cn(row)
         return self._translate_city_to_japanese(cn_city)
     
-    def _extract_region_name(self, row: pd.Series) -> str:
+    def _extract_region_name(self, row: Mapping) -> str:
         """提取区域名称"""
-        region_columns = ['所属区域', '区域', 'Region', '地区', 'area', 'district']
-        for col in region_columns:
+        for col in self.REGION_COLUMNS:
             if col in row and pd.notna(row[col]):
                 region = str(row[col]).strip()
                 if region and region != 'nan':
@@ -246,20 +621,18 @@ class ExcelDataLoader:
         address = self._extract_address(row)
         return self._extract_region_from_address(address)
     
-    def _extract_address(self, row: pd.Series) -> str:
+    def _extract_address(self, row: Mapping) -> str:
         """提取地址"""
-        address_columns = ['酒店详细地址', '地址描述', '地址', 'Address', '详细地址', 'location']
-        for col in address_columns:
+        for col in self.ADDRESS_COLUMNS:
             if col in row and pd.notna(row[col]):
                 address = str(row[col]).strip()
                 if address and address != 'nan':
                     return address
         return "地址不详"
     
-    def _extract_price_range(self, row: pd.Series) -> str:
+    def _extract_price_range(self, row: Mapping) -> str:
         """提取价格范围"""
-        price_columns = ['价格', 'Price', '价格范围', 'price_range', '费用']
-        for col in price_columns:
+        for col in self.PRICE_COLUMNS:
             if col in row and pd.notna(row[col]):
                 price = str(row[col]).strip()
                 return self._format_price_range(price)
@@ -268,17 +641,16 @@ class ExcelDataLoader:
         star_rating = self._extract_star_rating(row)
         return self._generate_price_by_stars(star_rating)
     
-    def _extract_star_rating(self, row: pd.Series) -> int:
+    def _extract_star_rating(self, row: Mapping) -> int:
         """提取星级"""
-        star_columns = ['星级', 'Star Rating', '星级评定', 'stars', '等级']
-        for col in star_columns:
+        for col in self.STAR_COLUMNS:
             if col in row and pd.notna(row[col]):
                 try:
                     rating = str(row[col]).strip()
                     # 提取数字
-                    numbers = re.findall(r'\d+', rating)
-                    if numbers:
-                        star = int(numbers[0])
+                    number = self._first_number(rating)
+                    if number:
+                        star = int(number)
                         return min(max(star, 1), 5)  # 限制在1-5星
                 except:
                     pass
@@ -291,28 +663,30 @@ class ExcelDataLoader:
         base_count = 500
         
         # 星级影响
-        star_multiplier = {1: 0.5, 2: 0.8, 3: 1.0, 4: 1.5, 5: 2.0}
-        count = base_count * star_multiplier.get(star_rating, 1.0)
+        count = base_count * self.STAR_SEARCH_MULTIPLIERS.get(star_rating, 1.0)
         
-        # 价格影响（低价更受欢迎）
-        if "¥5,000" in price_range or "¥6,000" in price_range:
-            count *= 1.2
-        elif "¥20,000" in price_range or "¥30,000" in price_range:
-            count *= 0.8
+        # 价格影响
+        count *= self._price_popularity(price_range)
         
         return int(count)
     
-    def _extract_coordinates(self, row: pd.Series, city_name: str, region_name: str) -> tuple:
+    @staticmethod
+    def _price_popularity(price_range: str) -> float:
+        """价格对搜索热度的影响（低价更受欢迎）"""
+        if "¥5,000" in price_range or "¥6,000" in price_range:
+            return 1.2
+        elif "¥20,000" in price_range or "¥30,000" in price_range:
+            return 0.8
+        return 1.0
+    
+    def _extract_coordinates(self, row: Mapping, city_name: str, region_name: str) -> tuple:
         """提取经纬度坐标"""
         # 尝试从Excel中提取经纬度
-        lat_cols = ['纬度', 'latitude', 'lat']
-        lng_cols = ['经度', 'longitude', 'lng']
-        
         latitude = None
         longitude = None
         
         # 提取纬度
-        for col in lat_cols:
+        for col in self.LATITUDE_COLUMNS:
             if col in row and pd.notna(row[col]):
                 try:
                     latitude = float(row[col])
@@ -321,7 +695,7 @@ class ExcelDataLoader:
                     pass
         
         # 提取经度
-        for col in lng_cols:
+        for col in self.LONGITUDE_COLUMNS:
             if col in row and pd.notna(row[col]):
                 try:
                     longitude = float(row[col])
@@ -338,155 +712,38 @@ class ExcelDataLoader:
     
     def _generate_coordinates(self, city_name: str, region_name: str) -> tuple:
         """生成经纬度坐标"""
-        # 东京主要区域的坐标
-        tokyo_coordinates = {
-            "新宿": (35.6938, 139.7034),
-            "涩谷": (35.6580, 139.7016),
-            "池袋": (35.7314, 139.7289),
-            "秋叶原": (35.7023, 139.7745),
-            "浅草": (35.7148, 139.7967),
-            "上野": (35.7138, 139.7770),
-            "银座": (35.6654, 139.7704),
-            "筑地": (35.6654, 139.7704),
-            "品川": (35.6286, 139.7389),
-            "日本桥": (35.6812, 139.7671),
-            "日暮里": (35.7278, 139.7668),
-            "台场": (35.6300, 139.7800),
-            "丰洲": (35.6580, 139.7960),
-            "六本木": (35.6614, 139.7300),
-            "原宿": (35.6702, 139.7016),
-            "表参道": (35.6654, 139.7120),
-            "青山": (35.6654, 139.7120),
-            "代官山": (35.6480, 139.7030),
-            "惠比寿": (35.6470, 139.7100),
-            "中目黑": (35.6430, 139.6980),
-            "目黑": (35.6410, 139.6980),
-            "五反田": (35.6260, 139.7230),
-            "大崎": (35.6190, 139.7280),
-            "田町": (35.6450, 139.7470),
-            "滨松町": (35.6550, 139.7570),
-            "有乐町": (35.6750, 139.7630),
-            "新桥": (35.6660, 139.7590),
-            "汐留": (35.6640, 139.7600)
-        }
-        
-        # 查找匹配的区域
-        for region, coords in tokyo_coordinates.items():
-            if region in region_name or region in city_name:
-                return coords
+        # 查找匹配的区域（词典中最靠前的、出现在区域名或城市名中的区域）
+        match = self._COORDINATE_MATCHER.min_value(region_name, city_name)
+        if match:
+            return match[1]
         
         # 默认返回东京中心坐标
         return (35.6762, 139.6503)
     
     def _translate_to_english(self, cn_name: str) -> str:
-        """简单的中文到英文翻译"""
-        translations = {
-            "酒店": "Hotel",
-            "旅馆": "Inn",
-            "宾馆": "Guesthouse",
-            "度假村": "Resort",
-            "新宿": "Shinjuku",
-            "华盛顿": "Washington",
-            "利夫马克斯": "LiVEMAX",
-            "秋叶原": "Akihabara",
-            "浅草": "Asakusa",
-            "吉居": "YOSHII",
-            "琢居": "Takumi",
-            "上野": "Ueno",
-            "入谷口": "Iriyaguchi",
-            "王子": "Prince",
-            "品川": "Shinagawa",
-            "日本桥": "Nihonbashi",
-            "阿尔蒙特": "Almont",
-            "日暮里": "Nippori",
-            "三井花园": "Mitsui Garden",
-            "银座": "Ginza",
-            "筑地": "Tsukiji"
-        }
-        
-        result = cn_name
-        for cn, en in translations.items():
-            result = result.replace(cn, en)
-        
-        return result
+        """简单的中文到英文翻译（一次扫描，最左最长替换）"""
+        return self._TRANSLATION_MATCHER.replace(cn_name)
     
     def _translate_city_to_english(self, cn_city: str) -> str:
         """城市名翻译"""
-        city_translations = {
-            "东京": "Tokyo",
-            "大阪": "Osaka",
-            "京都": "Kyoto",
-            "横滨": "Yokohama",
-            "名古屋": "Nagoya",
-            "神户": "Kobe",
-            "福冈": "Fukuoka",
-            "札幌": "Sapporo",
-            "仙台": "Sendai",
-            "广岛": "Hiroshima",
-            "奈良": "Nara",
-            "长野": "Nagano",
-            "金泽": "Kanazawa",
-            "冲绳": "Okinawa",
-            "函馆": "Hakodate"
-        }
-        return city_translations.get(cn_city, cn_city)
+        return self.CITY_TRANSLATIONS_EN.get(cn_city, cn_city)
     
     def _translate_city_to_japanese(self, cn_city: str) -> str:
         """城市名翻译为日文"""
-        city_translations = {
-            "东京": "東京",
-            "大阪": "大阪",
-            "京都": "京都",
-            "横滨": "横浜",
-            "名古屋": "名古屋",
-            "神户": "神戸",
-            "福冈": "福岡",
-            "札幌": "札幌",
-            "仙台": "仙台",
-            "广岛": "広島",
-            "奈良": "奈良",
-            "长野": "長野",
-            "金泽": "金沢",
-            "冲绳": "沖縄",
-            "函馆": "函館"
-        }
-        return city_translations.get(cn_city, cn_city)
+        return self.CITY_TRANSLATIONS_JP.get(cn_city, cn_city)
     
     def _extract_city_from_address(self, address: str) -> str:
         """从地址中提取城市名"""
-        if "东京" in address or "東京都" in address:
-            return "东京"
-        elif "大阪" in address:
-            return "大阪"
-        elif "京都" in address:
-            return "京都"
-        elif "横滨" in address or "横浜" in address:
-            return "横滨"
-        elif "名古屋" in address:
-            return "名古屋"
-        elif "神户" in address or "神戸" in address:
-            return "神户"
-        elif "福冈" in address or "福岡" in address:
-            return "福冈"
-        elif "札幌" in address:
-            return "札幌"
-        elif "仙台" in address:
-            return "仙台"
-        elif "广岛" in address or "広島" in address:
-            return "广岛"
-        else:
-            return "东京"  # 默认东京
+        # 词典中最靠前的、出现在地址中的城市关键词
+        match = self._CITY_MATCHER.min_value(address)
+        return match[1] if match else "东京"  # 默认东京
     
     def _extract_region_from_address(self, address: str) -> str:
         """从地址中提取区域名"""
-        regions = ["新宿", "涩谷", "池袋", "秋叶原", "浅草", "上野", "银座", "筑地", 
-                  "品川", "日本桥", "日暮里", "台场", "丰洲", "六本木", "原宿", 
-                  "表参道", "青山", "代官山", "惠比寿", "中目黑", "目黑", "五反田", 
-                  "大崎", "田町", "滨松町", "有乐町", "新桥", "汐留"]
-        
-        for region in regions:
-            if region in address:
-                return region + "地区"
+        # 词典中最靠前的、出现在地址中的区域
+        match = self._REGION_MATCHER.min_value(address)
+        if match:
+            return match[1] + "地区"
         
         return "东京地区"
     
@@ -502,93 +759,73 @@ class ExcelDataLoader:
             price_val = int(numbers[0])
             return f"¥{price_val:,}-{price_val*1.5:,.0f}"
         else:
-            return "¥8,000-15,000"  # 默认价格
+            return self.DEFAULT_PRICE_RANGE  # 默认价格
     
     def _generate_price_by_stars(self, star_rating: int) -> str:
         """根据星级生成价格范围"""
-        price_ranges = {
-            1: "¥3,000-6,000",
-            2: "¥5,000-10,000", 
-            3: "¥8,000-15,000",
-            4: "¥15,000-30,000",
-            5: "¥25,000-50,000"
-        }
-        return price_ranges.get(star_rating, "¥8,000-15,000")
+        return self.STAR_PRICE_RANGES.get(star_rating, self.DEFAULT_PRICE_RANGE)
     
-    def save_to_json(self, hotels: List[ExcelHotelData], filename: str = "data/excel_hotels.json") -> bool:
-        """保存数据到JSON文件"""
+    def save_to_json(self, hotels: Iterable[ExcelHotelData], filename: str = "data/excel_hotels.json") -> bool:
+        """保存数据到JSON文件
+        
+        hotels 可以是列表，也可以是 iter_excel_hotels 返回的生成器：逐个序列化写出，
+        不在内存中汇总，输出与一次性 json.dump(indent=2) 完全相同。先写临时文件再原子替换，
+        中途出错不会覆盖已有文件。
+        """
+        temp_path = filename + '.tmp'
         try:
             # 确保目录存在
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
             
-            # 转换为字典格式
-            hotel_dicts = []
-            for hotel in hotels:
-                hotel_dict = {
-                    'hotel_id': hotel.hotel_id,
-                    'hotel_name_cn': hotel.hotel_name_cn,
-                    'hotel_name_en': hotel.hotel_name_en,
-                    'hotel_name_jp': hotel.hotel_name_jp,
-                    'city_name_cn': hotel.city_name_cn,
-                    'city_name_en': hotel.city_name_en,
-                    'city_name_jp': hotel.city_name_jp,
-                    'region_name': hotel.region_name,
-                    'address': hotel.address,
-                    'country': hotel.country,
-                    'search_count': hotel.search_count,
-                    'latitude': hotel.latitude,
-                    'longitude': hotel.longitude,
-                    'price_range': hotel.price_range,
-                    'star_rating': hotel.star_rating
-                }
-                hotel_dicts.append(hotel_dict)
+            count = 0
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write('{\n  "hotels": [')
+                for hotel in hotels:
+                    # 字符串中的换行会被转义，序列化结果里的换行都是缩进换行，整体再缩进两层
+                    text = json.dumps(self._hotel_to_dict(hotel), ensure_ascii=False, indent=2)
+                    f.write(',\n    ' if count else '\n    ')
+                    f.write(text.replace('\n', '\n    '))
+                    count += 1
+                f.write('\n  ]\n}' if count else ']\n}')
+            os.replace(temp_path, filename)
             
-            data = {'hotels': hotel_dicts}
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            print(f"✅ 成功保存 {len(hotels)} 家酒店数据到 {filename}")
+            print(f"✅ 成功保存 {count} 家酒店数据到 {filename}")
             return True
             
         except Exception as e:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
             print(f"❌ 保存数据时发生错误: {e}")
             return False
     
-    def get_data_statistics(self, hotels: List[ExcelHotelData]) -> Dict:
-        """获取数据统计信息"""
-        if not hotels:
-            return {}
-        
-        # 城市统计
-        cities = {}
-        for hotel in hotels:
-            city = hotel.city_name_cn
-            if city not in cities:
-                cities[city] = {'count': 0, 'hotels': []}
-            cities[city]['count'] += 1
-            cities[city]['hotels'].append(hotel.hotel_name_cn)
-        
-        # 星级统计
-        star_ratings = {}
-        for hotel in hotels:
-            rating = hotel.star_rating
-            star_ratings[rating] = star_ratings.get(rating, 0) + 1
-        
-        # 价格范围统计
-        price_ranges = {}
-        for hotel in hotels:
-            price_range = hotel.price_range
-            price_ranges[price_range] = price_ranges.get(price_range, 0) + 1
-        
+    @staticmethod
+    def _hotel_to_dict(hotel: ExcelHotelData) -> Dict:
+        """酒店对象转为保存到JSON的字典（不含原始Excel行）"""
         return {
-            'total_hotels': len(hotels),
-            'total_cities': len(cities),
-            'cities': cities,
-            'star_ratings': star_ratings,
-            'price_ranges': price_ranges,
-            'countries': list(set(hotel.country for hotel in hotels))
+            'hotel_id': hotel.hotel_id,
+            'hotel_name_cn': hotel.hotel_name_cn,
+            'hotel_name_en': hotel.hotel_name_en,
+            'hotel_name_jp': hotel.hotel_name_jp,
+            'city_name_cn': hotel.city_name_cn,
+            'city_name_en': hotel.city_name_en,
+            'city_name_jp': hotel.city_name_jp,
+            'region_name': hotel.region_name,
+            'address': hotel.address,
+            'country': hotel.country,
+            'search_count': hotel.search_count,
+            'latitude': hotel.latitude,
+            'longitude': hotel.longitude,
+            'price_range': hotel.price_range,
+            'star_rating': hotel.star_rating
         }
+    
+    def get_data_statistics(self, hotels: List[ExcelHotelData]) -> Dict:
+        """获取数据统计信息
+        
+        各维度先按字典编码（hotels 为 HotelTable 时直接用表中的编码列），再一次 bincount 得到全部计数；
+        cities 中每个城市只有酒店数，不再附带酒店名称列表。
+        """
+        return hotel_statistics(hotels)
 
 def test_excel_loader():
     """测试Excel数据加载器"""
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录级Excel批量导入
+供应商按地区发来很多 xlsx 文件：目录下的每个工作表作为一个任务交给进程池解析，
+按 文件名 → 工作表 → 行 的固定顺序合并、按 hotel_id 去重后写出一个数据集；
+每个工作表单独记录耗时和错误，一个坏文件不会让整批失败
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import openpyxl
+
+from excel_data_loader import ExcelDataLoader, ExcelHotelData
+
+# 参与导入的文件扩展名
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+@dataclass
+class SheetResult:
+    """一个工作表的解析结果"""
+    path: str
+    sheet_name: Optional[str]
+    hotels: List[ExcelHotelData] = field(default_factory=list)
+    seconds: float = 0.0
+    error: Optional[str] = None
+    # 合并时因 hotel_id 与排在前面的酒店重复而丢弃的数量
+    duplicates: int = 0
+
+
+@dataclass
+class IngestReport:
+    """一次目录导入的汇总"""
+    hotels: List[ExcelHotelData]
+    results: List[SheetResult]
+    seconds: float
+
+    @property
+    def failed(self) -> List[SheetResult]:
+        return [result for result in self.results if result.error is not None]
+
+    def lines(self) -> List[str]:
+        """逐个工作表的报告"""
+        lines = []
+        for result in self.results:
+            name = result.path + (f" [{result.sheet_name}]" if result.sheet_name else "")
+            if result.error is not None:
+                lines.append(f"❌ {name}: {result.error} ({result.seconds:.2f}秒)")
+            else:
+                duplicates = f", 重复ID丢弃 {result.duplicates}" if result.duplicates else ""
+                lines.append(f"✅ {name}: {len(result.hotels)} 家酒店{duplicates} ({result.seconds:.2f}秒)")
+        return lines
+
+
+def find_workbooks(directory: str) -> List[str]:
+    """目录（含子目录）下的 Excel 文件，按相对路径排序；跳过 Excel 打开文件时生成的 ~$ 锁文件"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in files:
+            if name.lower().endswith(EXCEL_EXTENSIONS) and not name.startswith('~$'):
+                paths.append(os.path.join(root, name))
+    return sorted(paths, key=lambda path: os.path.relpath(path, directory))
+
+
+def _id_prefix(directory: str, path: str, sheet_name: Optional[str]) -> str:
+    """没有ID列时生成ID的前缀：相对路径去掉扩展名，多工作表时再加工作表名"""
+    prefix = os.path.splitext(os.path.relpath(path, directory))[0].replace(os.sep, '/')
+    return f"{prefix}:{sheet_name}" if sheet_name else prefix
+
+
+def _parse_sheet(task: Tuple[str, str, Optional[str]]) -> SheetResult:
+    """进程池任务：流式解析一个工作表；出错时把错误写进结果而不是抛出"""
+    directory, path, sheet_name = task
+    result = SheetResult(os.path.relpath(path, directory), sheet_name)
+    start = time.perf_counter()
+    try:
+        loader = ExcelDataLoader(path, id_prefix=_id_prefix(directory, path, sheet_name))
+        result.hotels = list(loader.iter_excel_hotels(keep_original_data=False, sheet_name=sheet_name))
+    except Exception as e:
+        result.hotels = []
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _plan_tasks(directory: str, all_sheets: bool) -> Tuple[List[Tuple], List[SheetResult]]:
+    """生成解析任务；all_sheets 时每个工作表一个任务，需要先读取工作表名（打不开的文件直接记为失败）"""
+    tasks = []
+    failed = []
+    for path in find_workbooks(directory):
+        if not all_sheets:
+            tasks.append((directory, path, None))
+            continue
+        start = time.perf_counter()
+        try:
+            workbook = openpyxl.load_workbook(path, read_only=True)
+            sheet_names = workbook.sheetnames
+            workbook.close()
+        except Exception as e:
+            failed.append(SheetResult(os.path.relpath(path, directory), None, seconds=time.perf_counter() - start,
+                                      error=f"{type(e).__name__}: {e}"))
+            continue
+        tasks.extend((directory, path, sheet_name) for sheet_name in sheet_names)
+    return tasks, failed
+
+
+def merge_results(results: List[SheetResult]) -> List[ExcelHotelData]:
+    """按结果顺序合并，hotel_id 重复时保留最先出现的酒店，并在对应结果上记录丢弃数量"""
+    seen = set()
+    hotels = []
+    for result in results:
+        result.duplicates = 0
+        for hotel in result.hotels:
+            if hotel.hotel_id in seen:
+                result.duplicates += 1
+                continue
+            seen.add(hotel.hotel_id)
+            hotels.append(hotel)
+    return hotels
+
+
+def ingest_directory(directory: str, workers: Optional[int] = None, all_sheets: bool = False) -> IngestReport:
+    """并行解析目录下所有 Excel 文件并合并
+
+    - 默认只读每个文件的第一个工作表（与 ExcelDataLoader 一致），all_sheets=True 时读取全部工作表
+    - 任务粒度是工作表：只读模式必须从头顺序解析工作表 XML，按行切块时每块都要重新扫过前面的行，
+      并不能减少总工作量
+    - 结果按任务顺序（文件相对路径、工作表顺序）而不是完成顺序合并，输出与进程数无关
+    - workers <= 1 时在当前进程中依次解析
+    """
+    start = time.perf_counter()
+    tasks, results = _plan_tasks(directory, all_sheets)
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+
+    if workers <= 1:
+        results.extend(map(_parse_sheet, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_parse_sheet, task) for task in tasks]
+            for (_, path, sheet_name), future in zip(tasks, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # 工作进程崩溃等任务之外的错误
+                    results.append(SheetResult(os.path.relpath(path, directory), sheet_name,
+                                               error=f"{type(e).__name__}: {e}"))
+
+    results.sort(key=lambda result: result.path)
+    hotels = merge_results(results)
+    return IngestReport(hotels, results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python excel_ingest.py <Excel目录> [输出JSON] [进程数]")
+        sys.exit(2)
+
+    directory = sys.argv[1]
+    output = sys.argv[2] if len(sys.argv) > 2 else 'data/excel_hotels.json'
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    report = ingest_directory(directory, workers)
+    for line in report.lines():
+        print(line)
+    print(f"📦 {len(report.results)} 个工作表, 失败 {len(report.failed)} 个, "
+          f"合并后 {len(report.hotels)} 家酒店, 耗时 {report.seconds:.2f}秒")
+    ExcelDataLoader().save_to_json(report.hotels, output)
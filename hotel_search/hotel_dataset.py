@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+酒店数据集持有者
+进程内只加载一次酒店数据，监控文件变化并在后台原子替换数据快照
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from hotel_table import CategoricalColumn, categorical_columns
+
+# 快照中按字典编码保存的统计维度及字段缺失时的取值
+CATEGORY_DEFAULTS = {
+    'city_name_cn': '未知城市',
+    'region_name': '未知区域',
+    'country': None,
+    'star_rating': None,
+    'price_range': None
+}
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """不可变的数据快照，请求处理期间始终使用同一个快照"""
+    hotels: List[Dict]
+    version: int
+    mtime: float
+    size: int
+    loaded_at: float
+    # 统计维度的字典编码列，加载时构建一次，统计接口直接对编码计数
+    categories: Dict[str, CategoricalColumn] = field(default_factory=dict)
+
+
+class HotelDatasetHolder:
+    """进程级数据集持有者
+
+    启动时加载一次数据，之后由后台线程轮询文件的 mtime 和 size，
+    发现变化时在后台重新构建快照并整体替换引用。替换只是一次属性赋值，
+    正在处理的请求持有旧快照的引用，可以在旧数据上安全地完成。
+
+    fork 出的子进程中没有监控线程；fork 前应进入 paused()，避免子进程继承到
+    被监控线程持有的锁（重新加载锁、打印中的标准输出）。
+    """
+
+    def __init__(self, data_file: str = "data/excel_hotels.json", check_interval: float = 2.0):
+        self.data_file = data_file
+        self.check_interval = check_interval
+        self._snapshot: Optional[DatasetSnapshot] = None
+        self._version = 0
+        self._reload_lock = threading.Lock()
+        # 监控线程每一轮检查（包括打印）期间持有
+        self._watch_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> DatasetSnapshot:
+        """获取当前数据快照"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.reload()
+            snapshot = self._snapshot
+        return snapshot
+
+    def start(self) -> DatasetSnapshot:
+        """同步加载首个快照并启动文件监控线程"""
+        snapshot = self.snapshot
+        if self._watcher is None and self.check_interval > 0:
+            self._stop_event.clear()
+            self._watcher = threading.Thread(
+                target=self._watch_loop, name="hotel-dataset-watcher", daemon=True
+            )
+            self._watcher.start()
+        return snapshot
+
+    def stop(self):
+        """停止文件监控线程"""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.check_interval + 1)
+            self._watcher = None
+
+    @contextmanager
+    def paused(self):
+        """暂停监控线程和重新加载：持有期间后台线程不在检查、加载或打印的中途
+
+        在其中调用 os.fork() 时，父子进程退出时各自释放自己的锁副本。
+        """
+        with self._watch_lock, self._reload_lock:
+            yield
+
+    def reload(self, force: bool = False) -> bool:
+        """文件发生变化时重新加载数据，返回是否替换了快照"""
+        with self._reload_lock:
+            stat = self._stat()
+            current = self._snapshot
+            if not force and current is not None:
+                if stat is None or (stat.st_mtime, stat.st_size) == (current.mtime, current.size):
+                    return False
+
+            hotels = self._load_hotels()
+            if hotels is None:
+                # 加载失败时保留旧快照，下一轮再试；首次加载失败时发布空快照，
+                # 但不记录文件状态，否则文件不再变化就永远不会重试
+                if current is None:
+                    self._publish([], None)
+                    return True
+                return False
+
+            # 读取期间文件又被修改，说明读到的可能是写了一半的内容，留到下一轮；
+            # 首次加载仍然发布，同样不记录文件状态
+            after = self._stat()
+            if stat is not None and after is not None and \
+                    (after.st_mtime, after.st_size) != (stat.st_mtime, stat.st_size):
+                if current is None:
+                    self._publish(hotels, None)
+                    return True
+                return False
+
+            self._publish(hotels, stat)
+            return True
+
+    def _publish(self, hotels: List[Dict], stat: Optional[os.stat_result]):
+        """发布新快照"""
+        self._version += 1
+        self._snapshot = DatasetSnapshot(
+            hotels=hotels,
+            version=self._version,
+            mtime=stat.st_mtime if stat else 0.0,
+            size=stat.st_size if stat else 0,
+            loaded_at=time.time(),
+            categories=categorical_columns(hotels, CATEGORY_DEFAULTS)
+        )
+
+    def _watch_loop(self):
+        """后台轮询文件变化"""
+        while not self._stop_event.wait(self.check_interval):
+            with self._watch_lock:
+                try:
+                    if self.reload():
+                        print(f"🔄 酒店数据已重新加载: {len(self._snapshot.hotels)} 家酒店 "
+                              f"(版本 {self._snapshot.version})")
+                except Exception as e:
+                    print(f"⚠️ 重新加载酒店数据失败: {e}")
+
+    def _stat(self) -> Optional[os.stat_result]:
+        """获取数据文件状态"""
+        try:
+            return os.stat(self.data_file)
+        except OSError:
+            return None
+
+    def _load_hotels(self) -> Optional[List[Dict]]:
+        """读取JSON数据文件"""
+        try:
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data.get('hotels', [])
+        except Exception as e:
+            print(f"加载酒店数据失败: {e}")
+            return None
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+酒店存储
+加载时为每家酒店分配连续的整数 doc id，索引倒排表只保存 doc id
+"""
+
+from array import array
+from typing import Dict, Generic, Iterator, List, Optional, Sequence, TypeVar
+
+HotelT = TypeVar('HotelT')
+
+# 倒排表类型：无符号 32 位整数数组，每个 posting 4 字节
+Postings = array
+
+
+def new_postings() -> Postings:
+    """创建空倒排表"""
+    return array('I')
+
+
+class HotelStore(Generic[HotelT]):
+    """按 doc id 存取酒店
+
+    doc id 就是酒店在加载顺序中的下标，因此通过 doc id 取酒店是 O(1) 的列表访问，
+    并且与按 enumerate(hotels) 构建的其他索引（如补全前缀树）共用同一套编号。
+    """
+
+    def __init__(self, hotels: Sequence[HotelT]):
+        self._hotels: List[HotelT] = list(hotels)
+        self._doc_ids: Dict[str, int] = {}
+        for doc_id, hotel in enumerate(self._hotels):
+            # 重复的 hotel_id 以第一次出现的记录为准
+            self._doc_ids.setdefault(hotel.hotel_id, doc_id)
+
+    def __len__(self) -> int:
+        return len(self._hotels)
+
+    def __getitem__(self, doc_id: int) -> HotelT:
+        return self._hotels[doc_id]
+
+    def __iter__(self) -> Iterator[HotelT]:
+        return iter(self._hotels)
+
+    def doc_id(self, hotel_id: str) -> Optional[int]:
+        """酒店ID转 doc id"""
+        return self._doc_ids.get(hotel_id)
+
+    def get(self, hotel_id: str) -> Optional[HotelT]:
+        """按酒店ID获取酒店"""
+        doc_id = self._doc_ids.get(hotel_id)
+        return self._hotels[doc_id] if doc_id is not None else None
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式酒店表
+每个字段一列：数值字段存放在按取值范围选定类型的 array 中，城市、区域、国家、星级、价格区间等取值很少的字段
+按字典编码（每种取值只保存一份，每行只存一个整数编码），其余字符串一列一个列表。
+字典编码列的分布统计直接对编码做 bincount。
+通过 doc id 取到的是只有 __slots__ 的行视图，字段按属性访问，与原来的酒店数据类用法相同
+"""
+
+import dataclasses
+import sys
+from array import array
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Type
+
+import numpy as np
+
+# 按字典编码存放的字段（取值种类远少于酒店数）
+CATEGORICAL_FIELDS = ('country', 'city_name_cn', 'city_name_en', 'city_name_jp', 'region_name',
+                      'price_range', 'star_rating')
+
+# 不保存的字段（与索引文件一致，原始 Excel 行不保存），行视图中读取时为 None
+SKIPPED_FIELDS = ('original_data',)
+
+# 整数列依次尝试的类型及其取值范围
+_INT_TYPECODES = [(typecode, -(1 << (8 * array(typecode).itemsize - 1)), (1 << (8 * array(typecode).itemsize - 1)) - 1)
+                  for typecode in ('b', 'h', 'i', 'q')]
+
+
+def _int_array(values: List[int]) -> array:
+    """能容纳全部取值的最小有符号整数数组"""
+    low, high = (min(values), max(values)) if values else (0, 0)
+    for typecode, minimum, maximum in _INT_TYPECODES:
+        if minimum <= low and high <= maximum:
+            return array(typecode, values)
+    raise OverflowError("整数超出 64 位范围")
+
+
+class CategoricalColumn(Sequence):
+    """字典编码的列：values 为不同取值（按首次出现顺序），codes 为每行取值的下标"""
+
+    def __init__(self, values: Iterable):
+        encoding: Dict[Any, int] = {}
+        codes = [encoding[value] if value in encoding else encoding.setdefault(value, len(encoding))
+                 for value in values]
+        self.values: List = list(encoding)
+        self.codes = array('H' if len(self.values) <= 1 << 16 else 'I', codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int):
+        return self.values[self.codes[index]]
+
+    def __iter__(self) -> Iterator:
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def counts(self) -> Dict[Any, int]:
+        """{取值: 行数}，按取值首次出现的顺序"""
+        return category_counts({'column': self})['column']
+
+
+def categorical_columns(hotels: Sequence, defaults: Dict[str, Any]) -> Dict[str, CategoricalColumn]:
+    """取 hotels 中 defaults 各字段的字典编码列
+
+    hotels 为 HotelTable 时直接使用表中已有的编码列；否则（酒店对象或 JSON 字典）逐字段编码，
+    缺少的字段取 defaults 中的值。
+    """
+    columns = {}
+    first = next(iter(hotels), None)
+    is_dict = isinstance(first, dict)
+    for name, default in defaults.items():
+        column = hotels.columns.get(name) if isinstance(hotels, HotelTable) else None
+        if not isinstance(column, CategoricalColumn):
+            if is_dict:
+                column = CategoricalColumn(hotel.get(name, default) for hotel in hotels)
+            elif first is None or hasattr(first, name):
+                column = CategoricalColumn(map(attrgetter(name), hotels))
+            else:
+                column = CategoricalColumn(getattr(hotel, name, default) for hotel in hotels)
+        columns[name] = column
+    return columns
+
+
+def category_counts(columns: Dict[str, CategoricalColumn]) -> Dict[str, Dict[Any, int]]:
+    """各字典编码列的 {取值: 行数}
+
+    各列的编码加上前面各列取值数之和作为偏移后拼接，一次 bincount 得到全部计数再按列切开。
+    """
+    offsets = [0]
+    for column in columns.values():
+        offsets.append(offsets[-1] + len(column.values))
+    if not columns:
+        return {}
+    codes = np.concatenate([np.frombuffer(column.codes, dtype=column.codes.typecode).astype(np.int64) + offset
+                            for column, offset in zip(columns.values(), offsets)])
+    counts = np.bincount(codes, minlength=offsets[-1]).tolist()
+    return {name: dict(zip(column.values, counts[offset:offset + len(column.values)]))
+            for (name, column), offset in zip(columns.items(), offsets)}
+
+
+def top_counts(counts: Dict[Any, int], limit: int) -> List[tuple]:
+    """按行数降序的前 limit 个 (取值, 行数)，行数相同时保持首次出现的顺序"""
+    return sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def hotel_statistics(hotels: Sequence) -> Dict:
+    """城市、星级、价格区间、国家的分布（DataLoader / ExcelDataLoader.get_data_statistics 的结果格式）"""
+    if not hotels:
+        return {}
+    counts = category_counts(categorical_columns(
+        hotels, {'city_name_cn': None, 'star_rating': None, 'price_range': None, 'country': None}))
+    cities = {city: {'count': count} for city, count in counts['city_name_cn'].items()}
+    return {
+        'total_hotels': len(hotels),
+        'total_cities': len(cities),
+        'cities': cities,
+        'star_ratings': counts['star_rating'],
+        'price_ranges': counts['price_range'],
+        'countries': list(counts['country'])
+    }
+
+
+class FloatColumn(Sequence):
+    """可为空的浮点列：None 存为 NaN"""
+
+    def __init__(self, values: Iterable[Optional[float]]):
+        nan = float('nan')
+        self.data = array('d', (nan if value is None else value for value in values))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index: int) -> Optional[float]:
+        value = self.data[index]
+        return value if value == value else None
+
+    def __iter__(self) -> Iterator[Optional[float]]:
+        return (value if value == value else None for value in self.data)
+
+
+def _build_column(name: str, field_type: Any, values: List) -> Sequence:
+    """按字段类型和取值选择列的存储方式；取值与声明类型不符时退回普通列表"""
+    try:
+        if name in CATEGORICAL_FIELDS:
+            return CategoricalColumn(values)
+        if field_type is int and all(type(value) is int for value in values):
+            return _int_array(values)
+        if field_type in (float, Optional[float]):
+            return FloatColumn(values)
+    except (TypeError, OverflowError):
+        pass
+    return values
+
+
+class HotelRow:
+    """HotelTable 中一家酒店的只读视图
+
+    只有 table 和 doc_id 两个槽位，没有 __dict__；各字段是所属表的行视图子类上的属性，
+    每次访问时从对应的列中读取。
+    """
+
+    __slots__ = ('table', 'doc_id')
+
+    def __init__(self, table: 'HotelTable', doc_id: int):
+        self.table = table
+        self.doc_id = doc_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        """全部保存的字段"""
+        return {name: getattr(self, name) for name in self.table.fields}
+
+    def to_record(self):
+        """还原为原来的酒店数据类对象"""
+        return self.table.record_type(**self.to_dict())
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HotelRow):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={value!r}" for name, value in self.to_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+def _column_getter(column: Sequence) -> Callable:
+    """行视图属性的读取函数：直接闭包引用列的底层数组，减少一次方法调用"""
+    if isinstance(column, CategoricalColumn):
+        values, codes = column.values, column.codes
+        return lambda row: values[codes[row.doc_id]]
+    if isinstance(column, FloatColumn):
+        data = column.data
+
+        def get_float(row):
+            value = data[row.doc_id]
+            return value if value == value else None
+        return get_float
+    return lambda row: column[row.doc_id]
+
+
+class HotelTable(Sequence):
+    """列式酒店表，接口与 HotelStore 相同（按 doc id 取行、按 hotel_id 查 doc id）"""
+
+    def __init__(self, columns: Dict[str, Sequence], record_type: Type):
+        self.record_type = record_type
+        self.fields = list(columns)
+        self.columns = columns
+        self._length = len(next(iter(columns.values()))) if columns else 0
+
+        hotel_ids = columns['hotel_id']
+        self._doc_ids: Dict[str, int] = {}
+        for doc_id, hotel_id in enumerate(hotel_ids):
+            # 重复的 hotel_id 以第一次出现的记录为准（与 HotelStore 一致）
+            self._doc_ids.setdefault(hotel_id, doc_id)
+
+        attributes = {name: property(_column_getter(column)) for name, column in columns.items()}
+        attributes.update({name: property(lambda row: None) for name in SKIPPED_FIELDS if name not in columns})
+        attributes['__slots__'] = ()
+        self.row_type = type(f"{record_type.__name__}Row", (HotelRow,), attributes)
+
+    @classmethod
+    def from_records(cls, records: Iterable, record_type: Optional[Type] = None) -> 'HotelTable':
+        """由酒店数据类对象创建（record_type 默认取第一条记录的类型）"""
+        records = list(records)
+        record_type = record_type or type(records[0])
+        return cls.from_columns(
+            {name: [getattr(record, name) for record in records] for name in cls._field_names(record_type)},
+            record_type)
+
+    @classmethod
+    def from_dicts(cls, hotels: Iterable[Dict], record_type: Type) -> 'HotelTable':
+        """由 save_to_json 格式的字典创建，不经过逐个酒店对象；缺少的字段取数据类的默认值"""
+        hotels = hotels if isinstance(hotels, list) else list(hotels)
+        columns = {}
+        for field in dataclasses.fields(record_type):
+            if field.name in SKIPPED_FIELDS:
+                continue
+            if field.default is not dataclasses.MISSING:
+                columns[field.name] = [hotel.get(field.name, field.default) for hotel in hotels]
+            else:
+                columns[field.name] = [hotel[field.name] for hotel in hotels]
+        return cls.from_columns(columns, record_type)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, List], record_type: Type) -> 'HotelTable':
+        """由 {字段名: 取值列表} 创建，按字段类型压缩各列"""
+        types = {field.name: field.type for field in dataclasses.fields(record_type)}
+        return cls({name: _build_column(name, types.get(name), values) for name, values in columns.items()},
+                   record_type)
+
+    @staticmethod
+    def _field_names(record_type: Type) -> List[str]:
+        return [field.name for field in dataclasses.fields(record_type) if field.name not in SKIPPED_FIELDS]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, doc_id):
+        """按 doc id 取行视图；切片返回行视图列表"""
+        if isinstance(doc_id, slice):
+            return [self.row_type(self, index) for index in range(*doc_id.indices(self._length))]
+        if not -self._length <= doc_id < self._length:
+            raise IndexError(doc_id)
+        return self.row_type(self, doc_id % self._length if doc_id < 0 else doc_id)
+
+    def __iter__(self) -> Iterator[HotelRow]:
+        row_type = self.row_type
+        for doc_id in range(self._length):
+            yield row_type(self, doc_id)
+
+    def doc_id(self, hotel_id: str) -> Optional[int]:
+        """酒店ID转 doc id"""
+        return self._doc_ids.get(hotel_id)
+
+    def get(self, hotel_id: str) -> Optional[HotelRow]:
+        """按酒店ID获取酒店"""
+        doc_id = self._doc_ids.get(hotel_id)
+        return self.row_type(self, doc_id) if doc_id is not None else None
+
+    def column(self, name: str) -> Sequence:
+        """整列取值（解码后的只读序列）"""
+        return self.columns[name]
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """各列及 hotel_id 索引占用的内存（字节，包括列中的字符串对象，同一对象只计一次）"""
+        seen = set()
+
+        def size(obj) -> int:
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        report = {}
+        for name, column in self.columns.items():
+            if isinstance(column, CategoricalColumn):
+                report[name] = size(column.codes) + size(column.values) + sum(map(size, column.values))
+            elif isinstance(column, FloatColumn):
+                report[name] = size(column.data)
+            elif isinstance(column, array):
+                report[name] = size(column)
+            else:
+                report[name] = size(column) + sum(map(size, column))
+        report['hotel_id_index'] = size(self._doc_ids)
+        return report
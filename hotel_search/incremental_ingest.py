@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel增量导入
+导出的 JSON 旁边保存每一行的内容指纹；重新导入时按指纹匹配上次的行，只对新增和变化的行
+执行 _parse_row_to_hotel，未变化的行直接沿用 JSON 中已有的酒店记录，删除的行从数据集中去掉。
+按内容而不是行号匹配，中间插入或删除一行不会让后面所有的行都被当成变化。
+数据集内容没有变化时 JSON 文件保持原样，索引缓存（index_cache）据此直接复用已有的索引文件
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from excel_data_loader import ExcelDataLoader, ExcelHotelData
+from index_cache import config_digest, file_digest
+
+# 指纹文件的格式版本
+FINGERPRINT_VERSION = 2
+
+
+def row_fingerprint(row: Dict) -> str:
+    """一行的内容指纹：列名和单元格取值（含类型）的哈希"""
+    return hashlib.blake2b(repr(list(row.items())).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def row_keys(hotel_ids: List[str]) -> List[str]:
+    """报告中行的键：hotel_id；同一个ID在表中重复出现时依次加 "#2"、"#3" 后缀"""
+    seen: Dict[str, int] = {}
+    keys = []
+    for hotel_id in hotel_ids:
+        count = seen.get(hotel_id, 0) + 1
+        seen[hotel_id] = count
+        keys.append(hotel_id if count == 1 else f"{hotel_id}#{count}")
+    return keys
+
+
+@dataclass
+class IngestDelta:
+    """一次增量导入的结果"""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    # 解析失败（跳过且不记录指纹，下次重试）的行数
+    failed: int = 0
+    # 需要全量解析的原因；None 表示按指纹增量处理
+    full_reason: Optional[str] = None
+    # 行的集合没有变化，但顺序（或没有ID列时按行号生成的ID）变了
+    reordered: bool = False
+    # Excel 文件内容与上次完全相同，没有读取工作表
+    skipped: bool = False
+    seconds: float = 0.0
+
+    @property
+    def parsed(self) -> int:
+        return len(self.added) + len(self.changed) + self.failed
+
+    @property
+    def dataset_changed(self) -> bool:
+        return bool(self.added or self.changed or self.removed or self.reordered)
+
+    def summary(self) -> str:
+        if self.skipped:
+            return f"♻️ Excel 文件未变化，跳过导入 ({self.seconds * 1000:.0f}毫秒)"
+        mode = f"全量解析（{self.full_reason}）" if self.full_reason else "增量"
+        return (f"🔁 {mode}: 新增 {len(self.added)}, 变化 {len(self.changed)}, 删除 {len(self.removed)}, "
+                f"未变化 {self.unchanged}, 解析失败 {self.failed} ({self.seconds:.2f}秒)")
+
+
+class IncrementalIngest:
+    """把一个 Excel 文件增量导入到 save_to_json 格式的数据集
+
+    指纹文件为 <json>.fingerprints.json，记录 Excel 文件哈希、解析配置哈希和按行顺序的行指纹列表
+    （与数据集中的酒店一一对应）；解析配置变化、指纹文件或数据集缺失时退化为全量解析。
+    指纹文件在数据集写完之后才写入，中途中断时下次导入仍会与旧指纹比较，重新解析这些行。
+
+    行按内容指纹匹配，内容相同的多行按出现次序依次匹配。没有ID列时 hotel_id 由行号生成，
+    行的位置变化后只改写沿用记录的 hotel_id（解析结果中只有它与行号有关），不重新解析。
+    """
+
+    def __init__(self, loader: ExcelDataLoader, json_path: str = "data/excel_hotels.json"):
+        self.loader = loader
+        self.json_path = json_path
+        self.fingerprint_path = json_path + '.fingerprints.json'
+
+    def load_state(self) -> Optional[Dict]:
+        """读取指纹文件，不存在或无法解析时返回 None"""
+        try:
+            with open(self.fingerprint_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return state if state.get('version') == FINGERPRINT_VERSION else None
+
+    def _load_dataset(self) -> Optional[List[Dict]]:
+        """已保存的数据集中的酒店字典，不存在或无法解析时返回 None"""
+        try:
+            with open(self.json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)['hotels']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def run(self) -> IngestDelta:
+        """比较指纹，只解析新增和变化的行，把结果写回数据集和指纹文件"""
+        start = time.perf_counter()
+        delta = IngestDelta()
+        source_digest = file_digest(self.loader.excel_file)
+        parse_config = config_digest(self.loader.parse_config())
+
+        state = self.load_state()
+        saved = self._load_dataset() if state is not None else None
+        if state is None:
+            delta.full_reason = "没有指纹文件"
+        elif state.get('config_digest') != parse_config:
+            delta.full_reason = "解析配置变化"
+        elif saved is None:
+            delta.full_reason = "数据集不存在"
+        elif state.get('source_digest') == source_digest:
+            delta.skipped = True
+            delta.unchanged = len(state['rows'])
+            delta.seconds = time.perf_counter() - start
+            return delta
+        elif len(saved) != len(state['rows']):
+            delta.full_reason = "数据集与指纹文件不符"
+        old_rows: List[str] = state['rows'] if delta.full_reason is None else []
+        saved = saved if delta.full_reason is None else []
+
+        # {行指纹: 上次的酒店字典}，内容相同的多行倒序存放，pop() 取出最先出现的一行
+        pending: Dict[str, List[Dict]] = {}
+        for fingerprint, hotel in zip(reversed(old_rows), reversed(saved)):
+            pending.setdefault(fingerprint, []).append(hotel)
+
+        hotels: List[Dict] = []
+        rows: List[str] = []
+        # 重新解析的酒店在 hotels 中的下标
+        parsed: List[int] = []
+        for index, row in self.loader.iter_excel_rows():
+            fingerprint = row_fingerprint(row)
+            matches = pending.get(fingerprint)
+            if matches:
+                hotel = matches.pop()
+                hotel_id = self.loader._extract_hotel_id(row, index)
+                if hotel['hotel_id'] != hotel_id:
+                    hotel = {**hotel, 'hotel_id': hotel_id}
+                delta.unchanged += 1
+            else:
+                parsed_hotel = self.loader._parse_row_to_hotel(row, index)
+                if parsed_hotel is None:
+                    delta.failed += 1
+                    continue
+                hotel = self.loader._hotel_to_dict(parsed_hotel)
+                parsed.append(len(hotels))
+            hotels.append(hotel)
+            rows.append(fingerprint)
+
+        # 没有匹配上的旧行与重新解析的行键相同时记为变化，否则分别记为删除和新增
+        unmatched = {id(hotel) for matches in pending.values() for hotel in matches}
+        old_keys = [key for key, hotel in zip(row_keys([hotel['hotel_id'] for hotel in saved]), saved)
+                    if id(hotel) in unmatched]
+        new_keys = row_keys([hotel['hotel_id'] for hotel in hotels])
+        old_key_set = set(old_keys)
+        for position in parsed:
+            key = new_keys[position]
+            (delta.changed if key in old_key_set else delta.added).append(key)
+        changed = set(delta.changed)
+        delta.removed = [key for key in old_keys if key not in changed]
+        delta.reordered = not (delta.added or delta.changed or delta.removed) and delta.full_reason is None and \
+            (rows != old_rows or [hotel['hotel_id'] for hotel in hotels] != [hotel['hotel_id'] for hotel in saved])
+
+        # 全量解析，或者有新增 / 变化 / 删除时才重写数据集；否则保持原文件，依赖它的索引缓存继续有效
+        if delta.full_reason is not None or delta.dataset_changed:
+            if not self.loader.save_to_json((ExcelHotelData(**hotel) for hotel in hotels), self.json_path):
+                raise OSError(f"无法写入数据集: {self.json_path}")
+        self._write_state(source_digest, parse_config, rows)
+        delta.seconds = time.perf_counter() - start
+        return delta
+
+    def _write_state(self, source_digest: str, parse_config: str, rows: List[str]):
+        """写入指纹文件（先写临时文件再原子替换）"""
+        state = {
+            'version': FINGERPRINT_VERSION,
+            'source': self.loader.excel_file,
+            'source_digest': source_digest,
+            'config_digest': parse_config,
+            'rows': rows
+        }
+        temp_path = self.fingerprint_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, self.fingerprint_path)
+
+
+if __name__ == "__main__":
+    # 用法: python incremental_ingest.py [Excel文件] [数据集JSON] [索引文件]
+    excel_file = sys.argv[1] if len(sys.argv) > 1 else "../日本东京酒店v2.xlsx"
+    json_path = sys.argv[2] if len(sys.argv) > 2 else "data/excel_hotels.json"
+    print(IncrementalIngest(ExcelDataLoader(excel_file), json_path).run().summary())
+
+    if len(sys.argv) > 3:
+        # 索引文件以数据集 JSON 为输入：数据集没有重写时清单中的哈希不变，直接复用
+        from test_excel_hotels import ExcelHotelSearchSystem
+        ExcelHotelSearchSystem.load_cached(sys.argv[3], json_path)
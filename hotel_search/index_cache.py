@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+索引文件缓存
+索引文件旁边保存一个清单（manifest），记录构建时输入文件的内容哈希、归一化与建索引配置的哈希、
+索引文件格式版本以及各阶段的构建耗时；三者都没有变化时直接复用已有的索引文件，任何一项变化才重新构建
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+from index_file import INDEX_FORMAT_VERSION
+
+# 清单文件自身的格式版本
+MANIFEST_VERSION = 1
+
+# 计算文件哈希时每次读取的字节数
+_HASH_CHUNK = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_digest(config: Dict) -> str:
+    """配置的 SHA-256（键排序后的 JSON，与字典插入顺序无关）"""
+    data = json.dumps(config, ensure_ascii=False, sort_keys=True, default=sorted)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class IndexArtifactCache:
+    """按内容哈希判断索引文件能否复用
+
+    - inputs 为构建索引读取的输入文件（Excel / JSON）
+    - config 为影响索引内容的配置（停用词、拼音表、编辑距离等），只保存其哈希
+    - 清单在索引文件写完之后才写入，构建中断时不会留下看似有效的清单
+    """
+
+    def __init__(self, artifact_path: str, inputs: Sequence[str], config: Dict):
+        self.artifact_path = artifact_path
+        self.manifest_path = artifact_path + '.manifest.json'
+        self.inputs = list(inputs)
+        self.config = config
+
+    def load_manifest(self) -> Optional[Dict]:
+        """读取清单，不存在或无法解析时返回 None"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def input_digests(self) -> Dict[str, str]:
+        """{输入文件路径: 内容哈希}"""
+        return {path: file_digest(path) for path in self.inputs}
+
+    def stale_reason(self) -> Optional[str]:
+        """索引文件可以复用时返回 None，否则返回需要重新构建的原因"""
+        manifest = self.load_manifest()
+        if manifest is None:
+            return "没有构建清单"
+        if manifest.get('manifest_version') != MANIFEST_VERSION:
+            return "清单格式版本变化"
+        if manifest.get('index_format_version') != INDEX_FORMAT_VERSION:
+            return f"索引格式版本变化 ({manifest.get('index_format_version')} -> {INDEX_FORMAT_VERSION})"
+        if manifest.get('config_digest') != config_digest(self.config):
+            return "归一化或建索引配置变化"
+
+        try:
+            artifact_size = os.path.getsize(self.artifact_path)
+        except OSError:
+            return "索引文件不存在"
+        if artifact_size != manifest.get('artifact_size'):
+            return "索引文件大小与清单不符"
+
+        recorded = manifest.get('inputs', {})
+        if sorted(recorded) != sorted(self.inputs):
+            return "输入文件列表变化"
+        for path in self.inputs:
+            try:
+                digest = file_digest(path)
+            except OSError:
+                return f"输入文件无法读取: {path}"
+            if digest != recorded[path]:
+                return f"输入文件内容变化: {path}"
+        return None
+
+    def write_manifest(self, stage_timings: Dict[str, float], input_digests: Optional[Dict[str, str]] = None):
+        """索引文件写完后写入清单（先写临时文件再原子替换）"""
+        manifest = {
+            'manifest_version': MANIFEST_VERSION,
+            'index_format_version': INDEX_FORMAT_VERSION,
+            'inputs': input_digests if input_digests is not None else self.input_digests(),
+            'config_digest': config_digest(self.config),
+            'artifact_size': os.path.getsize(self.artifact_path),
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'stage_timings': {stage: round(seconds, 4) for stage, seconds in stage_timings.items()}
+        }
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+
+def format_timings(stage_timings: Dict[str, float]) -> List[str]:
+    """各阶段耗时，按耗时降序排列"""
+    return [f"{stage} {seconds * 1000:.0f}毫秒"
+            for stage, seconds in sorted(stage_timings.items(), key=lambda item: -item[1])]
@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+二进制索引文件
+离线把酒店记录、建议索引（归一化词面与倒排表）、静态打分特征、删除邻域索引、
+BK 树和补全前缀树写入一个带版本号和段偏移表的文件；服务启动时用 mmap 打开，
+各结构直接在映射的内存上查询，只有被访问到的页才会从磁盘读入，不需要预先反序列化
+
+文件布局（小节均按 8 字节对齐，整数按本机字节序）：
+    头部    MAGIC(8) | 格式版本 uint32 | 段数 uint32
+    段目录  每段 名称(16) | 偏移 uint64 | 长度 uint64
+    段数据  字符串表为 "<名称>.off"（uint64 偏移，n + 1 个）+ "<名称>" （UTF-8 拼接）；
+            变长整数列表同理为 "<名称>.off" + "<名称>"（uint32 / int64 数组）
+"""
+
+import dataclasses
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, chain
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Type
+
+import numpy as np
+
+from bk_tree import BKTables, BKTreeBase, _search_exhausted
+from completion_trie import CompletionTrieBase, TrieTables, _rank
+from deletion_index import DeletionIndexBase, DeletionTables
+from score_features import StaticScoreFeatures
+from string_compute_utils import StringComputeUtils
+from suggest_index import SortedPrefixIndex
+
+MAGIC = b'HSIDX\x00\x00\x00'
+
+# 文件格式版本，布局不兼容的修改必须加一
+INDEX_FORMAT_VERSION = 1
+
+# 不写入索引文件的酒店字段（与 save_to_json 一致，原始 Excel 行不保存）
+SKIPPED_FIELDS = ('original_data',)
+
+_HEADER = struct.Struct('<8sII')
+_SECTION = struct.Struct('<16sQQ')
+_ALIGNMENT = 8
+
+
+def _string_table(strings: Sequence[str]) -> Tuple[bytes, bytes]:
+    """字符串表：(偏移数组, UTF-8 拼接数据)"""
+    offsets = array('Q', [0])
+    chunks = []
+    position = 0
+    for text in strings:
+        data = text.encode('utf-8')
+        chunks.append(data)
+        position += len(data)
+        offsets.append(position)
+    return offsets.tobytes(), b''.join(chunks)
+
+
+def _ragged(lists: Sequence[Sequence[int]], typecode: str = 'I') -> Tuple[bytes, bytes]:
+    """变长整数列表：(偏移数组, 拼接后的整数数组)"""
+    offsets = array('Q', accumulate(map(len, lists), initial=0))
+    values = array(typecode, chain.from_iterable(lists))
+    return offsets.tobytes(), values.tobytes()
+
+
+class MappedStrings(Sequence):
+    """映射内存中的字符串表，按下标解码，支持 bisect"""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def find(self, text: str) -> Optional[int]:
+        """在已排序的字符串表中查找，返回下标"""
+        index = bisect_left(self, text)
+        if index < len(self) and self[index] == text:
+            return index
+        return None
+
+
+class MappedRagged:
+    """映射内存中的变长整数列表，第 i 项为一个 memoryview 切片"""
+
+    def __init__(self, offsets: memoryview, values: memoryview):
+        self._offsets = offsets
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> memoryview:
+        return self._values[self._offsets[index]:self._offsets[index + 1]]
+
+
+class MappedHotelStore(Sequence):
+    """与 HotelStore 接口相同，酒店记录在第一次访问时才从映射内存中解码"""
+
+    def __init__(self, records: MappedStrings, hotel_ids: MappedStrings, hotel_docs: memoryview,
+                 record_type: Type, fields: Sequence[str]):
+        self._records = records
+        self._hotel_ids = hotel_ids
+        self._hotel_docs = hotel_docs
+        self._record_type = record_type
+        self._fields = list(fields)
+        self._hotels: List = [None] * len(records)
+
+    def __len__(self) -> int:
+        return len(self._hotels)
+
+    def __getitem__(self, doc_id: int):
+        hotel = self._hotels[doc_id]
+        if hotel is None:
+            values = json.loads(self._records[doc_id])
+            hotel = self._hotels[doc_id] = self._record_type(**dict(zip(self._fields, values)))
+        return hotel
+
+    def __iter__(self):
+        for doc_id in range(len(self._hotels)):
+            yield self[doc_id]
+
+    def doc_id(self, hotel_id: str) -> Optional[int]:
+        """酒店ID转 doc id"""
+        index = self._hotel_ids.find(hotel_id)
+        return self._hotel_docs[index] if index is not None else None
+
+    def get(self, hotel_id: str):
+        """按酒店ID获取酒店"""
+        doc_id = self.doc_id(hotel_id)
+        return self[doc_id] if doc_id is not None else None
+
+
+class MappedSuggestIndex(Mapping):
+    """建议索引 {归一化词面: 倒排表}，键按字典序存放，迭代顺序与原索引的插入顺序一致"""
+
+    def __init__(self, keys: MappedStrings, postings: MappedRagged, key_order: memoryview, key_by_rank: memoryview):
+        self.keys_sorted = keys
+        self._postings = postings
+        self._key_order = key_order
+        self._key_by_rank = key_by_rank
+
+    def __len__(self) -> int:
+        return len(self.keys_sorted)
+
+    def __getitem__(self, key: str) -> memoryview:
+        index = self.keys_sorted.find(key)
+        if index is None:
+            raise KeyError(key)
+        return self._postings[index]
+
+    def __contains__(self, key) -> bool:
+        return self.keys_sorted.find(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for index in self._key_by_rank:
+            yield self.keys_sorted[index]
+
+    def key_order(self) -> Mapping[str, int]:
+        """{键: 插入顺序}，供 SortedPrefixIndex 使用"""
+        return _KeyOrder(self.keys_sorted, self._key_order)
+
+
+class _KeyOrder(Mapping):
+    """按排序键表查找键的插入顺序"""
+
+    def __init__(self, keys: MappedStrings, key_order: memoryview):
+        self._keys = keys
+        self._key_order = key_order
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __getitem__(self, key: str) -> int:
+        index = self._keys.find(key)
+        if index is None:
+            raise KeyError(key)
+        return self._key_order[index]
+
+    def __contains__(self, key) -> bool:
+        return self._keys.find(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+
+class MappedDeletionIndex(DeletionIndexBase):
+    """存储在映射内存中的只读删除邻域索引，lookup 与 DeletionIndex 完全一致"""
+
+    def __init__(self, surfaces: MappedStrings, surface_lengths: memoryview, prefix_surfaces: MappedRagged,
+                 variants: MappedStrings, variant_prefixes: MappedRagged, max_distance: int, prefix_length: int):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._surfaces = surfaces
+        self._surface_lengths = surface_lengths
+        self._prefix_surfaces = prefix_surfaces
+        self._deletes = variants
+        self._variant_prefixes = variant_prefixes
+
+    @property
+    def delete_count(self) -> int:
+        """删除变体（索引键）数量"""
+        return len(self._deletes)
+
+    def tables(self) -> DeletionTables:
+        """从映射的各段导出索引数据（前缀取每个前缀下第一个词面的前 prefix_length 个字符）"""
+        surfaces = list(self._surfaces)
+        prefix_surfaces = [list(self._prefix_surfaces[index]) for index in range(len(self._prefix_surfaces))]
+        prefixes = [surfaces[surface_ids[0]][:self.prefix_length] for surface_ids in prefix_surfaces]
+        deletes = {variant: list(self._variant_prefixes[index]) for index, variant in enumerate(self._deletes)}
+        return DeletionTables(surfaces, prefixes, prefix_surfaces, deletes)
+
+    def _lookup_prefixes(self, variants: Iterable[str]) -> Set[int]:
+        prefix_ids: Set[int] = set()
+        for variant in variants:
+            index = self._deletes.find(variant)
+            if index is not None:
+                prefix_ids.update(self._variant_prefixes[index])
+        return prefix_ids
+
+    def _candidate_ids(self, prefix_ids: Iterable[int], lengths: range) -> List[int]:
+        # 前缀下的词面按长度升序存放
+        surface_lengths = self._surface_lengths
+        candidates = []
+        for prefix_id in prefix_ids:
+            for surface_id in self._prefix_surfaces[prefix_id]:
+                length = surface_lengths[surface_id]
+                if length >= lengths.stop:
+                    break
+                if length >= lengths.start:
+                    candidates.append(surface_id)
+        return candidates
+
+
+class MappedBKTree(BKTreeBase):
+    """存储在映射内存中的只读 BK 树，search 的结果与 BKTree 完全一致"""
+
+    def __init__(self, words: MappedStrings, max_edges: memoryview, child_edges: MappedRagged,
+                 child_nodes: MappedRagged):
+        self._words = words
+        self._max_edges = max_edges
+        self._child_edges = child_edges
+        self._child_nodes = child_nodes
+        self._size = len(words)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def tables(self) -> BKTables:
+        """从映射的各段导出树结构"""
+        children = [list(zip(self._child_edges[node], self._child_nodes[node])) for node in range(self._size)]
+        return BKTables(list(self._words), list(self._max_edges), children)
+
+    def search(self, query: str, max_distance: int, max_nodes: Optional[int] = None,
+               deadline: Optional[float] = None) -> List[str]:
+        """返回与 query 编辑距离不超过 max_distance 的名称，按距离、插入顺序排列（遍历顺序与 BKTree 相同）"""
+        self.last_search_truncated = False
+        if not self._size or not query or max_distance < 0:
+            return []
+
+        matches: List[Tuple[int, int]] = []
+        stack = [0]
+        visited = 0
+
+        while stack:
+            node = stack.pop()
+
+            limit = max_distance + self._max_edges[node]
+            distance = StringComputeUtils.compute_levenshtein_distance(query, self._words[node], limit)
+            if distance <= max_distance:
+                matches.append((distance, node))
+
+            low, high = distance - max_distance, distance + max_distance
+            for edge, child in zip(self._child_edges[node], self._child_nodes[node]):
+                if low <= edge <= high:
+                    stack.append(child)
+
+            visited += 1
+            if _search_exhausted(visited, max_nodes, deadline):
+                self.last_search_truncated = bool(stack)
+                break
+
+        matches.sort()
+        return [self._words[node] for _, node in matches]
+
+
+class MappedCompletionTrie(CompletionTrieBase):
+    """存储在映射内存中的只读补全前缀树，查询结果与 CompletionTrie 完全一致"""
+
+    def __init__(self, top_k: int, child_chars: MappedRagged, child_nodes: MappedRagged,
+                 top_weights: MappedRagged, top_docs: MappedRagged,
+                 entry_docs: MappedRagged, entry_weights: MappedRagged):
+        self.top_k = top_k
+        self._child_chars = child_chars
+        self._child_nodes = child_nodes
+        self._top_weights = top_weights
+        self._top_docs = top_docs
+        self._entry_docs = entry_docs
+        self._entry_weights = entry_weights
+
+    def tables(self) -> TrieTables:
+        """从映射的各段导出树结构（节点编号与写入时相同）"""
+        children, top, entries = [], [], []
+        for node in range(len(self._child_chars)):
+            children.append([(chr(char), child)
+                             for char, child in zip(self._child_chars[node], self._child_nodes[node])])
+            top.append(list(zip(self._top_weights[node], self._top_docs[node])))
+            entries.append(list(zip(self._entry_docs[node], self._entry_weights[node])))
+        return TrieTables(children, top, entries)
+
+    def _find(self, prefix: str) -> Optional[int]:
+        """沿前缀查找节点编号（子节点按字符排序，二分查找）"""
+        node = 0
+        for char in prefix:
+            chars = self._child_chars[node]
+            index = bisect_left(chars, ord(char))
+            if index == len(chars) or chars[index] != ord(char):
+                return None
+            node = self._child_nodes[node][index]
+        return node
+
+    def lookup_weighted(self, prefix: str, count: int) -> List[Tuple[int, int]]:
+        """返回以 prefix 开头的词面中权重最高的 count 个 (weight, doc_id)"""
+        node = self._find(prefix)
+        if node is None or count <= 0:
+            return []
+        if count <= self.top_k:
+            return list(zip(self._top_weights[node][:count], self._top_docs[node][:count]))
+        return self._collect(node, count)
+
+    def _collect(self, node: int, count: int) -> List[Tuple[int, int]]:
+        """请求数量超过缓存的 top-k 时，遍历整棵子树"""
+        best: Dict[int, int] = {}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for doc_id, weight in zip(self._entry_docs[current], self._entry_weights[current]):
+                if weight > best.get(doc_id, -1):
+                    best[doc_id] = weight
+            stack.extend(self._child_nodes[current])
+        items = [(weight, doc_id) for doc_id, weight in best.items()]
+        return heapq.nsmallest(count, items, key=_rank)
+
+
+def write_index_file(path: str, store: Sequence, suggest_index: Mapping[str, Sequence[int]],
+                     static_features: StaticScoreFeatures, deletion_index: DeletionIndexBase,
+                     bk_tree: BKTreeBase, completion_trie: CompletionTrieBase) -> int:
+    """把已经构建好的各结构写入索引文件，返回文件大小（字节）
+
+    各结构可以是内存中构建的，也可以来自 MappedIndexFile（从映射的各段导出后重新写入）。
+    """
+    # 列式酒店表（HotelTable）自带记录类型，按 doc id 取到的只是行视图
+    record_type = getattr(store, 'record_type', None) or (type(store[0]) if len(store) else None)
+    fields = [field.name for field in dataclasses.fields(record_type)
+              if field.name not in SKIPPED_FIELDS] if record_type else []
+
+    sections: Dict[str, bytes] = {}
+
+    def add_strings(name: str, strings: Sequence[str]):
+        sections[name + '.off'], sections[name] = _string_table(strings)
+
+    def add_ragged(name: str, lists: Sequence[Sequence[int]], typecode: str = 'I'):
+        sections[name + '.off'], sections[name] = _ragged(lists, typecode)
+
+    # 酒店记录：每家酒店一个 JSON 数组，按 fields 顺序存放字段值
+    add_strings('records', [json.dumps([getattr(hotel, field) for field in fields], ensure_ascii=False)
+                            for hotel in store])
+    first_doc: Dict[str, int] = {}
+    for doc_id, hotel in enumerate(store):
+        # 重复的 hotel_id 以第一次出现的记录为准（与 HotelStore 一致）
+        first_doc.setdefault(hotel.hotel_id, doc_id)
+    hotel_ids = sorted(first_doc)
+    add_strings('hotel_ids', hotel_ids)
+    sections['hotel_docs'] = array('I', [first_doc[hotel_id] for hotel_id in hotel_ids]).tobytes()
+
+    # 建议索引：键按字典序存放，另存插入顺序用于还原候选顺序
+    keys = list(suggest_index)
+    ranks = {key: rank for rank, key in enumerate(keys)}
+    sorted_keys = sorted(keys)
+    positions = {key: index for index, key in enumerate(sorted_keys)}
+    add_strings('keys', sorted_keys)
+    sections['key_order'] = array('I', [ranks[key] for key in sorted_keys]).tobytes()
+    sections['key_by_rank'] = array('I', [positions[key] for key in keys]).tobytes()
+    add_ragged('postings', [suggest_index[key] for key in sorted_keys])
+
+    sections['search_score'] = np.ascontiguousarray(static_features.search_count_score, dtype=np.float64).tobytes()
+    sections['length_factor'] = np.ascontiguousarray(static_features.length_factor, dtype=np.float64).tobytes()
+
+    # 删除邻域索引：删除变体按字典序存放
+    deletion = deletion_index.tables()
+    add_strings('del.surfaces', deletion.surfaces)
+    sections['del.lengths'] = array('I', [len(surface) for surface in deletion.surfaces]).tobytes()
+    add_ragged('del.prefixes', deletion.prefix_surfaces)
+    variants = sorted(deletion.deletes)
+    add_strings('del.variants', variants)
+    add_ragged('del.var_pfx', [deletion.deletes[variant] for variant in variants])
+
+    bk = bk_tree.tables()
+    add_strings('bk.words', bk.words)
+    sections['bk.max_edges'] = array('I', bk.max_edges).tobytes()
+    add_ragged('bk.edges', [[edge for edge, _ in children] for children in bk.children])
+    add_ragged('bk.children', [[child for _, child in children] for children in bk.children])
+
+    trie = completion_trie.tables()
+    add_ragged('trie.chars', [[ord(char) for char, _ in children] for children in trie.children])
+    add_ragged('trie.nodes', [[child for _, child in children] for children in trie.children])
+    add_ragged('trie.top_w', [[weight for weight, _ in top] for top in trie.top], 'q')
+    add_ragged('trie.top_doc', [[doc_id for _, doc_id in top] for top in trie.top])
+    add_ragged('trie.ent_doc', [[doc_id for doc_id, _ in entries] for entries in trie.entries])
+    add_ragged('trie.ent_w', [[weight for _, weight in entries] for entries in trie.entries], 'q')
+
+    sections['meta'] = json.dumps({
+        'format_version': INDEX_FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'record_type': f"{record_type.__module__}.{record_type.__qualname__}" if record_type else None,
+        'fields': fields,
+        'hotel_count': len(store),
+        'key_count': len(keys),
+        'max_distance': deletion_index.max_distance,
+        'prefix_length': deletion_index.prefix_length,
+        'top_k': completion_trie.top_k
+    }, ensure_ascii=False).encode('utf-8')
+
+    # 段目录之后依次写入各段，每段起始按 8 字节对齐
+    position = _HEADER.size + _SECTION.size * len(sections)
+    directory = []
+    for name, data in sections.items():
+        if len(name) > 16:
+            raise ValueError(f"段名称超过 16 个字符: {name}")
+        position += -position % _ALIGNMENT
+        directory.append(_SECTION.pack(name.encode('ascii'), position, len(data)))
+        position += len(data)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, INDEX_FORMAT_VERSION, len(sections)))
+        f.write(b''.join(directory))
+        for name, data in sections.items():
+            f.write(b'\0' * (-f.tell() % _ALIGNMENT))
+            f.write(data)
+        return f.tell()
+
+
+class MappedIndexFile:
+    """用 mmap 打开的索引文件
+
+    打开时只解析头部、段目录和元信息；各属性是直接建立在映射内存上的只读结构，
+    接口与 ExcelHotelSearchSystem 中对应的内存结构一致。
+    """
+
+    def __init__(self, path: str, record_type: Type):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"索引文件已截断: {path}")
+        magic, version, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是酒店索引文件: {path}")
+        if version != INDEX_FORMAT_VERSION:
+            raise ValueError(f"索引文件格式版本 {version} 与当前版本 {INDEX_FORMAT_VERSION} 不兼容，请重新构建: {path}")
+        if len(self._mmap) < _HEADER.size + count * _SECTION.size:
+            raise ValueError(f"索引文件已截断: {path}")
+
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        for i in range(count):
+            name, offset, length = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(self._mmap):
+                raise ValueError(f"索引文件已截断: {path}")
+            self._sections[name.rstrip(b'\0').decode('ascii', 'replace')] = (offset, length)
+
+        self.meta = json.loads(str(self._section('meta'), 'utf-8'))
+        if self.meta['byteorder'] != sys.byteorder:
+            raise ValueError(f"索引文件的字节序 {self.meta['byteorder']} 与本机不同，请在本机重新构建: {path}")
+
+        self.store = MappedHotelStore(self._strings('records'), self._strings('hotel_ids'),
+                                      self._array('hotel_docs'), record_type, self.meta['fields'])
+        self.suggest_index = MappedSuggestIndex(self._strings('keys'), self._ragged('postings'),
+                                                self._array('key_order'), self._array('key_by_rank'))
+        self.prefix_index = SortedPrefixIndex.from_sorted(self.suggest_index.keys_sorted,
+                                                          self.suggest_index.key_order())
+        self.static_features = StaticScoreFeatures.from_arrays(self._float64('search_score'),
+                                                               self._float64('length_factor'))
+        self.deletion_index = MappedDeletionIndex(
+            self._strings('del.surfaces'), self._array('del.lengths'), self._ragged('del.prefixes'),
+            self._strings('del.variants'), self._ragged('del.var_pfx'),
+            self.meta['max_distance'], self.meta['prefix_length'])
+        self.bk_tree = MappedBKTree(self._strings('bk.words'), self._array('bk.max_edges'),
+                                    self._ragged('bk.edges'), self._ragged('bk.children'))
+        self.completion_trie = MappedCompletionTrie(
+            self.meta['top_k'], self._ragged('trie.chars'), self._ragged('trie.nodes'),
+            self._ragged('trie.top_w', 'q'), self._ragged('trie.top_doc'),
+            self._ragged('trie.ent_doc'), self._ragged('trie.ent_w', 'q'))
+
+    @property
+    def size(self) -> int:
+        """文件大小（字节）"""
+        return len(self._mmap)
+
+    def _section(self, name: str) -> memoryview:
+        if name not in self._sections:
+            raise ValueError(f"索引文件缺少段 {name}，请重新构建: {self.path}")
+        offset, length = self._sections[name]
+        return self._view[offset:offset + length]
+
+    def _array(self, name: str, typecode: str = 'I') -> memoryview:
+        return self._section(name).cast(typecode)
+
+    def _float64(self, name: str) -> np.ndarray:
+        return np.frombuffer(self._section(name), dtype=np.float64)
+
+    def _strings(self, name: str) -> MappedStrings:
+        return MappedStrings(self._array(name + '.off', 'Q'), self._section(name))
+
+    def _ragged(self, name: str, typecode: str = 'I') -> MappedRagged:
+        return MappedRagged(self._array(name + '.off', 'Q'), self._array(name, typecode))
+
+
+if __name__ == "__main__":
+    # 离线构建：输入文件（Excel 或导出的 JSON）和配置都没有变化时直接复用已有的索引文件
+    from test_excel_hotels import ExcelHotelSearchSystem
+
+    output = sys.argv[1] if len(sys.argv) > 1 else 'data/excel_hotels.idx'
+    source = sys.argv[2] if len(sys.argv) > 2 else None
+    system = ExcelHotelSearchSystem.load_cached(output, source)
+    print(f"💾 索引文件 {output}: {len(system.store)} 家酒店, {os.path.getsize(output) / 2 ** 20:.1f}MB")
@@ -5,11 +5,17 @@
 专门测试日本城市和酒店的搜索功能
 """
 
-import json
-import time
-from typing import List, Dict, Set
+from typing import List, FrozenSet, Set
 from dataclasses import dataclass
-from collections import defaultdict
+
+from bk_tree import BKTree
+from deletion_index import DeletionIndex
+from hotel_store import HotelStore
+from normalizer_utils import (CachedNormalizer, compile_stop_words, contains_any, CJK_CHARS,
+                              ASCII_LETTERS, KANA_CHARS)
+from suggest_index import SortedPrefixIndex
+from score_features import StaticScoreFeatures
+from suggest_pipeline import SuggestPipeline
 
 @dataclass
 class JapanHotelInfo:
@@ -42,7 +48,7 @@ class JapanHotelSuggestElem:
     price_range: str = ""
     star_rating: int = 0
 
-class JapanHotelQueryNormalizer:
+class JapanHotelQueryNormalizer(CachedNormalizer):
     """日本酒店查询归一化器"""
     
     STOP_WORDS = {
@@ -52,6 +58,9 @@ class JapanHotelQueryNormalizer:
         "ホテル", "旅館", "宿", "民宿", "ビジネスホテル"
     }
     
+    # 所有停用词编译成一个正则，一次扫描移除
+    _STOP_WORDS_PATTERN = compile_stop_words(STOP_WORDS)
+    
     # 日本城市拼音映射
     JAPAN_PINYIN_MAP = {
         # 东京都
@@ -117,10 +126,10 @@ class JapanHotelQueryNormalizer:
         "函馆": "hg", "函馆站": "hgz", "五棱郭": "wlk", "元町": "ym", "汤之川": "yzk"
     }
     
-    def normalize(self, input_text: str, remove_stop_words: bool = True) -> Set[str]:
-        """归一化查询词"""
+    def _normalize(self, input_text: str, remove_stop_words: bool) -> FrozenSet[str]:
+        """归一化查询词（结果不可变，供缓存复用）"""
         if not input_text:
-            return set()
+            return frozenset()
         
         # 基本清理
         cleaned = self._clean_input(input_text)
@@ -140,7 +149,7 @@ class JapanHotelQueryNormalizer:
         # 添加日文变体
         result.update(self._generate_japanese_variants(cleaned))
         
-        return result
+        return frozenset(result)
     
     def _clean_input(self, input_text: str) -> str:
         """清理输入"""
@@ -148,10 +157,7 @@ class JapanHotelQueryNormalizer:
     
     def _remove_stop_words(self, input_text: str) -> str:
         """移除停用词"""
-        result = input_text
-        for stop_word in self.STOP_WORDS:
-            result = result.replace(stop_word.lower(), '')
-        return result.strip()
+        return self._STOP_WORDS_PATTERN.sub('', input_text).strip()
     
     def _generate_pinyin_variants(self, input_text: str) -> Set[str]:
         """生成拼音变体"""
@@ -181,23 +187,31 @@ class JapanHotelQueryNormalizer:
     
     def _contains_chinese(self, text: str) -> bool:
         """检查是否包含中文字符"""
-        return any('\u4e00' <= char <= '\u9fff' for char in text)
+        return contains_any(CJK_CHARS, text)
     
     def _contains_english(self, text: str) -> bool:
         """检查是否包含英文字符"""
-        return any(char.isalpha() and ord(char) < 128 for char in text)
+        return contains_any(ASCII_LETTERS, text)
     
     def _contains_japanese(self, text: str) -> bool:
         """检查是否包含日文字符"""
-        return any('\u3040' <= char <= '\u309f' or '\u30a0' <= char <= '\u30ff' for char in text)
+        return contains_any(KANA_CHARS, text)
 
-class JapanHotelSearchSystem:
+class JapanHotelSearchSystem(SuggestPipeline):
     """日本酒店搜索系统"""
     
+    # 建索引和编辑距离打分的字段
+    SUGGEST_FIELDS = ('hotel_name_cn', 'hotel_name_en', 'hotel_name_jp', 'city_name_cn', 'city_name_en', 'city_name_jp', 'region_name')
+    
     def __init__(self):
         self.normalizer = JapanHotelQueryNormalizer()
         self.hotels = self._load_japan_hotel_data()
+        self.store = HotelStore(self.hotels)
+        self.static_features = StaticScoreFeatures(self.store)
         self.suggest_index = self._build_suggest_index()
+        self.prefix_index = SortedPrefixIndex(self.suggest_index)
+        self.deletion_index = DeletionIndex(self.suggest_index)
+        self.bk_tree = BKTree(self.suggest_index)
     
     def _load_japan_hotel_data(self) -> List[JapanHotelInfo]:
         """加载日本酒店数据"""
@@ -313,122 +327,23 @@ class JapanHotelSearchSystem:
                           "函馆", "Hakodate", "函館", "五棱郭地区", "北海道函馆市五棱郭町25-25-25", "Japan", 1000, 41.7688, 140.7289, "¥12,000-25,000", 4),
         ]
     
-    def _build_suggest_index(self) -> Dict[str, List[JapanHotelInfo]]:
-        """构建建议索引"""
-        index = defaultdict(list)
-        
-        for hotel in self.hotels:
-            # 添加酒店名称
-            for normalized in self.normalizer.normalize(hotel.hotel_name_cn):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.hotel_name_en):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.hotel_name_jp):
-                index[normalized].append(hotel)
-            
-            # 添加城市名称
-            for normalized in self.normalizer.normalize(hotel.city_name_cn):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.city_name_en):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.city_name_jp):
-                index[normalized].append(hotel)
-            
-            # 添加区域名称
-            for normalized in self.normalizer.normalize(hotel.region_name):
-                index[normalized].append(hotel)
-        
-        return dict(index)
-    
     def suggest(self, query: str, count: int = 10) -> List[JapanHotelSuggestElem]:
         """日本酒店建议搜索"""
-        if not query or len(query.strip()) <= 1:
-            return []
-        
-        query = query.strip()
-        candidates = []
-        
-        # 查找匹配的酒店
-        for normalized_query in self.normalizer.normalize(query, False):
-            for prefix in self.suggest_index.keys():
-                if prefix.startswith(normalized_query) or normalized_query.startswith(prefix):
-                    candidates.extend(self.suggest_index[prefix])
-        
-        # 去重和评分
-        hotel_scores = defaultdict(float)
-        for hotel in candidates:
-            score = self._compute_suggest_score(hotel, query)
-            hotel_scores[hotel.hotel_id] = max(hotel_scores[hotel.hotel_id], score)
-        
-        # 排序和返回
-        sorted_hotels = sorted(hotel_scores.items(), key=lambda x: x[1], reverse=True)
-        
         result = []
-        seen_hotels = set()
-        
-        for hotel_id, score in sorted_hotels:
-            if len(result) >= count:
-                break
-            
-            hotel = next(h for h in self.hotels if h.hotel_id == hotel_id)
-            if hotel.hotel_id not in seen_hotels:
-                seen_hotels.add(hotel.hotel_id)
-                result.append(JapanHotelSuggestElem(
-                    display_name=f"{hotel.hotel_name_cn} ({hotel.city_name_cn})",
-                    hotel_name=hotel.hotel_name_cn,
-                    city_name=hotel.city_name_cn,
-                    region_name=hotel.region_name,
-                    country=hotel.country,
-                    hotel_id=hotel.hotel_id,
-                    price_range=hotel.price_range,
-                    star_rating=hotel.star_rating
-                ))
+        for hotel in self._suggest_hotels(query, count):
+            result.append(JapanHotelSuggestElem(
+                display_name=f"{hotel.hotel_name_cn} ({hotel.city_name_cn})",
+                hotel_name=hotel.hotel_name_cn,
+                city_name=hotel.city_name_cn,
+                region_name=hotel.region_name,
+                country=hotel.country,
+                hotel_id=hotel.hotel_id,
+                price_range=hotel.price_range,
+                star_rating=hotel.star_rating
+            ))
         
         return result
     
-    def _compute_suggest_score(self, hotel: JapanHotelInfo, query: str) -> float:
-        """计算建议评分"""
-        search_count_score = (hotel.search_count + 1) ** 0.2
-        
-        # 计算编辑距离分数
-        distance_scores = []
-        for field in [hotel.hotel_name_cn, hotel.hotel_name_en, hotel.hotel_name_jp, 
-                     hotel.city_name_cn, hotel.city_name_en, hotel.city_name_jp, hotel.region_name]:
-            distance_scores.append(self._edit_distance(field, query))
-        
-        distance_score = max(distance_scores) if distance_scores else 0
-        
-        # 长度因子
-        length_factor = 2.0 / len(hotel.hotel_name_cn)
-        
-        # 包含因子
-        contain_boost = 10.0 if query in hotel.hotel_name_cn or query in hotel.city_name_cn else 1.0
-        
-        return (search_count_score * 0.2 + distance_score * 0.6 + length_factor) * contain_boost
-    
-    def _edit_distance(self, str1: str, str2: str) -> float:
-        """计算编辑距离相似度"""
-        len1, len2 = len(str1), len(str2)
-        matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-        
-        for i in range(len1 + 1):
-            matrix[i][0] = i
-        for j in range(len2 + 1):
-            matrix[0][j] = j
-        
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                cost = 0 if str1[i-1] == str2[j-1] else 1
-                matrix[i][j] = min(
-                    matrix[i-1][j] + 1,
-                    matrix[i][j-1] + 1,
-                    matrix[i-1][j-1] + cost
-                )
-        
-        distance = matrix[len1][len2]
-        max_len = max(len1, len2)
-        return 1.0 - (distance / max_len) if max_len > 0 else 1.0
-
 def test_japan_hotels():
     """测试日本酒店搜索功能"""
     print("🗾 日本酒店搜索系统专项测试")
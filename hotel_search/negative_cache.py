@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+零结果前缀的负缓存
+匹配对查询扩展单调（查询变长结果只减不增）时，某个查询没有结果，
+以它为前缀的所有查询也不会有结果，可以直接返回空结果
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+# 默认最多记录的零结果前缀数
+DEFAULT_NEGATIVE_CACHE_SIZE = 10000
+
+
+class NegativePrefixCache:
+    """零结果前缀缓存
+
+    只能用于对查询扩展单调的匹配（如子串、前缀匹配）。编辑距离召回
+    （删除邻域索引、BK 树兜底）允许的距离随查询变长而增大，且整串编辑距离本身
+    也不单调（"abx" 与 "abcd" 距离为 2，"abxd" 与 "abcd" 距离为 1），
+    这类召回路径的结果不能写入本缓存。
+
+    命名空间 space 用于区分匹配规则不同的接口；记录所属的数据快照版本，
+    版本变化（数据重新加载）时清空。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_NEGATIVE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._dead: 'OrderedDict[Tuple[Hashable, str], None]' = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.recorded = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._dead)
+
+    def is_dead(self, space: Hashable, query: str, version: int) -> bool:
+        """query 是否以某个已记录的零结果查询为前缀（包括其本身）"""
+        with self._lock:
+            if not self._check_version(version):
+                return False
+            for end in range(1, len(query) + 1):
+                key = (space, query[:end])
+                if key in self._dead:
+                    self._dead.move_to_end(key)
+                    self.hits += 1
+                    return True
+            return False
+
+    def add(self, space: Hashable, query: str, version: int):
+        """记录零结果查询；空查询不记录（它是所有查询的前缀）"""
+        if not query or self.max_entries <= 0:
+            return
+        with self._lock:
+            if not self._check_version(version):
+                return
+            self._dead[(space, query)] = None
+            self._dead.move_to_end((space, query))
+            self.recorded += 1
+            while len(self._dead) > self.max_entries:
+                self._dead.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """负缓存统计"""
+        with self._lock:
+            return {
+                'size': len(self._dead),
+                'max_entries': self.max_entries,
+                'version': self._version,
+                'hits': self.hits,
+                'recorded': self.recorded,
+                'invalidations': self.invalidations
+            }
+
+    def _check_version(self, version: int) -> bool:
+        """切换到更新的快照版本时清空；请求持有的是旧快照时返回 False（调用方持有锁）"""
+        if self._version is not None and version < self._version:
+            return False
+        if version != self._version:
+            if self._dead:
+                self._dead.clear()
+                self.invalidations += 1
+            self._version = version
+        return True
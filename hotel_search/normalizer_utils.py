@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+查询归一化公共工具
+停用词编译成一个按长度降序的交替正则，一次扫描全部移除；
+文字种类检测使用预先构建的码位集合，不再逐次调用 re.search
+"""
+
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Pattern, Set, Tuple
+
+# 每个归一化器实例的 LRU 缓存容量
+NORMALIZE_CACHE_SIZE = 4096
+
+
+def compile_stop_words(stop_words: Iterable[str]) -> Pattern:
+    """把停用词编译成单个交替正则
+
+    长词排在前面，同一位置优先匹配较长的停用词（如“商务酒店”先于“酒店”）。
+    原先按集合顺序逐个 str.replace 的结果依赖哈希顺序，单次扫描在与顺序无关的
+    输入上结果与之完全相同，在依赖顺序的输入上结果固定为其中一种。
+    """
+    words = sorted({word.lower() for word in stop_words if word}, key=lambda word: (-len(word), word))
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+class CachedNormalizer(ABC):
+    """查询归一化器基类，子类实现 _normalize
+
+    建索引时同一城市、区域名会反复出现，查询侧每次按键都会调用，结果按实例用有界 LRU 缓存
+    """
+
+    def __init__(self):
+        self._normalize_cached = lru_cache(maxsize=NORMALIZE_CACHE_SIZE)(self._normalize)
+
+    def normalize(self, input_text: str, remove_stop_words: bool = True) -> Set[str]:
+        """归一化查询词"""
+        return set(self._normalize_cached(input_text, remove_stop_words))
+
+    @abstractmethod
+    def _normalize(self, input_text: str, remove_stop_words: bool) -> FrozenSet[str]:
+        """归一化查询词（结果不可变，供缓存复用）"""
+
+
+def code_point_set(*ranges: Tuple[str, str]) -> FrozenSet[str]:
+    """由若干闭区间 (起始字符, 结束字符) 构建字符集合"""
+    return frozenset(chr(code) for start, end in ranges for code in range(ord(start), ord(end) + 1))
+
+
+def contains_any(chars: FrozenSet[str], text: str) -> bool:
+    """text 中是否有字符属于 chars（C 层逐字符查表，遇到即停止）"""
+    return not chars.isdisjoint(text)
+
+
+# 中日韩统一表意文字
+CJK_CHARS = code_point_set(('\u4e00', '\u9fff'))
+
+# 常用汉字区间（与 [\u4e00-\u9fa5] 一致）
+CJK_BASIC_CHARS = code_point_set(('\u4e00', '\u9fa5'))
+
+# ASCII 英文字母
+ASCII_LETTERS = code_point_set(('a', 'z'), ('A', 'Z'))
+
+# 平假名与片假名
+KANA_CHARS = code_point_set(('\u3040', '\u309f'), ('\u30a0', '\u30ff'))
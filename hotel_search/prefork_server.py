@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预派生（pre-fork）多进程服务
+父进程只加载一次数据并构建 API，然后 fork 出 N 个工作进程在同一个端口上 accept；
+工作进程通过写时复制共享父进程的只读数据，父进程负责监控、重启工作进程并汇总统计
+"""
+
+import gc
+import os
+import signal
+import socket
+import threading
+import time
+from multiprocessing import RawArray
+from typing import Dict, List, Optional
+
+from simple_server import HotelSearchTCPServer, HotelSearchHandler, LISTEN_BACKLOG
+
+# 工作进程异常退出后重启前的等待时间（秒），避免反复崩溃时不停 fork
+RESTART_DELAY = 1.0
+
+# 监控循环的轮询间隔（秒）
+SUPERVISE_INTERVAL = 0.2
+
+# 默认的统计报告间隔（秒），<= 0 表示不打印
+DEFAULT_REPORT_INTERVAL = 30.0
+
+# /proc/<pid>/smaps_rollup 中关心的内存项（单位 kB）
+MEMORY_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """读取进程内存占用（字节）
+
+    smaps_rollup 可以区分与父进程共享的页和已经被写时复制成私有的页；
+    旧内核上退化为 status 中的 VmRSS，非 Linux 系统返回空字典。
+    """
+    memory = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in MEMORY_FIELDS:
+                    memory[name] = int(value.split()[0]) * 1024
+        return memory
+    except OSError:
+        pass
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    memory['Rss'] = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return memory
+
+
+class PreforkWorkerServer(HotelSearchTCPServer):
+    """工作进程中的服务器：使用父进程创建的监听套接字，并在共享计数器中记录请求数"""
+
+    def __init__(self, listen_socket: socket.socket, handler_class, counters, slot: int):
+        super().__init__(listen_socket.getsockname()[:2], handler_class, bind_and_activate=False)
+        self.socket.close()
+        self.socket = listen_socket
+        self.counters = counters
+        self.slot = slot
+
+    def finish_request(self, request, client_address):
+        super().finish_request(request, client_address)
+        # 每个槽位只由一个工作进程写，不需要加锁
+        self.counters[self.slot] += 1
+
+
+class PreforkSupervisor:
+    """预派生多进程服务的父进程
+
+    - 数据和 API 在父进程构建一次，fork 前调用 gc.freeze() 把已有对象移入永久代，
+      工作进程的垃圾回收不再遍历（也就不再写）这些对象，共享页尽量保持干净；
+      数据集重新加载后先 gc.unfreeze() 并回收旧快照，再重新冻结
+    - fork 期间暂停数据集的监控线程（HotelDatasetHolder.paused），子进程不会继承被它持有的锁
+    - 默认所有工作进程在同一个继承来的监听套接字上 accept；reuse_port=True 且系统支持时
+      每个工作进程各自绑定一个 SO_REUSEPORT 套接字，由内核分配连接
+    - 工作进程退出后自动重启；数据集重新加载后逐个替换工作进程，让新进程共享新快照。
+      工作进程收到 SIGTERM 后处理完当前请求再退出，旧进程退出并重启之后才终止下一个
+    - 每个工作进程的请求数写在共享内存计数器中，父进程据此汇总 QPS
+
+    对外接口（serve_forever / shutdown / server_close / with）与 socketserver 服务器一致。
+    响应缓存、逐键会话等进程内状态在各工作进程中各自独立。
+    """
+
+    def __init__(self, server_address, api, workers: Optional[int] = None, reuse_port: bool = False,
+                 handler_class=HotelSearchHandler, report_interval: float = DEFAULT_REPORT_INTERVAL):
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("当前平台不支持 fork，无法使用 prefork 模式")
+
+        self.api = api
+        self.workers = workers or os.cpu_count() or 1
+        self.reuse_port = reuse_port and hasattr(socket, 'SO_REUSEPORT')
+        self.report_interval = report_interval
+        self.handler_class = type(handler_class.__name__, (handler_class,), {'api': api})
+
+        # 共享内存中的请求计数器，每个工作进程一个槽位
+        self.counters = RawArray('Q', self.workers)
+        self._pids: List[Optional[int]] = [None] * self.workers
+        self._restart_at: Dict[int, float] = {}
+        self._stale: set = set()
+        # 正在为数据更新而替换的槽位
+        self._replacing: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._version = None
+        # 当前永久代中冻结的快照版本
+        self._frozen_version = None
+
+        # 父进程持有的套接字：共享模式下就是监听套接字，SO_REUSEPORT 模式下只用于占住端口
+        self.socket = self._bind(server_address, listen=not self.reuse_port)
+        self.server_address = self.socket.getsockname()[:2]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.server_close()
+
+    def _bind(self, server_address, listen: bool) -> socket.socket:
+        """创建并绑定套接字"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(server_address)
+        if listen:
+            sock.listen(LISTEN_BACKLOG)
+        return sock
+
+    def worker_pids(self) -> List[int]:
+        """当前存活的工作进程"""
+        return [pid for pid in self._pids if pid is not None]
+
+    def total_requests(self) -> int:
+        """所有工作进程处理过的请求总数"""
+        return sum(self.counters)
+
+    def memory_report(self) -> List[Dict[str, int]]:
+        """每个工作进程的内存占用（字节）"""
+        return [{'pid': pid, **process_memory(pid)} for pid in self.worker_pids()]
+
+    def start(self):
+        """fork 出全部工作进程"""
+        self._version = self.api.load_snapshot().version
+        for slot in range(self.workers):
+            if self._pids[slot] is None:
+                self._spawn(slot)
+
+    def _spawn(self, slot: int):
+        """fork 一个工作进程"""
+        # 先在父进程取好快照，fork 后工作进程直接使用，不会各自重新加载
+        snapshot = self.api.load_snapshot()
+        if snapshot.version != self._frozen_version:
+            # 旧快照已不再被引用，但留在永久代中不会被回收：先解冻，回收后再冻结新快照
+            gc.unfreeze()
+            self._frozen_version = snapshot.version
+        gc.collect()
+        gc.freeze()
+
+        with self.api.dataset_holder.paused():
+            pid = os.fork()
+        if pid:
+            self._pids[slot] = pid
+            return
+
+        # 工作进程
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            if self.reuse_port:
+                listen_socket = self._bind(self.server_address, listen=True)
+            else:
+                listen_socket = self.socket
+            server = PreforkWorkerServer(listen_socket, self.handler_class, self.counters, slot)
+            # SIGTERM：不再 accept 新连接，处理完当前请求后退出。
+            # shutdown 会等待 serve_forever 返回，不能在运行 serve_forever 的主线程中调用
+            signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(
+                target=server.shutdown, daemon=True).start())
+            server.serve_forever()
+            server.server_close()
+        except BaseException:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def serve_forever(self):
+        """监控工作进程直到 shutdown"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.shutdown())
+        self.start()
+
+        last_report = time.monotonic()
+        last_requests = self.total_requests()
+        while not self._stop_event.wait(SUPERVISE_INTERVAL):
+            self._reap()
+            self._restart_due()
+            self._check_reload()
+
+            now = time.monotonic()
+            if self.report_interval > 0 and now - last_report >= self.report_interval:
+                requests = self.total_requests()
+                self._print_report((requests - last_requests) / (now - last_report))
+                last_report, last_requests = now, requests
+
+    def shutdown(self):
+        """停止 serve_forever（可以在信号处理函数或其他线程中调用）"""
+        self._stop_event.set()
+
+    def server_close(self):
+        """终止所有工作进程并关闭套接字"""
+        for pid in self.worker_pids():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for slot, pid in enumerate(self._pids):
+            if pid is not None:
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+                self._pids[slot] = None
+        self.socket.close()
+
+    def _reap(self):
+        """回收退出的工作进程，安排重启"""
+        for slot, pid in enumerate(self._pids):
+            if pid is None:
+                continue
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 0
+            if not done:
+                continue
+
+            self._pids[slot] = None
+            self._stale.discard(slot)
+            if slot == self._replacing:
+                # 数据更新后主动替换的进程立即重启
+                self._replacing = None
+                self._restart_at[slot] = 0.0
+            else:
+                print(f"⚠️ 工作进程 {pid} 异常退出 (状态 {status})，{RESTART_DELAY:.0f}秒后重启")
+                self._restart_at[slot] = time.monotonic() + RESTART_DELAY
+
+    def _restart_due(self):
+        """重启到期的工作进程"""
+        now = time.monotonic()
+        for slot, restart_at in list(self._restart_at.items()):
+            if restart_at <= now:
+                del self._restart_at[slot]
+                self._spawn(slot)
+
+    def _check_reload(self):
+        """数据集重新加载后逐个替换工作进程：同一时刻只替换一个，其余进程继续服务
+
+        被替换的进程退出（_reap）并在原槽位重启（_restart_due）之后才向下一个发送 SIGTERM。
+        """
+        version = self.api.load_snapshot().version
+        if version != self._version:
+            self._version = version
+            self._stale = {slot for slot, pid in enumerate(self._pids) if pid is not None}
+
+        if self._stale and self._replacing is None and not self._restart_at:
+            slot = min(self._stale)
+            self._replacing = slot
+            try:
+                os.kill(self._pids[slot], signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _print_report(self, qps: float):
+        """打印汇总 QPS 和每个工作进程的内存"""
+        parts = []
+        for memory in self.memory_report():
+            private = memory.get('Private_Clean', 0) + memory.get('Private_Dirty', 0)
+            parts.append(f"{memory['pid']}: RSS {memory.get('Rss', 0) / 2 ** 20:.1f}MB"
+                         + (f" 私有 {private / 2 ** 20:.1f}MB" if 'Private_Dirty' in memory else ""))
+        print(f"📈 {qps:.0f} 请求/秒 | " + " | ".join(parts))
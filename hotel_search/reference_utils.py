@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试与基准测试共用的参考实现和数据
+参考实现是各项优化之前的原始写法（线性扫描、完整矩阵动态规划、逐个酒店打分），
+测试用它们逐项核对优化后的结果，基准测试用它们作为对比基线
+"""
+
+import json
+import os
+from collections import defaultdict
+from dataclasses import replace
+from typing import Dict, List
+
+import openpyxl
+
+from data_loader import HotelData
+from excel_data_loader import ExcelDataLoader, ExcelHotelData
+from test_excel_hotels import ExcelHotelSearchSystem, QueryNormalizer
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 自带的 Excel 样例（ExcelDataLoader 的默认路径相对于本目录）
+SAMPLE_EXCEL = os.path.join(_HERE, ExcelDataLoader().excel_file)
+
+
+def load_hotels(limit: int = 300) -> List[ExcelHotelData]:
+    """自带数据的前 limit 家酒店，另加一家重复 hotel_id 的酒店和一家名称、城市为空的酒店"""
+    with open(os.path.join(_HERE, 'data', 'excel_hotels.json'), encoding='utf-8') as f:
+        hotels = [ExcelHotelData(**hotel) for hotel in json.load(f)['hotels'][:limit]]
+    hotels.append(replace(hotels[0], hotel_name_cn='重复ID酒店', search_count=9999, latitude=None))
+    hotels.append(replace(hotels[1], hotel_id='empty_name', hotel_name_cn='', hotel_name_en='', city_name_cn=''))
+    return hotels
+
+
+def read_sheet_rows(path: str):
+    """以只读模式读取第一个工作表，返回 (表头, 数据行列表)"""
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    rows = list(workbook.worksheets[0].iter_rows(values_only=True))
+    workbook.close()
+    return rows[0], rows[1:]
+
+
+def build_suggest_index(hotels: List[HotelData], normalizer: QueryNormalizer) -> Dict[str, List[HotelData]]:
+    """与搜索系统中的 _build_suggest_index 相同的索引构建"""
+    index = defaultdict(list)
+    for hotel in hotels:
+        for field in (hotel.hotel_name_cn, hotel.hotel_name_en,
+                      hotel.city_name_cn, hotel.city_name_en, hotel.region_name):
+            for normalized in normalizer.normalize(field):
+                index[normalized].append(hotel)
+    return dict(index)
+
+
+def linear_matching_keys(suggest_index: Dict[str, List[HotelData]], query: str) -> List[str]:
+    """原有的线性扫描查找"""
+    return [prefix for prefix in suggest_index.keys()
+            if prefix.startswith(query) or query.startswith(prefix)]
+
+
+def matrix_edit_distance(str1: str, str2: str) -> int:
+    """原实现：完整 (len1+1) x (len2+1) 矩阵的动态规划"""
+    len1, len2 = len(str1), len(str2)
+    matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
+    for i in range(len1 + 1):
+        matrix[i][0] = i
+    for j in range(len2 + 1):
+        matrix[0][j] = j
+    for i in range(1, len1 + 1):
+        for j in range(1, len2 + 1):
+            cost = 0 if str1[i-1] == str2[j-1] else 1
+            matrix[i][j] = min(matrix[i-1][j] + 1, matrix[i][j-1] + 1, matrix[i-1][j-1] + cost)
+    return matrix[len1][len2]
+
+
+def reference_suggest_score(system: ExcelHotelSearchSystem, hotel: ExcelHotelData, query: str) -> float:
+    """原实现：逐个酒店按公式计算建议评分（酒店名为空时长度按 1 计，与 StaticScoreFeatures 一致）"""
+    search_count_score = (hotel.search_count + 1) ** 0.2
+    distance_score = system._distance_score(hotel, query)
+    length_factor = 2.0 / max(len(hotel.hotel_name_cn), 1)
+    contain_boost = system._contain_boost(hotel, query)
+    return (search_count_score * 0.2 + distance_score * 0.6 + length_factor) * contain_boost
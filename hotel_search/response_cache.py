@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应缓存
+进程内的 LRU + TTL 缓存，保存已经序列化好的响应字节；
+每个条目记录生成它的数据快照版本，快照变化后整个缓存自动失效
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+# 默认最多缓存的响应数
+DEFAULT_CACHE_SIZE = 4096
+
+# 默认过期时间（秒）
+DEFAULT_CACHE_TTL = 60.0
+
+
+class ResponseCache:
+    """按键缓存响应字节
+
+    - 容量超过 max_entries 时淘汰最久未使用的条目
+    - 条目写入超过 ttl 秒后视为过期（ttl <= 0 表示不过期）
+    - 查询时传入当前快照版本，与缓存所属版本不同时先清空缓存
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        # {键: (写入时间, 响应字节)}，按最近使用顺序排列
+        self._entries: 'OrderedDict[Hashable, Tuple[float, bytes]]' = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: int) -> Optional[bytes]:
+        """查找缓存的响应，未命中（包括过期、快照已变化）时返回 None"""
+        with self._lock:
+            if self._version is not None and version < self._version:
+                self.misses += 1
+                return None
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl <= 0 or self._clock() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, version: int, value: bytes):
+        """写入响应；version 已经落后于缓存版本时丢弃，避免旧快照的结果混入"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if self._version is not None and version < self._version:
+                return
+            self._check_version(version)
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存（计数器保留）"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """命中统计，用于评估缓存容量"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+    def _check_version(self, version: int):
+        """快照版本变化时清空缓存（调用方持有锁）"""
+        if version != self._version:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self._version = version
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态打分特征
+建议评分中与查询无关的部分在建索引时一次算好，按 doc id 存放在连续的 NumPy 数组中
+
+评分公式（逐个酒店计算的参考实现见 reference_utils.reference_suggest_score）：
+    score = (search_count_score * 0.2 + distance_score * 0.6 + length_factor) * contain_boost
+其中 search_count_score = (search_count + 1) ** 0.2、length_factor = 2.0 / max(len(hotel_name_cn), 1)
+只取决于酒店本身（酒店名为空时长度按 1 计）。
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from topk import bound_order, top_k_by_bounds
+
+SEARCH_COUNT_WEIGHT = 0.2
+DISTANCE_WEIGHT = 0.6
+LENGTH_FACTOR = 2.0
+
+# 批量计算编辑距离分数时第一批的最小候选数，之后每批翻倍
+MIN_DISTANCE_BATCH = 32
+
+
+class StaticScoreFeatures:
+    """按 doc id 存放的静态打分特征"""
+
+    def __init__(self, hotels: Sequence):
+        # 逐个用 Python 计算后再装入数组，保证与标量公式逐位一致
+        self.search_count_score = np.array(
+            [(hotel.search_count + 1) ** 0.2 for hotel in hotels], dtype=np.float64)
+        self.length_factor = np.array(
+            [LENGTH_FACTOR / max(len(hotel.hotel_name_cn), 1) for hotel in hotels], dtype=np.float64)
+
+    @classmethod
+    def from_arrays(cls, search_count_score: np.ndarray, length_factor: np.ndarray) -> 'StaticScoreFeatures':
+        """由已经算好的特征数组直接创建（如 mmap 索引文件中的数组）"""
+        features = cls.__new__(cls)
+        features.search_count_score = search_count_score
+        features.length_factor = length_factor
+        return features
+
+    def __len__(self) -> int:
+        return len(self.search_count_score)
+
+    def gather(self, doc_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """批量取出候选的 (search_count_score * 0.2, length_factor)"""
+        index = np.asarray(doc_ids, dtype=np.intp)
+        return self.search_count_score[index] * SEARCH_COUNT_WEIGHT, self.length_factor[index]
+
+
+def rank_candidates(candidates: List[int], count: int, features: StaticScoreFeatures,
+                    distance_score: Callable[[int], float],
+                    distance_upper_bound: Callable[[int], float],
+                    contain_boost: Callable[[int], float],
+                    stats: Optional[Dict[str, int]] = None,
+                    batch_distance_score: Optional[Callable[[List[int]], np.ndarray]] = None
+                    ) -> List[Tuple[int, float]]:
+    """对候选 doc id 打分并选出前 count 个，返回 [(doc_id, score), ...]
+
+    静态特征和分数上界整批向量化计算；逐个候选的 Python 代码只剩与查询相关的
+    包含因子、长度上界，以及进入堆之前才需要的编辑距离分数。
+
+    提供 batch_distance_score 时，编辑距离分数按上界顺序分批一次算出（每批翻倍），
+    结果与逐个调用 distance_score 相同。
+    """
+    if not candidates or count <= 0:
+        return []
+
+    search_part, length_factor = features.gather(candidates)
+    boosts = np.array([contain_boost(doc_id) for doc_id in candidates], dtype=np.float64)
+    distance_bounds = np.array([distance_upper_bound(doc_id) for doc_id in candidates], dtype=np.float64)
+
+    upper_bounds = (search_part + distance_bounds * DISTANCE_WEIGHT + length_factor) * boosts
+
+    search_part = search_part.tolist()
+    length_factor = length_factor.tolist()
+    boosts = boosts.tolist()
+
+    order = bound_order(upper_bounds)
+
+    if batch_distance_score is not None:
+        distance_score = _batched(order, candidates, batch_distance_score, max(2 * count, MIN_DISTANCE_BATCH))
+
+    def score(i: int) -> float:
+        distance = distance_score(candidates[i])
+        return (search_part[i] + distance * DISTANCE_WEIGHT + length_factor[i]) * boosts[i]
+
+    top = top_k_by_bounds(upper_bounds, count, score, stats, order=order)
+    return [(candidates[i], value) for i, value in top]
+
+
+def _batched(order: np.ndarray, candidates: List[int],
+             batch_distance_score: Callable[[List[int]], np.ndarray],
+             batch_size: int) -> Callable[[int], float]:
+    """把批量打分包装成逐个打分：遇到未算过的候选时，按处理顺序一次算出接下来的一批"""
+    ordered = [candidates[i] for i in order.tolist()]
+    computed: Dict[int, float] = {}
+    position = 0
+
+    def distance_score(doc_id: int) -> float:
+        nonlocal position, batch_size
+        if doc_id not in computed:
+            batch = ordered[position:position + batch_size]
+            computed.update(zip(batch, batch_distance_score(batch).tolist()))
+            position += len(batch)
+            batch_size *= 2
+        return computed[doc_id]
+
+    return distance_score
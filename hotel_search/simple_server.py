@@ -3,66 +3,84 @@
 """
 简单的HTTP服务器
 用于提供Excel酒店搜索系统的Web服务
+
+服务模式：
+- single: socketserver.TCPServer，一次处理一个请求
+- threaded: ThreadingHTTPServer + 固定大小的线程池
+- asyncio: asyncio streams 前端，搜索计算放到线程池执行
+- prefork: 父进程加载数据后 fork 多个工作进程共享监听端口（见 prefork_server.py）
 """
 
+import asyncio
 import http.server
+import mimetypes
 import socketserver
 import os
 import json
+import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, parse_qs
 
-class HotelSearchHandler(http.server.SimpleHTTPRequestHandler):
-    """酒店搜索HTTP处理器"""
+from hotel_dataset import CATEGORY_DEFAULTS, HotelDatasetHolder
+from hotel_table import categorical_columns, category_counts, top_counts
+from negative_cache import NegativePrefixCache
+from response_cache import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL, ResponseCache
+from suggest_sessions import SuggestSessionStore
+from topk import top_k
+
+# 可选的服务模式
+SERVER_MODES = ('single', 'threaded', 'asyncio', 'prefork')
+
+# 线程池默认大小（与 ThreadPoolExecutor 的默认值一致）
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# 监听队列长度，并发客户端较多时避免连接被丢弃后等待重传
+LISTEN_BACKLOG = 128
+
+# asyncio 前端：请求行和单个请求头的长度上限、请求头个数上限（与 http.server 一致）
+MAX_LINE = 65536
+MAX_HEADERS = 100
+
+# asyncio 前端：keep-alive 连接等待下一个请求的秒数
+KEEP_ALIVE_TIMEOUT = 15
+
+# API响应的公共响应头
+JSON_HEADERS = [
+    ('Content-type', 'application/json; charset=utf-8'),
+    ('Access-Control-Allow-Origin', '*')
+]
+
+# 首页
+INDEX_PAGE = '/excel_web_demo_real.html'
+
+
+class HotelSearchApi:
+    """酒店搜索API
     
-    def do_GET(self):
-        """处理GET请求"""
-        parsed_url = urlparse(self.path)
-        path = parsed_url.path
-        
-        # 处理API请求
-        if path.startswith('/api/'):
-            self.handle_api_request(path, parsed_url.query)
-            return
-        
-        # 处理静态文件
-        if path == '/':
-            path = '/excel_web_demo_real.html'
-        
-        # 设置正确的MIME类型
-        if path.endswith('.html'):
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
-        elif path.endswith('.json'):
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-        else:
-            return super().do_GET()
-        
-        # 读取并发送文件
-        try:
-            file_path = os.path.join(os.getcwd(), path.lstrip('/'))
-            if os.path.exists(file_path):
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                self.wfile.write(content)
-            else:
-                self.send_error(404, 'File not found')
-        except Exception as e:
-            self.send_error(500, f'Server error: {str(e)}')
+    与具体连接无关的接口逻辑：数据快照、响应缓存、逐键会话和负缓存都挂在这里，
+    所有服务模式、所有工作线程共享同一个实例，也就共享同一份只读数据。
+    handle 返回 (状态码, 响应头, 响应体)，出错时响应体为错误信息。
+    """
     
-    def handle_api_request(self, path, query):
+    def __init__(self, dataset_holder=None, response_cache=None,
+                 suggest_sessions=None, negative_cache=None):
+        self.dataset_holder = dataset_holder if dataset_holder is not None else HotelDatasetHolder(check_interval=0)
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
+        self.suggest_sessions = suggest_sessions if suggest_sessions is not None else SuggestSessionStore()
+        self.negative_cache = negative_cache if negative_cache is not None else NegativePrefixCache()
+        # (快照, 统计信息)
+        self._stats = None
+    
+    def handle(self, path, query):
         """处理API请求"""
         if path == '/api/search':
-            self.handle_search_api(query)
+            return self.handle_search_api(query)
         elif path == '/api/suggest':
-            self.handle_suggest_api(query)
+            return self.handle_suggest_api(query)
         elif path == '/api/stats':
-            self.handle_stats_api()
-        else:
-            self.send_error(404, 'API not found')
+            return self.handle_stats_api()
+        return 404, [], 'API not found'
     
     def handle_search_api(self, query):
         """处理搜索API"""
@@ -73,29 +91,12 @@ class HotelSearchHandler(http.server.SimpleHTTPRequestHandler):
             import urllib.parse
             query_text = urllib.parse.unquote(query_text)
             
-            # 加载酒店数据
-            hotels = self.load_hotel_data()
-            
-            # 执行搜索
-            results = self.search_hotels(hotels, query_text, 'search')
-            
-            # 返回结果
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            response = {
-                'success': True,
-                'query': query_text,
-                'total': len(results),
-                'results': results[:20]  # 限制返回20个结果
-            }
-            
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+            # 执行搜索（优先使用缓存的响应）
+            body, cached = self.query_response('search', query_text, 20)  # 限制返回20个结果
+            return 200, JSON_HEADERS + [('X-Cache', 'HIT' if cached else 'MISS')], body
             
         except Exception as e:
-            self.send_error(500, f'Search error: {str(e)}')
+            return 500, [], f'Search error: {str(e)}'
     
     def handle_suggest_api(self, query):
         """处理建议API"""
@@ -105,75 +106,104 @@ class HotelSearchHandler(http.server.SimpleHTTPRequestHandler):
             # 处理URL编码
             import urllib.parse
             query_text = urllib.parse.unquote(query_text)
+            # 可选的会话令牌，同一会话的逐键查询复用上一次的候选集合
+            session = params.get('session', [''])[0]
             
-            # 加载酒店数据
-            hotels = self.load_hotel_data()
-            
-            # 执行建议搜索
-            results = self.search_hotels(hotels, query_text, 'suggest')
-            
-            # 返回结果
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            response = {
-                'success': True,
-                'query': query_text,
-                'total': len(results),
-                'results': results[:10]  # 限制返回10个建议
-            }
-            
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+            # 执行建议搜索（优先使用缓存的响应）
+            body, cached = self.query_response('suggest', query_text, 10, session)  # 限制返回10个建议
+            return 200, JSON_HEADERS + [('X-Cache', 'HIT' if cached else 'MISS')], body
             
         except Exception as e:
-            self.send_error(500, f'Suggest error: {str(e)}')
+            return 500, [], f'Suggest error: {str(e)}'
     
     def handle_stats_api(self):
         """处理统计API"""
         try:
-            # 加载酒店数据
-            hotels = self.load_hotel_data()
-            
-            # 计算统计信息
-            stats = self.calculate_stats(hotels)
-            
-            # 返回结果
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
+            # 计算统计信息（同一快照只计算一次）
+            stats = self.snapshot_stats(self.load_snapshot())
             
             response = {
                 'success': True,
-                'stats': stats
+                'stats': stats,
+                'cache': self.response_cache.stats(),
+                'sessions': self.suggest_sessions.stats(),
+                'negative_cache': self.negative_cache.stats()
             }
-            
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+            return 200, JSON_HEADERS, json.dumps(response, ensure_ascii=False).encode('utf-8')
             
         except Exception as e:
-            self.send_error(500, f'Stats error: {str(e)}')
+            return 500, [], f'Stats error: {str(e)}'
+    
+    def load_snapshot(self):
+        """获取当前数据快照"""
+        return self.dataset_holder.snapshot
     
     def load_hotel_data(self):
-        """加载酒店数据"""
-        try:
-            with open('data/excel_hotels.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('hotels', [])
-        except Exception as e:
-            print(f"加载酒店数据失败: {e}")
-            return []
+        """获取当前数据快照中的酒店数据"""
+        return self.load_snapshot().hotels
     
-    def search_hotels(self, hotels, query, search_type):
-        """搜索酒店"""
-        if not query or not hotels:
-            return []
+    def query_response(self, search_type, query_text, limit, session=''):
+        """返回 (序列化后的响应字节, 是否命中缓存)
         
+        结果只取决于小写后的查询，缓存键为 (接口, 小写查询, limit)，缓存值是不含原始查询的
+        响应后半段 `"total": ..., "results": [...]}`，命中后只需拼上本次请求的 query 字段，
+        输出与不使用缓存时逐字节相同。同一个快照既用于查找缓存也用于计算，避免把旧数据写入新版本。
+        带会话令牌时，未命中缓存的查询在会话上一次的命中集合内重新匹配。
+        两种接口都是子串匹配，查询变长结果只减不增：以零结果查询为前缀的查询直接返回空结果。
+        """
+        snapshot = self.load_snapshot()
+        cache = self.response_cache
+        negative = self.negative_cache
+        query_lower = query_text.lower()
+        key = (search_type, query_lower, limit)
+        
+        tail = cache.get(key, snapshot.version)
+        cached = tail is not None
+        if not cached:
+            if negative.is_dead(search_type, query_lower, snapshot.version):
+                total, results = 0, []
+            elif session and query_text:
+                total, results = self.search_hotels_in_session(snapshot, query_text, search_type, limit, session)
+            else:
+                total, results = self.search_hotels(snapshot.hotels, query_text, search_type, limit)
+            if total == 0:
+                negative.add(search_type, query_lower, snapshot.version)
+            tail = json.dumps({'total': total, 'results': results}, ensure_ascii=False)[1:].encode('utf-8')
+            cache.put(key, snapshot.version, tail)
+        
+        head = json.dumps({'success': True, 'query': query_text}, ensure_ascii=False)[:-1] + ', '
+        return head.encode('utf-8') + tail, cached
+    
+    def search_hotels_in_session(self, snapshot, query, search_type, limit, session):
+        """逐键会话中的搜索，结果与 search_hotels 完全相同
+        
+        打分对每个字段是“包含查询则加分”，查询变长时每个字段只可能由命中变为不命中，
+        分数只减不增，因此新查询的命中集合一定是上一次命中集合（上一次查询是新查询的子串时）的子集。
+        """
+        if not snapshot.hotels:
+            return 0, []
+        
+        sessions = self.suggest_sessions
         query_lower = query.lower()
-        results = []
+        doc_ids = sessions.base_candidates(session, snapshot.version, query_lower)
+        matched = self.match_hotels(snapshot.hotels, query_lower, search_type, doc_ids)
+        sessions.update(session, snapshot.version, query_lower, array('I', (doc_id for doc_id, _ in matched)))
+        return self.rank_matches(snapshot.hotels, matched, limit)
+    
+    def search_hotels(self, hotels, query, search_type, limit):
+        """搜索酒店，返回 (命中总数, 评分最高的 limit 个结果)"""
+        if not query or not hotels:
+            return 0, []
         
-        for hotel in hotels:
+        matched = self.match_hotels(hotels, query.lower(), search_type)
+        return self.rank_matches(hotels, matched, limit)
+    
+    def match_hotels(self, hotels, query_lower, search_type, doc_ids=None):
+        """返回命中的 [(doc id, 分数)]，按 doc id 升序；doc_ids 不为空时只在这些酒店中匹配"""
+        matched = []
+        
+        for doc_id in (range(len(hotels)) if doc_ids is None else doc_ids):
+            hotel = hotels[doc_id]
             score = 0
             
             if search_type == 'suggest':
@@ -198,47 +228,327 @@ class HotelSearchHandler(http.server.SimpleHTTPRequestHandler):
                     score = 1.0
             
             if score > 0.3:
-                results.append({
-                    **hotel,
-                    'score': score
-                })
+                matched.append((doc_id, score))
         
-        # 按评分排序
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results
+        return matched
+    
+    def rank_matches(self, hotels, matched, limit):
+        """返回 (命中总数, 评分最高的 limit 个结果)"""
+        # 用堆选出前 limit 个，只为返回的结果构造响应字典
+        top_hotels = top_k(matched, limit, score=lambda item: item[1])
+        results = [{**hotels[doc_id], 'score': score} for (doc_id, score), _ in top_hotels]
+        return len(matched), results
+    
+    def snapshot_stats(self, snapshot):
+        """快照的统计信息，按快照缓存（快照不可变，重新加载后自然失效）"""
+        cached = self._stats
+        if cached is None or cached[0] is not snapshot:
+            cached = self._stats = (snapshot, self.calculate_stats(snapshot.hotels, snapshot.categories))
+        return cached[1]
     
-    def calculate_stats(self, hotels):
-        """计算统计信息"""
+    def calculate_stats(self, hotels, categories=None):
+        """计算统计信息
+        
+        categories 为快照中已经字典编码的列，城市和区域的计数来自一次 bincount；
+        没有时先从 hotels 编码。
+        """
         if not hotels:
             return {}
         
-        # 城市统计
-        cities = {}
-        for hotel in hotels:
-            city = hotel.get('city_name_cn', '未知城市')
-            cities[city] = cities.get(city, 0) + 1
-        
-        # 区域统计
-        regions = {}
-        for hotel in hotels:
-            region = hotel.get('region_name', '未知区域')
-            regions[region] = regions.get(region, 0) + 1
+        if not categories:
+            categories = categorical_columns(hotels, CATEGORY_DEFAULTS)
+        counts = category_counts({name: categories[name] for name in ('city_name_cn', 'region_name')})
+        cities = counts['city_name_cn']
+        regions = counts['region_name']
         
         return {
             'total_hotels': len(hotels),
             'total_cities': len(cities),
             'tokyo_hotels': cities.get('东京', 0),
-            'top_cities': sorted(cities.items(), key=lambda x: x[1], reverse=True)[:10],
-            'top_regions': sorted(regions.items(), key=lambda x: x[1], reverse=True)[:10]
+            'top_cities': top_counts(cities, 10),
+            'top_regions': top_counts(regions, 10)
         }
 
-def start_server(port=8000):
+
+class HotelSearchHandler(http.server.SimpleHTTPRequestHandler):
+    """酒店搜索HTTP处理器"""
+    
+    # 进程级API，由 start_server 在启动时创建
+    api = None
+    
+    def do_GET(self):
+        """处理GET请求"""
+        parsed_url = urlparse(self.path)
+        path = parsed_url.path
+        
+        # 处理API请求
+        if path.startswith('/api/'):
+            self.handle_api_request(path, parsed_url.query)
+            return
+        
+        # 处理静态文件（read_static_file 只允许访问当前目录下的文件）
+        self.send_result(*read_static_file(path))
+    
+    def get_api(self):
+        """获取进程级API"""
+        api = type(self).api
+        if api is None:
+            api = HotelSearchHandler.api = HotelSearchApi()
+        return api
+    
+    def handle_api_request(self, path, query):
+        """处理API请求"""
+        self.send_result(*self.get_api().handle(path, query))
+    
+    def send_result(self, status, headers, body):
+        """发送 (状态码, 响应头, 响应体)，非 200 时响应体为错误信息"""
+        if status != 200:
+            self.send_error(status, body)
+            return
+        
+        self.send_response(200)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def read_static_file(path):
+    """读取静态文件，返回 (状态码, 响应头, 响应体)；只允许访问当前目录下的文件"""
+    if path == '/':
+        path = INDEX_PAGE
+    
+    root = os.path.realpath(os.getcwd())
+    file_path = os.path.realpath(os.path.join(root, path.lstrip('/')))
+    if not file_path.startswith(root + os.sep) or not os.path.isfile(file_path):
+        return 404, [], 'File not found'
+    
+    if path.endswith('.html'):
+        headers = [('Content-type', 'text/html; charset=utf-8')]
+    elif path.endswith('.json'):
+        headers = JSON_HEADERS
+    else:
+        headers = [('Content-type', mimetypes.guess_type(file_path)[0] or 'application/octet-stream')]
+    
+    try:
+        with open(file_path, 'rb') as f:
+            return 200, headers, f.read()
+    except Exception as e:
+        return 500, [], f'Server error: {str(e)}'
+
+
+class HotelSearchTCPServer(socketserver.TCPServer):
+    """单线程服务器：一次处理一个请求"""
+    request_queue_size = LISTEN_BACKLOG
+
+
+class BoundedThreadingHTTPServer(http.server.ThreadingHTTPServer):
+    """线程池版本的 ThreadingHTTPServer
+    
+    连接交给固定大小的线程池处理，不再为每个连接新建线程；
+    慢的 /api/search 只占用一个工作线程，不会阻塞其他请求。
+    """
+    request_queue_size = LISTEN_BACKLOG
+    
+    def __init__(self, server_address, handler_class, max_workers=DEFAULT_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix='hotel-search')
+        super().__init__(server_address, handler_class)
+    
+    def process_request(self, request, client_address):
+        """把连接提交给线程池"""
+        self._pool.submit(self.process_request_thread, request, client_address)
+    
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+class RequestError(Exception):
+    """请求无法解析，status 为要返回的状态码"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AsyncHotelSearchServer:
+    """asyncio streams 实现的HTTP前端
+    
+    事件循环只负责收发，API计算和文件读取都放到线程池执行；
+    对外接口（serve_forever / shutdown / server_close / with）与 socketserver 服务器一致。
+    支持 GET 和 HEAD；HTTP/1.1 默认保持连接，HTTP/1.0 在请求带 Connection: keep-alive 时保持连接。
+    """
+    
+    def __init__(self, server_address, api, max_workers=DEFAULT_WORKERS):
+        self.api = api
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='hotel-search')
+        self._loop = asyncio.new_event_loop()
+        self._stop_event = asyncio.Event()
+        # 正在处理的连接，server_close 时关闭
+        self._connections = {}
+        host, port = server_address
+        self._server = self._loop.run_until_complete(asyncio.start_server(
+            self._handle_client, host or None, port, backlog=LISTEN_BACKLOG, limit=MAX_LINE
+        ))
+        self.server_address = self._server.sockets[0].getsockname()[:2]
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.server_close()
+    
+    def serve_forever(self):
+        """在当前线程运行事件循环，直到 shutdown"""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._stop_event.wait())
+    
+    def shutdown(self):
+        """从其他线程停止 serve_forever"""
+        self._loop.call_soon_threadsafe(self._stop_event.set)
+    
+    def server_close(self):
+        """关闭监听套接字、仍然打开的连接和线程池"""
+        self._server.close()
+        for writer in self._connections.values():
+            writer.close()
+        if self._connections:
+            self._loop.run_until_complete(asyncio.gather(*self._connections, return_exceptions=True))
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._executor.shutdown(wait=True)
+        self._loop.close()
+    
+    def route(self, target):
+        """在线程池中执行：API请求或静态文件"""
+        parsed_url = urlparse(target)
+        if parsed_url.path.startswith('/api/'):
+            return self.api.handle(parsed_url.path, parsed_url.query)
+        return read_static_file(parsed_url.path)
+    
+    async def _read_request(self, reader, timeout):
+        """读取请求行和请求头，返回 (请求行各部分, 小写名称的请求头)；请求之前连接关闭时返回 None
+        
+        请求行过长时抛出 400、请求头过长或过多时抛出 431 的 RequestError。
+        """
+        try:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+        except (ValueError, asyncio.LimitOverrunError):
+            raise RequestError(400, 'Request line too long')
+        if not line:
+            return None
+        
+        headers = {}
+        while True:
+            try:
+                line_bytes = await reader.readline()
+            except (ValueError, asyncio.LimitOverrunError):
+                raise RequestError(431, 'Header line too long')
+            if line_bytes in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise RequestError(431, 'Too many headers')
+            name, _, value = line_bytes.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return line.decode('latin-1').split(), headers
+    
+    async def _respond(self, request_line, headers):
+        """计算响应，返回 (状态码, 响应头, 响应体, 是否保持连接)"""
+        if len(request_line) not in (2, 3):
+            return 400, [], 'Bad request', False
+        
+        method, target = request_line[:2]
+        version = request_line[2] if len(request_line) == 3 else 'HTTP/0.9'
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.1':
+            keep_alive = connection != 'close'
+        else:
+            keep_alive = connection == 'keep-alive'
+        # 不读取请求体，带请求体的连接处理完就关闭
+        if headers.get('content-length', '0') != '0' or 'transfer-encoding' in headers:
+            keep_alive = False
+        
+        if method not in ('GET', 'HEAD'):
+            return 501, [], 'Unsupported method', False
+        status, response_headers, body = await self._loop.run_in_executor(self._executor, self.route, target)
+        return status, response_headers, body, keep_alive
+    
+    async def _handle_client(self, reader, writer):
+        """在同一个连接上循环处理请求，直到客户端要求关闭、请求出错或连接断开"""
+        self._connections[asyncio.current_task()] = writer
+        try:
+            keep_alive = True
+            timeout = None
+            while keep_alive:
+                method = None
+                try:
+                    request = await self._read_request(reader, timeout)
+                    if request is None:
+                        break
+                    method = request[0][0] if request[0] else None
+                    status, headers, body, keep_alive = await self._respond(*request)
+                except RequestError as e:
+                    status, headers, body, keep_alive = e.status, [], str(e), False
+                
+                if status != 200:
+                    headers, body = [('Content-type', 'text/plain; charset=utf-8')], body.encode('utf-8')
+                reason = http.server.BaseHTTPRequestHandler.responses.get(status, ('',))[0]
+                lines = [f'HTTP/1.1 {status} {reason}'] + [f'{name}: {value}' for name, value in headers]
+                lines += [f'Content-Length: {len(body)}', f"Connection: {'keep-alive' if keep_alive else 'close'}", '', '']
+                # HEAD 与 GET 的响应头相同，不发送响应体
+                writer.write('\r\n'.join(lines).encode('latin-1') + (b'' if method == 'HEAD' else body))
+                await writer.drain()
+                timeout = KEEP_ALIVE_TIMEOUT
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            del self._connections[asyncio.current_task()]
+            writer.close()
+
+
+def create_server(mode, server_address, api, workers=None, handler_class=HotelSearchHandler):
+    """按服务模式创建服务器，所有模式共享同一个 api
+    
+    workers 在 threaded / asyncio 模式下是线程数（默认 DEFAULT_WORKERS），
+    在 prefork 模式下是进程数（默认 CPU 核数）。
+    """
+    if mode not in SERVER_MODES:
+        raise ValueError(f"未知的服务模式: {mode}，可选 {', '.join(SERVER_MODES)}")
+    if mode == 'prefork':
+        from prefork_server import PreforkSupervisor
+        return PreforkSupervisor(server_address, api, workers, handler_class=handler_class)
+    
+    workers = workers or DEFAULT_WORKERS
+    if mode == 'asyncio':
+        return AsyncHotelSearchServer(server_address, api, workers)
+    
+    # 绑定到这个服务器的处理器类，不修改进程级的 HotelSearchHandler.api
+    bound_handler = type(handler_class.__name__, (handler_class,), {'api': api})
+    if mode == 'threaded':
+        return BoundedThreadingHTTPServer(server_address, bound_handler, workers)
+    return HotelSearchTCPServer(server_address, bound_handler)
+
+
+def start_server(port=8000, data_file='data/excel_hotels.json',
+                 cache_size=DEFAULT_CACHE_SIZE, cache_ttl=DEFAULT_CACHE_TTL,
+                 mode='single', workers=None):
     """启动服务器"""
-    with socketserver.TCPServer(("", port), HotelSearchHandler) as httpd:
+    # 启动时加载一次数据，之后由后台线程监控文件变化
+    holder = HotelDatasetHolder(data_file)
+    snapshot = holder.start()
+    api = HotelSearchHandler.api = HotelSearchApi(holder, ResponseCache(cache_size, cache_ttl))
+    
+    with create_server(mode, ("", port), api, workers) as httpd:
         print(f"🚀 Excel酒店搜索服务器已启动")
         print(f"📊 访问地址: http://localhost:{port}")
-        print(f"🗾 数据规模: 2377家酒店")
+        print(f"🗾 数据规模: {len(snapshot.hotels)}家酒店")
         print(f"🌐 支持功能: 搜索、建议、统计")
+        print(f"💾 响应缓存: {cache_size}条, 过期时间{cache_ttl}秒")
+        if mode == 'prefork':
+            print(f"🧵 服务模式: prefork, {httpd.workers}个工作进程")
+        elif mode != 'single':
+            print(f"🧵 服务模式: {mode}, {workers or DEFAULT_WORKERS}个工作线程")
+        else:
+            print(f"🧵 服务模式: single")
         print(f"⏹️  按 Ctrl+C 停止服务器")
         print("-" * 50)
         
@@ -246,6 +556,9 @@ def start_server(port=8000):
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\n👋 服务器已停止")
+        finally:
+            holder.stop()
 
 if __name__ == "__main__":
-    start_server() 
\ No newline at end of file
+    # 用法: python simple_server.py [single|threaded|asyncio|prefork]
+    start_server(mode=sys.argv[1] if len(sys.argv) > 1 else 'single')
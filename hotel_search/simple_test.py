@@ -6,12 +6,19 @@
 """
 
 import time
-from typing import List, Dict, Set
+from typing import List, FrozenSet
 from dataclasses import dataclass
-from collections import defaultdict
 
 # 导入数据加载器
-from data_loader import DataLoader, HotelData
+from data_loader import DataLoader
+from completion_trie import build_completion_trie
+from bk_tree import BKTree
+from deletion_index import DeletionIndex
+from hotel_store import HotelStore
+from normalizer_utils import CachedNormalizer, compile_stop_words, contains_any, CJK_CHARS, ASCII_LETTERS
+from suggest_index import SortedPrefixIndex
+from score_features import StaticScoreFeatures
+from suggest_pipeline import SuggestPipeline
 
 @dataclass
 class HotelSuggestElem:
@@ -25,7 +32,7 @@ class HotelSuggestElem:
     price_range: str = ""
     star_rating: int = 0
 
-class QueryNormalizer:
+class QueryNormalizer(CachedNormalizer):
     """查询归一化器"""
     
     STOP_WORDS = {
@@ -35,6 +42,9 @@ class QueryNormalizer:
         "ホテル", "旅館", "宿", "民宿", "ビジネスホテル"
     }
     
+    # 所有停用词编译成一个正则，一次扫描移除
+    _STOP_WORDS_PATTERN = compile_stop_words(STOP_WORDS)
+    
     # 日本城市拼音映射
     JAPAN_PINYIN_MAP = {
         "东京": "dj", "大阪": "os", "京都": "jd", "横滨": "hb", "名古屋": "mgy",
@@ -43,19 +53,17 @@ class QueryNormalizer:
         "新宿": "xs", "秋叶原": "qyy", "浅草": "qc", "上野": "sy", "银座": "yz"
     }
     
-    def normalize(self, input_text: str, remove_stop_words: bool = True) -> Set[str]:
-        """归一化查询词"""
+    def _normalize(self, input_text: str, remove_stop_words: bool) -> FrozenSet[str]:
+        """归一化查询词（结果不可变，供缓存复用）"""
         if not input_text:
-            return set()
+            return frozenset()
         
         # 基本清理
         cleaned = input_text.lower().strip()
         
         # 移除停用词
         if remove_stop_words:
-            for stop_word in self.STOP_WORDS:
-                cleaned = cleaned.replace(stop_word.lower(), '')
-            cleaned = cleaned.strip()
+            cleaned = self._STOP_WORDS_PATTERN.sub('', cleaned).strip()
         
         result = {cleaned} if cleaned else set()
         
@@ -71,17 +79,17 @@ class QueryNormalizer:
             if cleaned:
                 result.add(cleaned[0].upper() + cleaned[1:].lower())
         
-        return result
+        return frozenset(result)
     
     def _contains_chinese(self, text: str) -> bool:
         """检查是否包含中文字符"""
-        return any('\u4e00' <= char <= '\u9fff' for char in text)
+        return contains_any(CJK_CHARS, text)
     
     def _contains_english(self, text: str) -> bool:
         """检查是否包含英文字符"""
-        return any(char.isalpha() and ord(char) < 128 for char in text)
+        return contains_any(ASCII_LETTERS, text)
 
-class HotelSearchSystem:
+class HotelSearchSystem(SuggestPipeline):
     """酒店搜索系统"""
     
     def __init__(self):
@@ -89,120 +97,54 @@ class HotelSearchSystem:
         self.data_loader = DataLoader()
         self.hotels = self.data_loader.load_japan_hotels()
         self.normalizer = QueryNormalizer()
+        self.store = HotelStore(self.hotels)
+        self.static_features = StaticScoreFeatures(self.store)
         self.suggest_index = self._build_suggest_index()
-    
-    def _build_suggest_index(self) -> Dict[str, List[HotelData]]:
-        """构建建议索引"""
-        index = defaultdict(list)
-        
-        for hotel in self.hotels:
-            # 添加酒店名称
-            for normalized in self.normalizer.normalize(hotel.hotel_name_cn):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.hotel_name_en):
-                index[normalized].append(hotel)
-            
-            # 添加城市名称
-            for normalized in self.normalizer.normalize(hotel.city_name_cn):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.city_name_en):
-                index[normalized].append(hotel)
-            
-            # 添加区域名称
-            for normalized in self.normalizer.normalize(hotel.region_name):
-                index[normalized].append(hotel)
-        
-        return dict(index)
+        self.prefix_index = SortedPrefixIndex(self.suggest_index)
+        self.deletion_index = DeletionIndex(self.suggest_index)
+        self.bk_tree = BKTree(self.suggest_index)
+        self.completion_trie = build_completion_trie(self.store, self.normalizer)
     
     def suggest(self, query: str, count: int = 10) -> List[HotelSuggestElem]:
         """酒店建议搜索"""
-        if not query or len(query.strip()) <= 1:
-            return []
-        
-        query = query.strip()
-        candidates = []
-        
-        # 查找匹配的酒店
-        for normalized_query in self.normalizer.normalize(query, False):
-            for prefix in self.suggest_index.keys():
-                if prefix.startswith(normalized_query) or normalized_query.startswith(prefix):
-                    candidates.extend(self.suggest_index[prefix])
-        
-        # 去重和评分
-        hotel_scores = defaultdict(float)
-        for hotel in candidates:
-            score = self._compute_suggest_score(hotel, query)
-            hotel_scores[hotel.hotel_id] = max(hotel_scores[hotel.hotel_id], score)
-        
-        # 排序和返回
-        sorted_hotels = sorted(hotel_scores.items(), key=lambda x: x[1], reverse=True)
-        
         result = []
-        seen_hotels = set()
-        
-        for hotel_id, score in sorted_hotels:
-            if len(result) >= count:
-                break
-            
-            hotel = next(h for h in self.hotels if h.hotel_id == hotel_id)
-            if hotel.hotel_id not in seen_hotels:
-                seen_hotels.add(hotel.hotel_id)
-                result.append(HotelSuggestElem(
-                    display_name=f"{hotel.hotel_name_cn} ({hotel.city_name_cn})",
-                    hotel_name=hotel.hotel_name_cn,
-                    city_name=hotel.city_name_cn,
-                    region_name=hotel.region_name,
-                    country=hotel.country,
-                    hotel_id=hotel.hotel_id,
-                    price_range=hotel.price_range,
-                    star_rating=hotel.star_rating
-                ))
+        for hotel in self._suggest_hotels(query, count):
+            result.append(HotelSuggestElem(
+                display_name=f"{hotel.hotel_name_cn} ({hotel.city_name_cn})",
+                hotel_name=hotel.hotel_name_cn,
+                city_name=hotel.city_name_cn,
+                region_name=hotel.region_name,
+                country=hotel.country,
+                hotel_id=hotel.hotel_id,
+                price_range=hotel.price_range,
+                star_rating=hotel.star_rating
+            ))
         
         return result
     
-    def _compute_suggest_score(self, hotel: HotelData, query: str) -> float:
-        """计算建议评分"""
-        search_count_score = (hotel.search_count + 1) ** 0.2
-        
-        # 计算编辑距离分数
-        distance_scores = []
-        for field in [hotel.hotel_name_cn, hotel.hotel_name_en, 
-                     hotel.city_name_cn, hotel.city_name_en, hotel.region_name]:
-            distance_scores.append(self._edit_distance(field, query))
-        
-        distance_score = max(distance_scores) if distance_scores else 0
+    def complete(self, query: str, count: int = 10) -> List[HotelSuggestElem]:
+        """按搜索热度补全，直接读取前缀树节点缓存的 top-k"""
+        if not query or not query.strip():
+            return []
         
-        # 长度因子
-        length_factor = 2.0 / len(hotel.hotel_name_cn)
+        normalized_queries = self.normalizer.normalize(query.strip(), False)
         
-        # 包含因子
-        contain_boost = 10.0 if query in hotel.hotel_name_cn or query in hotel.city_name_cn else 1.0
+        result = []
+        for doc_id in self.completion_trie.complete(normalized_queries, count):
+            hotel = self.store[doc_id]
+            result.append(HotelSuggestElem(
+                display_name=f"{hotel.hotel_name_cn} ({hotel.city_name_cn})",
+                hotel_name=hotel.hotel_name_cn,
+                city_name=hotel.city_name_cn,
+                region_name=hotel.region_name,
+                country=hotel.country,
+                hotel_id=hotel.hotel_id,
+                price_range=hotel.price_range,
+                star_rating=hotel.star_rating
+            ))
         
-        return (search_count_score * 0.2 + distance_score * 0.6 + length_factor) * contain_boost
+        return result
     
-    def _edit_distance(self, str1: str, str2: str) -> float:
-        """计算编辑距离相似度"""
-        len1, len2 = len(str1), len(str2)
-        matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-        
-        for i in range(len1 + 1):
-            matrix[i][0] = i
-        for j in range(len2 + 1):
-            matrix[0][j] = j
-        
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                cost = 0 if str1[i-1] == str2[j-1] else 1
-                matrix[i][j] = min(
-                    matrix[i-1][j] + 1,
-                    matrix[i][j-1] + 1,
-                    matrix[i-1][j-1] + cost
-                )
-        
-        distance = matrix[len1][len2]
-        max_len = max(len1, len2)
-        return 1.0 - (distance / max_len) if max_len > 0 else 1.0
-
 def run_basic_tests():
     """运行基础测试"""
     print("🗾 日本酒店搜索系统 - 简化测试")
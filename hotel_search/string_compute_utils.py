@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字符串计算工具
+编辑距离与相似度计算，对应 Java hs-core 中的 StringComputeUtils
+
+较短串不超过 64 个码位时使用 Myers 位并行算法（每个字符一次整数位运算），
+更长时使用带状动态规划；两者都可以传入最大距离，一旦超过立即停止。
+一个查询对大量候选串时，batch_* 方法用 NumPy 逐行推进所有候选的动态规划。
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# 位并行算法处理的最大模式长度
+BIT_PARALLEL_MAX_LENGTH = 64
+
+# 批量计算时每块的候选串数量，限制 (块大小 x 最长串) 矩阵的内存
+BATCH_CHUNK_SIZE = 4096
+
+
+@lru_cache(maxsize=1024)
+def _pattern_masks(pattern: str) -> Dict[str, int]:
+    """模式串中每个字符出现位置的位掩码（同一查询会与大量字段比较，缓存复用）"""
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def _bit_parallel_distance(pattern: str, text: str, max_distance: Optional[int]) -> int:
+    """Myers / Hyyrö 位并行 Levenshtein 距离，len(pattern) <= 64"""
+    m = len(pattern)
+    n = len(text)
+    if m == 0:
+        return n
+
+    masks = _pattern_masks(pattern)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = full
+    mv = 0
+    score = m
+
+    for j, char in enumerate(text):
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & full
+        mh = pv & xh
+
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+
+        # 求整体编辑距离时第 0 行的水平增量恒为 +1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv
+
+        # 剩余每个字符最多让距离减 1
+        if max_distance is not None and score - (n - j - 1) > max_distance:
+            return max_distance + 1
+
+    return score
+
+
+def _banded_distance(str1: str, str2: str, max_distance: Optional[int]) -> int:
+    """带状动态规划：只计算对角线两侧 max_distance 范围内的单元格"""
+    len1, len2 = len(str1), len(str2)
+    band = max_distance if max_distance is not None else max(len1, len2)
+    cap = band + 1
+
+    prev = [j if j <= band else cap for j in range(len2 + 1)]
+    for i in range(1, len1 + 1):
+        current = [cap] * (len2 + 1)
+        current[0] = i if i <= band else cap
+        row_min = current[0]
+        char = str1[i - 1]
+
+        for j in range(max(1, i - band), min(len2, i + band) + 1):
+            value = prev[j - 1] + (0 if char == str2[j - 1] else 1)
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if value > cap:
+                value = cap
+            current[j] = value
+            if value < row_min:
+                row_min = value
+
+        if row_min > band:
+            return cap
+        prev = current
+
+    return min(prev[len2], cap)
+
+
+def _encode_code_points(strings: Sequence[str], lengths: np.ndarray) -> np.ndarray:
+    """把字符串编码成按最长串右侧补 0 的码位矩阵"""
+    width = int(lengths.max()) if len(lengths) else 0
+    codes = np.zeros((len(strings), width), dtype=np.uint32)
+    flat = np.frombuffer(''.join(strings).encode('utf-32-le'), dtype=np.uint32)
+    codes[np.arange(width) < lengths[:, None]] = flat
+    return codes
+
+
+def _batch_distance_chunk(query_codes: np.ndarray, codes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """对一块候选串按查询字符逐行推进动态规划，每行对所有候选一次向量化计算
+
+    补齐位置只影响更靠右的列，各候选在自身长度处的值不受影响。
+    """
+    count, width = codes.shape
+    columns = np.arange(width + 1, dtype=np.int32)
+    row = np.broadcast_to(columns, (count, width + 1)).copy()
+
+    for i, code in enumerate(query_codes.tolist(), 1):
+        current = np.empty_like(row)
+        current[:, 0] = i
+        # 替换（对角线）与删除（上方）
+        np.minimum(row[:, :-1] + (codes != code), row[:, 1:] + 1, out=current[:, 1:])
+        # 插入（左方）：cur[j] = min_k(cur[k] + j - k) = j + cummin(cur[k] - k)
+        row = np.minimum.accumulate(current - columns, axis=1) + columns
+
+    return row[np.arange(count), lengths]
+
+
+class StringComputeUtils:
+    """字符串计算工具类"""
+
+    @staticmethod
+    def compute_distance_score(str1: str, str2: str, normalize: bool = True,
+                               min_score: Optional[float] = None) -> float:
+        """计算编辑距离分数
+
+        提供 min_score 时，如果分数不可能超过 min_score 会提前停止并返回 0.0；
+        超过 min_score 的分数总是精确值。
+        """
+        if not str1 or not str2:
+            return 0.0
+
+        min_similarity = None
+        if min_score is not None:
+            min_similarity = min_score ** 2 if normalize else min_score
+
+        similarity = StringComputeUtils.compute_similarity(str1, str2, min_similarity)
+
+        if normalize:
+            similarity = similarity ** 0.5
+
+        return similarity
+
+    @staticmethod
+    def compute_similarity(str1: str, str2: str, min_similarity: Optional[float] = None) -> float:
+        """计算编辑距离相似度 1 - distance / max_len
+
+        提供 min_similarity 时，如果相似度不可能超过 min_similarity 会提前停止并返回 0.0。
+        """
+        max_length = max(len(str1), len(str2))
+        if max_length == 0:
+            return 1.0
+
+        max_distance = None
+        if min_similarity is not None:
+            # 距离超过该值时相似度必然低于 min_similarity（多留 1 避免浮点误差）
+            max_distance = int((1.0 - min_similarity) * max_length) + 1
+
+        distance = StringComputeUtils.compute_levenshtein_distance(str1, str2, max_distance)
+        if max_distance is not None and distance > max_distance:
+            return 0.0
+
+        return 1.0 - (distance / max_length)
+
+    @staticmethod
+    def distance_score_upper_bound(str1: str, str2: str, normalize: bool = True) -> float:
+        """编辑距离分数上界：编辑距离至少是两串长度之差，无需计算矩阵"""
+        if not str1 or not str2:
+            return 0.0
+
+        max_length = max(len(str1), len(str2))
+        similarity = 1.0 - (abs(len(str1) - len(str2)) / max_length)
+
+        if normalize:
+            similarity = similarity ** 0.5
+
+        return similarity
+
+    @staticmethod
+    def similarity_upper_bound(str1: str, str2: str) -> float:
+        """compute_similarity 的上界：编辑距离至少是两串长度之差"""
+        max_length = max(len(str1), len(str2))
+        if max_length == 0:
+            return 1.0
+        return 1.0 - (abs(len(str1) - len(str2)) / max_length)
+
+    @staticmethod
+    def compute_levenshtein_distance(str1: str, str2: str, max_distance: Optional[int] = None) -> int:
+        """计算Levenshtein编辑距离
+
+        提供 max_distance 时，距离一旦确定超过 max_distance 就返回 max_distance + 1。
+        """
+        if str1 == str2:
+            return 0
+
+        if max_distance is not None and abs(len(str1) - len(str2)) > max_distance:
+            return max_distance + 1
+
+        # 以较短的串作为位并行的模式串
+        if len(str1) > len(str2):
+            str1, str2 = str2, str1
+
+        if len(str1) <= BIT_PARALLEL_MAX_LENGTH:
+            return _bit_parallel_distance(str1, str2, max_distance)
+
+        return _banded_distance(str1, str2, max_distance)
+
+    @staticmethod
+    def batch_levenshtein_distance(query: str, candidates: Sequence[str]) -> np.ndarray:
+        """一个查询与 N 个候选串的编辑距离，按候选顺序返回整数数组"""
+        lengths = np.fromiter(map(len, candidates), dtype=np.intp, count=len(candidates))
+        distances = np.empty(len(candidates), dtype=np.intp)
+        if not len(candidates):
+            return distances
+
+        query_codes = np.frombuffer(query.encode('utf-32-le'), dtype=np.uint32)
+
+        # 按长度排序后分块，每块只补齐到块内最长串
+        order = np.argsort(lengths, kind='stable')
+        for start in range(0, len(order), BATCH_CHUNK_SIZE):
+            chunk = order[start:start + BATCH_CHUNK_SIZE]
+            chunk_lengths = lengths[chunk]
+            codes = _encode_code_points([candidates[i] for i in chunk.tolist()], chunk_lengths)
+            distances[chunk] = _batch_distance_chunk(query_codes, codes, chunk_lengths)
+
+        return distances
+
+    @staticmethod
+    def batch_similarity(query: str, candidates: Sequence[str]) -> np.ndarray:
+        """批量版 compute_similarity：结果与逐个调用完全一致"""
+        distances = StringComputeUtils.batch_levenshtein_distance(query, candidates)
+        lengths = np.fromiter(map(len, candidates), dtype=np.intp, count=len(candidates))
+        max_lengths = np.maximum(lengths, len(query))
+
+        similarity = np.ones(len(candidates), dtype=np.float64)
+        nonempty = max_lengths > 0
+        similarity[nonempty] = 1.0 - (distances[nonempty] / max_lengths[nonempty])
+        return similarity
+
+    @staticmethod
+    def batch_distance_score(query: str, candidates: Sequence[str], normalize: bool = True) -> np.ndarray:
+        """批量版 compute_distance_score：结果与逐个调用完全一致"""
+        if not query:
+            return np.zeros(len(candidates), dtype=np.float64)
+
+        similarity = StringComputeUtils.batch_similarity(query, candidates)
+
+        if normalize and len(similarity):
+            # 不同的相似度取值很少，逐个用 Python 的 ** 0.5 保证与标量版本逐位相同
+            values, inverse = np.unique(similarity, return_inverse=True)
+            similarity = np.array([value ** 0.5 for value in values.tolist()], dtype=np.float64)[inverse]
+
+        # 空候选串的分数为 0
+        similarity[np.fromiter(map(len, candidates), dtype=np.intp, count=len(candidates)) == 0] = 0.0
+        return similarity
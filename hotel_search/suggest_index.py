@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+建议索引的前缀查找结构
+用排序后的归一化词面数组和二分查找替代对所有索引键的线性扫描
+"""
+
+from bisect import bisect_left
+from typing import Iterable, List, Mapping, Sequence
+
+
+class SortedPrefixIndex:
+    """排序词面前缀索引
+
+    建议搜索需要找出两类索引键：
+    - 以查询词为前缀的键：在排序数组中是一段连续区间，二分查找 O(log n) 定位
+    - 本身是查询词前缀的键：逐个检查查询词自身的前缀，O(len(query))
+
+    返回的键按原索引的插入顺序排列，保证候选顺序（以及同分结果的顺序）
+    与线性扫描 suggest_index.keys() 时完全一致。
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        # 记录每个键在原索引中的插入顺序
+        self._order = {key: i for i, key in enumerate(keys)}
+        self._keys = sorted(self._order)
+
+    @classmethod
+    def from_sorted(cls, sorted_keys: Sequence[str], order: Mapping[str, int]) -> 'SortedPrefixIndex':
+        """由已经排好序的键和 {键: 插入顺序} 直接创建（如 mmap 索引文件中的表），不再复制或排序"""
+        index = cls.__new__(cls)
+        index._order = order
+        index._keys = sorted_keys
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def keys_with_prefix(self, prefix: str) -> List[str]:
+        """返回所有以 prefix 开头的键（按字典序）"""
+        keys = self._keys
+        lo = bisect_left(keys, prefix)
+        if not prefix:
+            return keys[lo:]
+
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            hi = bisect_left(keys, prefix[:-1] + chr(last + 1), lo)
+            return keys[lo:hi]
+
+        # 末尾是最大码位时无法构造上界，退化为顺序检查
+        hi = lo
+        while hi < len(keys) and keys[hi].startswith(prefix):
+            hi += 1
+        return keys[lo:hi]
+
+    def prefixes_of(self, query: str) -> List[str]:
+        """返回所有是 query 前缀的键（由短到长）"""
+        order = self._order
+        return [query[:i] for i in range(len(query) + 1) if query[:i] in order]
+
+    def matching_keys(self, query: str) -> List[str]:
+        """返回与查询词存在前缀关系的所有键，顺序与原索引插入顺序一致"""
+        matched = set(self.keys_with_prefix(query))
+        matched.update(self.prefixes_of(query))
+        return sorted(matched, key=self._order.__getitem__)
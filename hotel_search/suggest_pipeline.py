@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+建议搜索流程
+各搜索系统共用的建议索引构建、候选召回和打分排序：
+前缀索引 + 删除邻域索引召回，不足时 BK 树兜底；静态特征向量化、堆 top-k、分数上界剪枝。
+各系统只需声明参与建索引和编辑距离打分的字段
+"""
+
+import time
+from collections import defaultdict
+from operator import attrgetter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from bk_tree import FALLBACK_NODE_BUDGET, FALLBACK_TIME_BUDGET, fallback_distance
+from completion_trie import SUGGEST_FIELDS
+from hotel_store import Postings, new_postings
+from score_features import rank_candidates
+from string_compute_utils import StringComputeUtils
+
+
+class SuggestPipeline:
+    """建议搜索流程（混入各搜索系统）
+
+    使用方需要提供 normalizer、store、static_features、suggest_index、prefix_index、deletion_index、bk_tree，
+    并用类属性声明：
+    - SUGGEST_FIELDS：建索引和编辑距离打分的字段，按此顺序取值
+    - NORMALIZED_DISTANCE：为 True 时字段的编辑距离分数取相似度的平方根
+      （StringComputeUtils.compute_distance_score），否则直接取相似度（compute_similarity）
+    """
+
+    SUGGEST_FIELDS: Tuple[str, ...] = SUGGEST_FIELDS
+    NORMALIZED_DISTANCE = False
+
+    _field_values = staticmethod(attrgetter(*SUGGEST_FIELDS))
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 一次取出全部字段值的元组
+        cls._field_values = staticmethod(attrgetter(*cls.SUGGEST_FIELDS))
+
+    def _build_suggest_index(self) -> Dict[str, Postings]:
+        """构建建议索引 {归一化词面: doc id 倒排表}"""
+        index = defaultdict(new_postings)
+        normalize = self.normalizer.normalize
+
+        for doc_id, hotel in enumerate(self.store):
+            for value in self._field_values(hotel):
+                for normalized in normalize(value):
+                    index[normalized].append(doc_id)
+
+        return dict(index)
+
+    def _collect_candidates(self, query: str, count: int = 0) -> List[int]:
+        """召回候选酒店 doc id（按 doc id 去重，保持召回顺序）
+
+        召回不足 count 个时，再用 BK 树在节点预算内按更宽的编辑距离兜底召回。
+        """
+        candidates = []
+        candidate_ids = set()
+
+        normalized_queries = self.normalizer.normalize(query, False)
+
+        # 先按前缀关系召回，再补充编辑距离 1-2 以内的词面（拼写纠错）
+        keys = [key for normalized_query in normalized_queries
+                for key in self.prefix_index.matching_keys(normalized_query)]
+        keys.extend(key for normalized_query in normalized_queries
+                    for key in self.deletion_index.lookup(normalized_query))
+
+        for key in keys:
+            for doc_id in self.suggest_index[key]:
+                if doc_id not in candidate_ids:
+                    candidate_ids.add(doc_id)
+                    candidates.append(doc_id)
+
+        if len(candidates) < count:
+            deadline = time.perf_counter() + FALLBACK_TIME_BUDGET
+            for normalized_query in normalized_queries:
+                for key in self.bk_tree.search(normalized_query, fallback_distance(normalized_query),
+                                               FALLBACK_NODE_BUDGET, deadline):
+                    for doc_id in self.suggest_index[key]:
+                        if doc_id not in candidate_ids:
+                            candidate_ids.add(doc_id)
+                            candidates.append(doc_id)
+
+        return candidates
+
+    def _suggest_hotels(self, query: str, count: int) -> List:
+        """建议搜索命中的酒店，按分数降序，同一 hotel_id 只保留一个
+
+        查询去掉首尾空白后不足 2 个字符时不做建议。
+        """
+        if not query or len(query.strip()) <= 1:
+            return []
+
+        query = query.strip()
+        candidates = self._collect_candidates(query, count)
+
+        # 静态特征按 doc id 向量化取出，逐个候选只计算与查询相关的部分；
+        # 堆选取 top-k，分数上界低于当前第 k 名的候选不再计算编辑距离，
+        # 需要计算的编辑距离按上界顺序分批向量化算出
+        store = self.store
+        top_hotels = rank_candidates(
+            candidates, count, self.static_features,
+            distance_score=lambda doc_id: self._distance_score(store[doc_id], query),
+            distance_upper_bound=lambda doc_id: self._distance_upper_bound(store[doc_id], query),
+            contain_boost=lambda doc_id: self._contain_boost(store[doc_id], query),
+            batch_distance_score=lambda doc_ids: self._distance_scores(doc_ids, query)
+        )
+
+        result = []
+        seen_hotels = set()
+
+        for doc_id, score in top_hotels:
+            if len(result) >= count:
+                break
+
+            hotel = store[doc_id]
+            if hotel.hotel_id not in seen_hotels:
+                seen_hotels.add(hotel.hotel_id)
+                result.append(hotel)
+
+        return result
+
+    def _distance_score(self, hotel, query: str) -> float:
+        """各字段编辑距离分数的最大值（后面的字段只需判断能否超过当前最大值）"""
+        distance_score = 0.0
+        for field in self._field_values(hotel):
+            if self.NORMALIZED_DISTANCE:
+                score = StringComputeUtils.compute_distance_score(field, query, min_score=distance_score)
+            else:
+                score = StringComputeUtils.compute_similarity(field, query, distance_score)
+            distance_score = max(distance_score, score)
+
+        return distance_score
+
+    def _distance_scores(self, doc_ids: List[int], query: str) -> np.ndarray:
+        """批量版 _distance_score：所有候选的字段一次向量化计算编辑距离"""
+        store = self.store
+        fields = []
+        for doc_id in doc_ids:
+            fields.extend(self._field_values(store[doc_id]))
+
+        if self.NORMALIZED_DISTANCE:
+            scores = StringComputeUtils.batch_distance_score(query, fields)
+        else:
+            scores = StringComputeUtils.batch_similarity(query, fields)
+        return scores.reshape(len(doc_ids), len(self.SUGGEST_FIELDS)).max(axis=1, initial=0.0)
+
+    def _distance_upper_bound(self, hotel, query: str) -> float:
+        """编辑距离分数上界（编辑距离不小于两串长度差，不需要计算编辑距离）"""
+        if self.NORMALIZED_DISTANCE:
+            upper_bound = StringComputeUtils.distance_score_upper_bound
+        else:
+            upper_bound = StringComputeUtils.similarity_upper_bound
+        return max(upper_bound(field, query) for field in self._field_values(hotel))
+
+    def _contain_boost(self, hotel, query: str) -> float:
+        """包含因子"""
+        return 10.0 if query in hotel.hotel_name_cn or query in hotel.city_name_cn else 1.0
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+建议搜索会话
+逐键输入时，会话保存上一次查询的候选 doc id 集合；新查询包含上一次的查询时，
+子串匹配是单调的，只需在这个集合内重新过滤和打分
+"""
+
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# 默认最多保留的会话数
+DEFAULT_MAX_SESSIONS = 10000
+
+# 默认空闲过期时间（秒）
+DEFAULT_SESSION_IDLE = 30.0
+
+# 所有会话合计最多保存的 doc id 个数（每个 4 字节）
+DEFAULT_MAX_SESSION_IDS = 4_000_000
+
+# 会话令牌的最大长度，超出的令牌不建立会话
+MAX_SESSION_TOKEN_LENGTH = 64
+
+
+class _Session:
+    """单个会话的状态"""
+    __slots__ = ('version', 'query', 'doc_ids', 'last_used')
+
+    def __init__(self, version: int, query: str, doc_ids: array, last_used: float):
+        self.version = version
+        self.query = query
+        self.doc_ids = doc_ids
+        self.last_used = last_used
+
+
+class SuggestSessionStore:
+    """按会话令牌保存上一次的候选集合
+
+    - 会话数超过 max_sessions 或保存的 doc id 总数超过 max_ids 时淘汰最久未使用的会话
+    - 空闲超过 idle_timeout 秒的会话视为过期
+    - 会话记录所属的数据快照版本，版本不同的会话不会被复用
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, idle_timeout: float = DEFAULT_SESSION_IDLE,
+                 max_ids: int = DEFAULT_MAX_SESSION_IDS, clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_ids = max_ids
+        self._clock = clock
+        self._sessions: 'OrderedDict[str, _Session]' = OrderedDict()
+        self._total_ids = 0
+        self._lock = threading.Lock()
+
+        self.reused = 0
+        self.cold = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def base_candidates(self, token: str, version: int, query: str) -> Optional[array]:
+        """返回可以复用的候选集合
+
+        会话存在、未过期、快照版本一致，并且上一次的查询是 query 的子串时返回上一次的候选集合，
+        否则返回 None，由调用方从全量数据开始。
+        """
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is not None and self._clock() - session.last_used >= self.idle_timeout:
+                self._remove(token)
+                self.expired += 1
+                session = None
+            if session is None or session.version != version or session.query not in query:
+                self.cold += 1
+                return None
+            self.reused += 1
+            return session.doc_ids
+
+    def update(self, token: str, version: int, query: str, doc_ids: array):
+        """保存本次查询的候选集合"""
+        if not token or len(token) > MAX_SESSION_TOKEN_LENGTH or len(doc_ids) > self.max_ids:
+            return
+        with self._lock:
+            self._remove(token)
+            self._sessions[token] = _Session(version, query, doc_ids, self._clock())
+            self._total_ids += len(doc_ids)
+            self._evict()
+
+    def stats(self) -> Dict:
+        """会话统计"""
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'stored_ids': self._total_ids,
+                'reused': self.reused,
+                'cold': self.cold,
+                'expired': self.expired,
+                'evicted': self.evicted
+            }
+
+    def _remove(self, token: str):
+        """删除会话（调用方持有锁）"""
+        session = self._sessions.pop(token, None)
+        if session is not None:
+            self._total_ids -= len(session.doc_ids)
+
+    def _evict(self):
+        """淘汰过期会话，再按最久未使用淘汰到容量以内（调用方持有锁）"""
+        now = self._clock()
+        while self._sessions:
+            token, session = next(iter(self._sessions.items()))
+            if now - session.last_used >= self.idle_timeout:
+                self.expired += 1
+            elif len(self._sessions) > self.max_sessions or self._total_ids > self.max_ids:
+                self.evicted += 1
+            else:
+                break
+            self._remove(token)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aho–Corasick 多模式匹配测试
+与逐词 str.find 扫描的结果对比；地址补全按词典顺序取优先级（与原来的 if/elif、逐个 in 判断一致）
+"""
+
+import random
+
+from aho_corasick import AhoCorasickMatcher
+from excel_data_loader import ExcelDataLoader
+
+WORDS = ['he', 'she', 'his', 'hers', 'her', 'a', 'ab', 'abc', 'bc', 'c', '东京', '京都', '东京都']
+
+
+def brute_force_matches(words, text):
+    """逐词逐位置查找的全部匹配，按 (结束位置, 起点) 排序"""
+    matches = []
+    for word in dict.fromkeys(words):
+        start = text.find(word)
+        while start >= 0:
+            matches.append((start, start + len(word), word))
+            start = text.find(word, start + 1)
+    return sorted(matches, key=lambda match: (match[1], -match[0]))
+
+
+def brute_force_leftmost_longest(words, text):
+    matches = []
+    position = 0
+    while position < len(text):
+        longest = max((word for word in words if text.startswith(word, position)), key=len, default=None)
+        if longest:
+            matches.append((position, position + len(longest), longest))
+            position += len(longest)
+        else:
+            position += 1
+    return matches
+
+
+def random_texts(count=300, seed=7):
+    rng = random.Random(seed)
+    alphabet = 'abcehirs东京都府'
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 20))) for _ in range(count)] + ['']
+
+
+def test_iter_matches_finds_all_occurrences():
+    matcher = AhoCorasickMatcher((word, word) for word in WORDS)
+    assert len(matcher) == len(WORDS)
+    for text in random_texts() + ['ushers', 'abcabc', '东京都京都']:
+        assert sorted(matcher.iter_matches(text)) == sorted(brute_force_matches(WORDS, text))
+
+
+def test_leftmost_longest_and_replace():
+    matcher = AhoCorasickMatcher((word, word.upper()) for word in WORDS)
+    for text in random_texts() + ['ushers', '东京都京都']:
+        expected = brute_force_leftmost_longest(WORDS, text)
+        assert [(start, end) for start, end, _ in matcher.leftmost_longest(text)] == \
+            [(start, end) for start, end, _ in expected]
+
+        replaced = text
+        for start, end, word in reversed(expected):
+            replaced = replaced[:start] + word.upper() + replaced[end:]
+        assert matcher.replace(text) == replaced
+
+
+def test_min_value():
+    matcher = AhoCorasickMatcher((word, rank) for rank, word in enumerate(WORDS))
+    assert matcher.min_value('') is None
+    assert matcher.min_value() is None
+    for text in random_texts():
+        ranks = [rank for rank, word in enumerate(WORDS) if word in text]
+        assert matcher.min_value(text) == (ranks[0] if ranks else None)
+
+    # 多个文本时取所有文本中的最小值
+    assert matcher.min_value('bc', 'his') == WORDS.index('his')
+
+
+def test_duplicate_and_empty_patterns():
+    matcher = AhoCorasickMatcher([('', 0), ('ab', 1), ('ab', 2)])
+    assert len(matcher) == 1
+    assert list(matcher.iter_matches('abab')) == [(0, 2, 1), (2, 4, 1)]
+
+
+def legacy_city(address):
+    """原实现：按 if/elif 顺序判断城市关键词"""
+    for word, city in ExcelDataLoader.CITY_KEYWORDS:
+        if word in address:
+            return city
+    return "东京"
+
+
+def legacy_region(address):
+    """原实现：按区域列表顺序判断"""
+    for region in ExcelDataLoader.TOKYO_REGIONS:
+        if region in address:
+            return region + "地区"
+    return "东京地区"
+
+
+def legacy_coordinates(city_name, region_name):
+    """原实现：按坐标字典顺序判断区域名或城市名"""
+    for region, coords in ExcelDataLoader.TOKYO_COORDINATES.items():
+        if region in region_name or region in city_name:
+            return coords
+    return (35.6762, 139.6503)
+
+
+def test_address_extraction_keeps_dictionary_priority():
+    loader = ExcelDataLoader()
+
+    # 地址中较早出现的词在词典中靠后时，仍取词典中靠前的词
+    assert loader._extract_city_from_address("京都府京都市 近东京") == "东京"
+    assert loader._extract_city_from_address("大阪府 京都") == "大阪"
+    assert loader._extract_city_from_address("") == "东京"
+    assert loader._extract_region_from_address("上野站前 新宿区") == "新宿地区"
+    assert loader._extract_region_from_address("目黑区中目黑") == "中目黑地区"
+    assert loader._extract_region_from_address("大阪") == "东京地区"
+    assert loader._generate_coordinates("新宿", "涩谷") == ExcelDataLoader.TOKYO_COORDINATES["新宿"]
+    assert loader._generate_coordinates("", "") == (35.6762, 139.6503)
+
+    rng = random.Random(11)
+    pieces = ([word for word, _ in ExcelDataLoader.CITY_KEYWORDS] + ExcelDataLoader.TOKYO_REGIONS +
+              ['区', '町', '1-2-3', ' '])
+    for _ in range(500):
+        address = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 5)))
+        city_name = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 2)))
+        assert loader._extract_city_from_address(address) == legacy_city(address)
+        assert loader._extract_region_from_address(address) == legacy_region(address)
+        assert loader._generate_coordinates(city_name, address) == legacy_coordinates(city_name, address)
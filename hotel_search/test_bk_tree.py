@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BK 树测试
+search 与逐个计算编辑距离的暴力结果对比；固定语料上节点预算截断的兜底召回结果
+"""
+
+from itertools import product
+
+from bk_tree import BKTree, FALLBACK_NODE_BUDGET, fallback_distance
+from reference_utils import matrix_edit_distance
+
+CORPUS = [prefix + suffix
+          for prefix, suffix in product(['shin', 'aki', 'ueno', 'ginza', 'roppo'],
+                                        ['juku', 'habara', 'gi', 'ku', 'ngi', 'hotel'])]
+
+
+def brute_force_search(words, query, max_distance):
+    """逐个计算编辑距离，按距离、插入顺序排列"""
+    matches = []
+    for order, word in enumerate(dict.fromkeys(word for word in words if word)):
+        distance = matrix_edit_distance(query, word)
+        if distance <= max_distance:
+            matches.append((distance, order, word))
+    return [word for _, _, word in sorted(matches)]
+
+
+def test_search_matches_brute_force():
+    words = CORPUS + ['', 'shinjuku', '新宿', '新宿站', '秋叶原', '上野公园']
+    tree = BKTree(words)
+    assert len(tree) == len(CORPUS) + 4
+
+    for query in ['shinjyuku', 'akihabra', 'ginzhotel', 'roppongi', 'ueno', '新宿', '秋叶元', 'xyz']:
+        for max_distance in range(4):
+            assert tree.search(query, max_distance) == brute_force_search(words, query, max_distance)
+            assert not tree.last_search_truncated
+
+
+def test_search_empty():
+    assert BKTree().search('shinjuku', 2) == []
+    assert BKTree(CORPUS).search('', 2) == []
+    assert BKTree(CORPUS).search('shinjuku', -1) == []
+
+
+def test_fallback_distance():
+    assert [fallback_distance('x' * n) for n in (0, 2, 3, 6, 9, 12, 30)] == [0, 0, 1, 2, 3, 3, 3]
+
+
+def test_node_budget_pins_results():
+    """节点预算截断只取决于树结构和查询，与耗时无关"""
+    tree = BKTree(CORPUS)
+    expected = {
+        1: [],
+        3: ['uenohotel'],
+        4: ['ginzahotel', 'uenohotel'],
+        10: ['ginzahotel', 'uenohotel'],
+        11: ['ginzahotel', 'shinhotel', 'uenohotel'],
+    }
+    for max_nodes, words in expected.items():
+        for _ in range(3):
+            assert tree.search('ginzhotel', 3, max_nodes) == words
+            assert tree.last_search_truncated
+
+    assert tree.search('ginzhotel', 3, FALLBACK_NODE_BUDGET) == ['ginzahotel', 'shinhotel', 'uenohotel']
+    assert not tree.last_search_truncated
+
+    assert tree.search('shinjyuku', 3, 1) == ['shinjuku']
+    assert tree.search('shinjyuku', 3, 8) == ['shinjuku', 'shinku']
+    assert not tree.last_search_truncated
+
+
+def test_node_budget_ignores_expired_deadline_below_check_interval():
+    """截止时间只作为安全上限，每 32 个节点才检查一次"""
+    tree = BKTree(CORPUS)
+    assert tree.search('ginzhotel', 3, FALLBACK_NODE_BUDGET, deadline=0.0) == \
+        ['ginzahotel', 'shinhotel', 'uenohotel']
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+补全前缀树测试
+lookup / complete 与“收集全部以前缀开头的词面、按权重排序”的暴力结果一致
+"""
+
+import random
+
+import pytest
+
+from completion_trie import CompletionTrie, build_completion_trie
+from reference_utils import load_hotels
+from test_excel_hotels import QueryNormalizer
+
+
+def brute_force_lookup(entries, prefix, count):
+    """entries 为 [(词面, doc_id, 权重), ...]；同一酒店取最高权重，权重降序、doc_id 升序"""
+    best = {}
+    for surface, doc_id, weight in entries:
+        if surface and surface.startswith(prefix):
+            best[doc_id] = max(weight, best.get(doc_id, weight))
+    return sorted(((weight, doc_id) for doc_id, weight in best.items()), key=lambda item: (-item[0], item[1]))[:count]
+
+
+def brute_force_complete(entries, prefixes, count):
+    best = {}
+    for prefix in prefixes:
+        for weight, doc_id in brute_force_lookup(entries, prefix, count):
+            best[doc_id] = max(weight, best.get(doc_id, weight))
+    return [doc_id for _, doc_id in sorted(((weight, doc_id) for doc_id, weight in best.items()),
+                                           key=lambda item: (-item[0], item[1]))[:count]]
+
+
+@pytest.fixture(scope='module')
+def random_entries():
+    rng = random.Random(3)
+    entries = []
+    for _ in range(600):
+        surface = ''.join(rng.choice('abc东京') for _ in range(rng.randint(0, 6)))
+        # 权重有大量重复，检查同分时按 doc_id 排序
+        entries.append((surface, rng.randrange(80), rng.randrange(5)))
+    return entries
+
+
+def test_lookup_matches_brute_force(random_entries):
+    for top_k in (1, 3, 10):
+        trie = CompletionTrie(top_k)
+        for entry in random_entries:
+            trie.add(*entry)
+        prefixes = {surface[:length] for surface, _, _ in random_entries for length in range(len(surface) + 1)}
+        for prefix in sorted(prefixes) + ['x', 'abcabcabc']:
+            for count in (0, 1, top_k, top_k + 5, 200):
+                assert trie.lookup_weighted(prefix, count) == brute_force_lookup(random_entries, prefix, count)
+                assert trie.lookup(prefix, count) == [doc_id for _, doc_id in
+                                                      brute_force_lookup(random_entries, prefix, count)]
+
+
+def test_complete_merges_prefixes(random_entries):
+    trie = CompletionTrie(5)
+    for entry in random_entries:
+        trie.add(*entry)
+    for prefixes in (['a', 'b'], ['东', 'ab', 'a'], ['x'], [], ['', 'c']):
+        for count in (1, 5, 12):
+            assert trie.complete(prefixes, count) == brute_force_complete(random_entries, prefixes, count)
+
+
+def test_add_after_build_rebuilds():
+    trie = CompletionTrie(2)
+    trie.add('tokyo', 0, 1)
+    assert trie.lookup('to', 5) == [0]
+    trie.add('toyama', 1, 9)
+    trie.add('', 2, 100)
+    assert trie.lookup('to', 5) == [1, 0]
+    assert trie.lookup('', 5) == [1, 0]
+
+
+def test_hotel_corpus():
+    hotels = load_hotels()
+    normalizer = QueryNormalizer()
+    trie = build_completion_trie(hotels, normalizer)
+    entries = [(normalized, doc_id, hotel.search_count)
+               for doc_id, hotel in enumerate(hotels)
+               for field in ('hotel_name_cn', 'hotel_name_en', 'city_name_cn', 'city_name_en', 'region_name')
+               for normalized in normalizer.normalize(getattr(hotel, field))]
+    for prefix in ['', '东', '东京', 'to', 'tokyo', 'shinjuku', '新宿', 'xqz', 'h']:
+        for count in (1, 10, 30):
+            assert trie.lookup_weighted(prefix, count) == brute_force_lookup(entries, prefix, count)
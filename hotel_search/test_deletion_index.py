@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+删除邻域索引测试
+lookup 与逐个词面计算编辑距离的暴力结果（包括顺序）一致
+"""
+
+import random
+
+from deletion_index import DeletionIndex, deletes, typo_distance
+from reference_utils import build_suggest_index, load_hotels, matrix_edit_distance
+from test_excel_hotels import QueryNormalizer
+
+
+def brute_force_distances(surfaces, query):
+    """每个非空词面与查询词的 (编辑距离, 插入顺序, 词面)，按距离、插入顺序排列"""
+    return sorted((matrix_edit_distance(surface, query), order, surface)
+                  for order, surface in enumerate(surface for surface in surfaces if surface))
+
+
+def brute_force_lookup(distances, query, max_distance):
+    """距离不超过 max_distance 的词面"""
+    if not query or max_distance <= 0:
+        return []
+    return [surface for distance, _, surface in distances if distance <= max_distance]
+
+
+def test_lookup_matches_brute_force():
+    rng = random.Random(8)
+    # 共享前缀的长词面，检查只对前缀生成删除变体时不会漏召回
+    surfaces = [''.join(rng.choice('abcd') for _ in range(rng.randint(0, 12))) for _ in range(400)]
+    surfaces += ['abcdabcdab', 'abcdabcdab', '']
+    queries = [''.join(rng.choice('abcde') for _ in range(rng.randint(0, 12))) for _ in range(100)]
+    expected = {query: brute_force_distances(surfaces, query) for query in queries}
+    for prefix_length in (3, 7, 20):
+        index = DeletionIndex(surfaces, prefix_length=prefix_length)
+        assert len(index) == sum(1 for surface in surfaces if surface)
+        for query, distances in expected.items():
+            for max_distance in (0, 1, 2, 3):
+                assert index.lookup(query, max_distance) == \
+                    brute_force_lookup(distances, query, min(max_distance, index.max_distance))
+            assert index.lookup(query) == brute_force_lookup(distances, query, typo_distance(query))
+
+
+def test_hotel_corpus():
+    surfaces = list(build_suggest_index(load_hotels(), QueryNormalizer()))
+    index = DeletionIndex(surfaces)
+    for query in ['shinjyuku', 'akihabra', '秋叶元', '华盛屯', 'tokio', 'mystay', '三井花圆', 'xq', '']:
+        assert index.lookup(query) == \
+            brute_force_lookup(brute_force_distances(surfaces, query), query, typo_distance(query))
+
+
+def test_deletes_and_typo_distance():
+    assert deletes('abc', 0) == {'abc'}
+    assert deletes('abc', 1) == {'abc', 'bc', 'ac', 'ab'}
+    assert deletes('ab', 3) == {'ab', 'a', 'b', ''}
+    assert deletes('', 2) == {''}
+    assert [typo_distance('x' * n) for n in (0, 1, 2, 3, 4, 5, 20)] == [0, 0, 0, 1, 1, 2, 2]
+    assert typo_distance('x' * 20, 1) == 1
+
+
+def test_empty_index():
+    index = DeletionIndex([])
+    assert len(index) == 0 and index.delete_count == 0
+    assert index.lookup('shinjuku') == []
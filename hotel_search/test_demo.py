@@ -5,11 +5,22 @@
 测试核心搜索逻辑和API接口
 """
 
-import json
 import re
-from typing import List, Dict, Set
+from typing import List, FrozenSet, Set
 from dataclasses import dataclass
-from collections import defaultdict
+
+import numpy as np
+
+from bk_tree import BKTree
+from deletion_index import DeletionIndex
+from hotel_store import HotelStore
+from normalizer_utils import (CachedNormalizer, compile_stop_words, contains_any, CJK_BASIC_CHARS,
+                              ASCII_LETTERS)
+from suggest_index import SortedPrefixIndex
+from score_features import StaticScoreFeatures
+from suggest_pipeline import SuggestPipeline
+from string_compute_utils import StringComputeUtils
+from topk import top_k
 
 @dataclass
 class HotelInfo:
@@ -45,7 +56,7 @@ class HotelSearchResult:
     page_size: int
     total_pages: int
 
-class HotelQueryNormalizer:
+class HotelQueryNormalizer(CachedNormalizer):
     """酒店查询归一化器"""
     
     STOP_WORDS = {
@@ -54,6 +65,12 @@ class HotelQueryNormalizer:
         "民宿", "hostel", "青年旅社", "youth hostel", "商务酒店", "business hotel"
     }
     
+    # 清理输入时去掉的字符
+    _CLEAN_PATTERN = re.compile(r'[^\w\u4e00-\u9fa5]')
+    
+    # 所有停用词编译成一个正则，一次扫描移除
+    _STOP_WORDS_PATTERN = compile_stop_words(STOP_WORDS)
+    
     # 常见城市拼音映射
     PINYIN_MAP = {
         "北京": "bj", "上海": "sh", "广州": "gz", "深圳": "sz", "杭州": "hz",
@@ -71,10 +88,10 @@ class HotelQueryNormalizer:
         "筑地": "zd", "品川": "pc", "日本桥": "rbq", "日暮里": "rml"
     }
     
-    def normalize(self, input_text: str, remove_stop_words: bool = True) -> Set[str]:
-        """归一化查询词"""
+    def _normalize(self, input_text: str, remove_stop_words: bool) -> FrozenSet[str]:
+        """归一化查询词（结果不可变，供缓存复用）"""
         if not input_text:
-            return set()
+            return frozenset()
         
         # 基本清理
         cleaned = self._clean_input(input_text)
@@ -91,18 +108,15 @@ class HotelQueryNormalizer:
         # 添加英文变体
         result.update(self._generate_english_variants(cleaned))
         
-        return result
+        return frozenset(result)
     
     def _clean_input(self, input_text: str) -> str:
         """清理输入"""
-        return re.sub(r'[^\w\u4e00-\u9fa5]', '', input_text.lower().strip())
+        return self._CLEAN_PATTERN.sub('', input_text.lower().strip())
     
     def _remove_stop_words(self, input_text: str) -> str:
         """移除停用词"""
-        result = input_text
-        for stop_word in self.STOP_WORDS:
-            result = result.replace(stop_word, '')
-        return result.strip()
+        return self._STOP_WORDS_PATTERN.sub('', input_text).strip()
     
     def _generate_pinyin_variants(self, input_text: str) -> Set[str]:
         """生成拼音变体"""
@@ -124,67 +138,27 @@ class HotelQueryNormalizer:
     
     def _contains_chinese(self, text: str) -> bool:
         """检查是否包含中文字符"""
-        return bool(re.search(r'[\u4e00-\u9fa5]', text))
+        return contains_any(CJK_BASIC_CHARS, text)
     
     def _contains_english(self, text: str) -> bool:
         """检查是否包含英文字符"""
-        return bool(re.search(r'[a-zA-Z]', text))
-
-class StringComputeUtils:
-    """字符串计算工具类"""
-    
-    @staticmethod
-    def compute_distance_score(str1: str, str2: str, normalize: bool = True) -> float:
-        """计算编辑距离分数"""
-        if not str1 or not str2:
-            return 0.0
-        
-        distance = StringComputeUtils._compute_levenshtein_distance(str1, str2)
-        max_length = max(len(str1), len(str2))
-        
-        if max_length == 0:
-            return 1.0
-        
-        similarity = 1.0 - (distance / max_length)
-        
-        if normalize:
-            similarity = similarity ** 0.5
-        
-        return similarity
-    
-    @staticmethod
-    def _compute_levenshtein_distance(str1: str, str2: str) -> int:
-        """计算Levenshtein编辑距离"""
-        len1, len2 = len(str1), len(str2)
-        
-        # 创建矩阵
-        matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-        
-        # 初始化第一行和第一列
-        for i in range(len1 + 1):
-            matrix[i][0] = i
-        for j in range(len2 + 1):
-            matrix[0][j] = j
-        
-        # 填充矩阵
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                cost = 0 if str1[i-1] == str2[j-1] else 1
-                matrix[i][j] = min(
-                    matrix[i-1][j] + 1,
-                    matrix[i][j-1] + 1,
-                    matrix[i-1][j-1] + cost
-                )
-        
-        return matrix[len1][len2]
+        return contains_any(ASCII_LETTERS, text)
 
-class HotelSearchSystem:
+class HotelSearchSystem(SuggestPipeline):
     """酒店搜索系统"""
     
+    # 编辑距离分数取相似度的平方根
+    NORMALIZED_DISTANCE = True
+    
     def __init__(self):
         self.normalizer = HotelQueryNormalizer()
         self.hotels = self._load_sample_data()
+        self.store = HotelStore(self.hotels)
+        self.static_features = StaticScoreFeatures(self.store)
         self.suggest_index = self._build_suggest_index()
+        self.prefix_index = SortedPrefixIndex(self.suggest_index)
+        self.deletion_index = DeletionIndex(self.suggest_index)
+        self.bk_tree = BKTree(self.suggest_index)
     
     def _load_sample_data(self) -> List[HotelInfo]:
         """加载示例数据"""
@@ -211,70 +185,18 @@ class HotelSearchSystem:
                      "东京", "Tokyo", "银座/筑地地区", "东京都中央区筑地1-1-1", "Japan", 1400, 35.6654, 139.7704),
         ]
     
-    def _build_suggest_index(self) -> Dict[str, List[HotelInfo]]:
-        """构建建议索引"""
-        index = defaultdict(list)
-        
-        for hotel in self.hotels:
-            # 添加酒店名称
-            for normalized in self.normalizer.normalize(hotel.hotel_name_cn):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.hotel_name_en):
-                index[normalized].append(hotel)
-            
-            # 添加城市名称
-            for normalized in self.normalizer.normalize(hotel.city_name_cn):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.city_name_en):
-                index[normalized].append(hotel)
-            
-            # 添加区域名称
-            for normalized in self.normalizer.normalize(hotel.region_name):
-                index[normalized].append(hotel)
-        
-        return dict(index)
-    
     def suggest(self, query: str, count: int = 10) -> List[HotelSuggestElem]:
         """酒店建议搜索"""
-        if not query or len(query.strip()) <= 1:
-            return []
-        
-        query = query.strip()
-        candidates = []
-        
-        # 查找匹配的酒店
-        for normalized_query in self.normalizer.normalize(query, False):
-            for prefix in self.suggest_index.keys():
-                if prefix.startswith(normalized_query) or normalized_query.startswith(prefix):
-                    candidates.extend(self.suggest_index[prefix])
-        
-        # 去重和评分
-        hotel_scores = defaultdict(float)
-        for hotel in candidates:
-            score = self._compute_suggest_score(hotel, query)
-            hotel_scores[hotel.hotel_id] = max(hotel_scores[hotel.hotel_id], score)
-        
-        # 排序和返回
-        sorted_hotels = sorted(hotel_scores.items(), key=lambda x: x[1], reverse=True)
-        
         result = []
-        seen_hotels = set()
-        
-        for hotel_id, score in sorted_hotels:
-            if len(result) >= count:
-                break
-            
-            hotel = next(h for h in self.hotels if h.hotel_id == hotel_id)
-            if hotel.hotel_id not in seen_hotels:
-                seen_hotels.add(hotel.hotel_id)
-                result.append(HotelSuggestElem(
-                    display_name=f"{hotel.hotel_name_cn} ({hotel.country})",
-                    hotel_name=hotel.hotel_name_cn,
-                    city_name=hotel.city_name_cn,
-                    region_name=hotel.region_name,
-                    country=hotel.country,
-                    hotel_id=hotel.hotel_id
-                ))
+        for hotel in self._suggest_hotels(query, count):
+            result.append(HotelSuggestElem(
+                display_name=f"{hotel.hotel_name_cn} ({hotel.country})",
+                hotel_name=hotel.hotel_name_cn,
+                city_name=hotel.city_name_cn,
+                region_name=hotel.region_name,
+                country=hotel.country,
+                hotel_id=hotel.hotel_id
+            ))
         
         return result
     
@@ -284,49 +206,25 @@ class HotelSearchSystem:
             return HotelSearchResult([], 0, page, page_size, 0)
         
         query = query.strip()
-        candidates = []
-        
-        # 搜索匹配的酒店
-        for hotel in self.hotels:
-            score = self._compute_search_score(hotel, query)
-            if score > 0:
-                candidates.append((hotel, score))
         
-        # 排序
-        candidates.sort(key=lambda x: x[1], reverse=True)
+        # 所有酒店的搜索评分按查询一次批量算出，命中的酒店即评分大于0的酒店
+        search_scores = self._search_scores(query).tolist()
+        candidates = [doc_id for doc_id, score in enumerate(search_scores) if score > 0]
         
-        # 分页
+        # 分页：只用堆选出前 end 名
         start = (page - 1) * page_size
         end = start + page_size
-        page_hotels = candidates[start:end]
+        top_hotels = top_k(candidates, end, score=lambda doc_id: search_scores[doc_id])
+        page_hotels = top_hotels[start:end]
         
         return HotelSearchResult(
-            hotels=[hotel for hotel, score in page_hotels],
+            hotels=[self.store[doc_id] for doc_id, score in page_hotels],
             total_count=len(candidates),
             page=page,
             page_size=page_size,
             total_pages=(len(candidates) + page_size - 1) // page_size
         )
     
-    def _compute_suggest_score(self, hotel: HotelInfo, query: str) -> float:
-        """计算建议评分"""
-        search_count_score = (hotel.search_count + 1) ** 0.2
-        
-        # 计算编辑距离分数
-        distance_scores = []
-        for field in [hotel.hotel_name_cn, hotel.hotel_name_en, hotel.city_name_cn, hotel.city_name_en, hotel.region_name]:
-            distance_scores.append(StringComputeUtils.compute_distance_score(field, query))
-        
-        distance_score = max(distance_scores) if distance_scores else 0
-        
-        # 长度因子
-        length_factor = 2.0 / len(hotel.hotel_name_cn)
-        
-        # 包含因子
-        contain_boost = 10.0 if query in hotel.hotel_name_cn or query in hotel.city_name_cn else 1.0
-        
-        return (search_count_score * 0.2 + distance_score * 0.6 + length_factor) * contain_boost
-    
     def _compute_search_score(self, hotel: HotelInfo, query: str) -> float:
         """计算搜索评分"""
         score = 0
@@ -344,6 +242,25 @@ class HotelSearchSystem:
             score += StringComputeUtils.compute_distance_score(field, query) * 0.5
         
         return score
+    
+    def _search_scores(self, query: str) -> np.ndarray:
+        """批量版 _compute_search_score：按 doc id 返回所有酒店的搜索评分"""
+        fields = []
+        for hotel in self.store:
+            fields.extend((hotel.hotel_name_cn, hotel.hotel_name_en,
+                           hotel.city_name_cn, hotel.city_name_en,
+                           hotel.region_name, hotel.address))
+        
+        distance_scores = StringComputeUtils.batch_distance_score(query, fields).reshape(len(self.store), 6)
+        
+        # 按字段顺序累加，与 _compute_search_score 的运算顺序一致
+        query_lower = query.lower()
+        scores = np.zeros(len(self.store), dtype=np.float64)
+        for column in range(6):
+            scores += [query_lower in field.lower() for field in fields[column::6]]
+            scores += distance_scores[:, column] * 0.5
+        
+        return scores
 
 def test_system():
     """测试系统功能"""
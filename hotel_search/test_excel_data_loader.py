@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel 解析测试
+按列解析 parse_dataframe 与逐行 _parse_row_to_hotel 的结果逐字段相同；
+只读模式流式读取的行与 pandas 读入的行一致
+"""
+
+import math
+import os
+from dataclasses import replace
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from excel_data_loader import ExcelDataLoader
+from reference_utils import SAMPLE_EXCEL
+
+
+def legacy_parse(loader, df):
+    """原实现：iterrows 逐行解析"""
+    hotels = []
+    for index, row in df.iterrows():
+        hotel = loader._parse_row_to_hotel(row, index)
+        if hotel is not None:
+            hotels.append(replace(hotel, original_data=None))
+    return hotels
+
+
+def edge_case_frame():
+    """缺失值、数字ID（1 与 1.0）、空白文本、括号名称、文本坐标、各种价格和星级写法"""
+    nan = np.nan
+    return pd.DataFrame({
+        'ID': [1, 1.0, nan, '  7 ', nan, 'x'],
+        '酒店名称(中)': ['新宿华盛顿酒店(Shinjuku Washington Hotel)', '(Only English)', nan, '  上野站前旅馆 ', '东京()', ''],
+        '酒店名称(英)': [nan, nan, 'Named Hotel', nan, '  ', nan],
+        '酒店详细地址': ['东京都新宿区', nan, '大阪府 京都', '', '京都府京都市', 'nan'],
+        '城市名称(中)': [nan, '东京', nan, nan, nan, '大阪'],
+        '所属区域': [nan, '  ', '涩谷地区', nan, nan, nan],
+        '星级': ['4星', nan, '豪华7星', 'abc', 2, '1.5'],
+        '价格': ['¥10000', nan, '8000-12000', 15000, nan, 'ask'],
+        '纬度': [35.1, nan, '35.6', 'north', nan, 35.0],
+        '经度': [139.1, 139.2, '139.7', 139.0, nan, nan],
+    })
+
+
+def assert_same_hotels(actual, expected):
+    assert len(actual) == len(expected)
+    for left, right in zip(actual, expected):
+        for name, value in vars(right).items():
+            other = getattr(left, name)
+            if isinstance(value, float) and math.isnan(value):
+                assert isinstance(other, float) and math.isnan(other), name
+            else:
+                assert other == value and type(other) is type(value), name
+
+
+def test_parse_dataframe_matches_iterrows_on_edge_cases():
+    loader = ExcelDataLoader()
+    df = edge_case_frame()
+    assert_same_hotels(loader.parse_dataframe(df, keep_original_data=False), legacy_parse(loader, df))
+
+    # 没有ID列时按行号生成，行号取 DataFrame 的索引
+    shifted = df.drop(columns=['ID']).set_axis(range(10, 16))
+    assert_same_hotels(loader.parse_dataframe(shifted, keep_original_data=False), legacy_parse(loader, shifted))
+    assert loader.parse_dataframe(shifted)[0].hotel_id == 'excel_000011'
+
+    assert loader.parse_dataframe(df.iloc[:0]) == []
+
+
+def test_parse_dataframe_keeps_original_data():
+    df = edge_case_frame()
+    hotels = ExcelDataLoader().parse_dataframe(df)
+    assert [list(hotel.original_data) for hotel in hotels] == [list(df.columns)] * len(df)
+    assert hotels[3].original_data['ID'] == '  7 '
+
+
+@pytest.fixture(scope='module')
+def sample_frame():
+    if not os.path.exists(SAMPLE_EXCEL):
+        pytest.skip(f"Excel文件未找到: {SAMPLE_EXCEL}")
+    return pd.read_excel(SAMPLE_EXCEL, engine='openpyxl')
+
+
+def test_parse_dataframe_matches_iterrows_on_sample(sample_frame):
+    loader = ExcelDataLoader(SAMPLE_EXCEL)
+    df = sample_frame.iloc[:400]
+    assert_same_hotels(loader.parse_dataframe(df, keep_original_data=False), legacy_parse(loader, df))
+
+
+def test_streaming_matches_dataframe_on_sample(sample_frame):
+    loader = ExcelDataLoader(SAMPLE_EXCEL)
+    streamed = list(loader.iter_excel_hotels(keep_original_data=False))
+    assert_same_hotels(streamed, loader.parse_dataframe(sample_frame, keep_original_data=False))
+
+
+def test_iter_excel_rows_matches_pandas(tmp_path):
+    path = str(tmp_path / 'rows.xlsx')
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['ID', '名称', None, '名称', '名称'])
+    sheet.append([1, '甲', 'x', '乙', '丙'])
+    sheet.append([None] * 5)
+    sheet.append([2, '丁'])
+    sheet.append([3, None, None, None, '戊'])
+    sheet.append([None] * 5)
+    sheet.append([None] * 5)
+    second = workbook.create_sheet('第二页')
+    second.append(['ID'])
+    second.append([9])
+    workbook.save(path)
+
+    loader = ExcelDataLoader(path)
+    rows = list(loader.iter_excel_rows())
+    df = pd.read_excel(path, engine='openpyxl')
+    assert [index for index, _ in rows] == list(df.index)
+    assert [list(row) for _, row in rows] == [list(df.columns)] * len(df)
+    for (_, row), (_, expected) in zip(rows, df.iterrows()):
+        for name, value in row.items():
+            assert value == expected[name] or (value is None and pd.isna(expected[name]))
+
+    assert list(loader.iter_excel_rows('第二页')) == [(0, {'ID': 9})]
+
+    empty = str(tmp_path / 'empty.xlsx')
+    openpyxl.Workbook().save(empty)
+    assert list(ExcelDataLoader(empty).iter_excel_rows()) == []
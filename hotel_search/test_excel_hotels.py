@@ -5,13 +5,26 @@ Excel酒店数据测试脚本
 使用从Excel文件读取的2377家酒店数据进行测试
 """
 
+import json
+import os
 import time
-from typing import List, Dict, Set
+from typing import List, Dict, FrozenSet
 from dataclasses import dataclass
 from collections import defaultdict
 
 # 导入Excel数据加载器
 from excel_data_loader import ExcelDataLoader, ExcelHotelData
+from completion_trie import SUGGEST_FIELDS, build_completion_trie
+from bk_tree import BKTree
+from deletion_index import DeletionIndex, MAX_EDIT_DISTANCE, PREFIX_LENGTH
+from hotel_store import HotelStore
+from hotel_table import HotelTable
+from index_cache import IndexArtifactCache, format_timings
+from index_file import MappedIndexFile, write_index_file
+from normalizer_utils import CachedNormalizer, compile_stop_words, contains_any, CJK_CHARS, ASCII_LETTERS
+from suggest_index import SortedPrefixIndex
+from score_features import StaticScoreFeatures
+from suggest_pipeline import SuggestPipeline
 
 @dataclass
 class HotelSuggestElem:
@@ -25,7 +38,7 @@ class HotelSuggestElem:
     price_range: str = ""
     star_rating: int = 0
 
-class QueryNormalizer:
+class QueryNormalizer(CachedNormalizer):
     """查询归一化器"""
     
     STOP_WORDS = {
@@ -35,6 +48,9 @@ class QueryNormalizer:
         "ホテル", "旅館", "宿", "民宿", "ビジネスホテル"
     }
     
+    # 所有停用词编译成一个正则，一次扫描移除
+    _STOP_WORDS_PATTERN = compile_stop_words(STOP_WORDS)
+    
     # 日本城市拼音映射
     JAPAN_PINYIN_MAP = {
         "东京": "dj", "大阪": "os", "京都": "jd", "横滨": "hb", "名古屋": "mgy",
@@ -44,19 +60,17 @@ class QueryNormalizer:
         "浦安": "pa", "成田": "ct", "町田": "md", "川崎": "cs", "八王子": "bwz"
     }
     
-    def normalize(self, input_text: str, remove_stop_words: bool = True) -> Set[str]:
-        """归一化查询词"""
+    def _normalize(self, input_text: str, remove_stop_words: bool) -> FrozenSet[str]:
+        """归一化查询词（结果不可变，供缓存复用）"""
         if not input_text:
-            return set()
+            return frozenset()
         
         # 基本清理
         cleaned = input_text.lower().strip()
         
         # 移除停用词
         if remove_stop_words:
-            for stop_word in self.STOP_WORDS:
-                cleaned = cleaned.replace(stop_word.lower(), '')
-            cleaned = cleaned.strip()
+            cleaned = self._STOP_WORDS_PATTERN.sub('', cleaned).strip()
         
         result = {cleaned} if cleaned else set()
         
@@ -72,138 +86,173 @@ class QueryNormalizer:
             if cleaned:
                 result.add(cleaned[0].upper() + cleaned[1:].lower())
         
-        return result
+        return frozenset(result)
     
     def _contains_chinese(self, text: str) -> bool:
         """检查是否包含中文字符"""
-        return any('\u4e00' <= char <= '\u9fff' for char in text)
+        return contains_any(CJK_CHARS, text)
     
     def _contains_english(self, text: str) -> bool:
         """检查是否包含英文字符"""
-        return any(char.isalpha() and ord(char) < 128 for char in text)
+        return contains_any(ASCII_LETTERS, text)
 
-class ExcelHotelSearchSystem:
+class ExcelHotelSearchSystem(SuggestPipeline):
     """Excel酒店搜索系统"""
     
-    def __init__(self):
-        # 使用Excel数据加载器
-        self.excel_loader = ExcelDataLoader()
-        self.hotels = self.excel_loader.load_excel_data()
+    def __init__(self, hotels: List[ExcelHotelData] = None, excel_loader: ExcelDataLoader = None,
+                 columnar: bool = False):
+        # 使用Excel数据加载器，也可以直接传入已加载的酒店数据
+        self.excel_loader = excel_loader or ExcelDataLoader()
         self.normalizer = QueryNormalizer()
-        self.suggest_index = self._build_suggest_index()
+        # 各构建阶段的耗时（秒）
+        self.build_timings: Dict[str, float] = {}
+        self.hotels = hotels if hotels is not None else self._timed('load_excel', self.excel_loader.load_excel_data)
+        if columnar:
+            # 列式存储：建表后不再保留逐个酒店对象，按 doc id 取到的是行视图
+            self.store = self._timed('store', lambda: HotelTable.from_records(self.hotels, ExcelHotelData))
+            self.hotels = self.store
+        else:
+            self.store = self._timed('store', lambda: HotelStore(self.hotels))
+        self.static_features = self._timed('static_features', lambda: StaticScoreFeatures(self.store))
+        self.suggest_index = self._timed('suggest_index', self._build_suggest_index)
+        self.prefix_index = self._timed('prefix_index', lambda: SortedPrefixIndex(self.suggest_index))
+        self.deletion_index = self._timed('deletion_index', lambda: DeletionIndex(self.suggest_index))
+        self.bk_tree = self._timed('bk_tree', lambda: BKTree(self.suggest_index))
+        self.completion_trie = self._timed('completion_trie',
+                                           lambda: build_completion_trie(self.store, self.normalizer))
+    
+    def _timed(self, stage: str, build):
+        """执行一个构建阶段并记录耗时"""
+        start = time.perf_counter()
+        result = build()
+        self.build_timings[stage] = time.perf_counter() - start
+        return result
     
-    def _build_suggest_index(self) -> Dict[str, List[ExcelHotelData]]:
-        """构建建议索引"""
-        index = defaultdict(list)
+    @classmethod
+    def from_index_file(cls, path: str) -> 'ExcelHotelSearchSystem':
+        """从离线构建的二进制索引文件（index_file.py）创建，用 mmap 打开，不读取 Excel、不重建索引"""
+        index = MappedIndexFile(path, ExcelHotelData)
+        system = cls.__new__(cls)
+        system.excel_loader = ExcelDataLoader()
+        system.index_file = index
+        system.build_timings = {}
+        system.hotels = index.store
+        system.normalizer = QueryNormalizer()
+        system.store = index.store
+        system.static_features = index.static_features
+        system.suggest_index = index.suggest_index
+        system.prefix_index = index.prefix_index
+        system.deletion_index = index.deletion_index
+        system.bk_tree = index.bk_tree
+        system.completion_trie = index.completion_trie
+        return system
+    
+    def save_index_file(self, path: str) -> int:
+        """把当前的酒店记录和全部索引写入二进制索引文件，返回文件大小（字节）"""
+        return write_index_file(path, self.store, self.suggest_index, self.static_features,
+                                self.deletion_index, self.bk_tree, self.completion_trie)
+    
+    @classmethod
+    def load_cached(cls, artifact_path: str = "data/excel_hotels.idx",
+                    source: str = None) -> 'ExcelHotelSearchSystem':
+        """输入文件、配置和索引格式都没有变化时 mmap 打开已有的索引文件，否则重新构建并写入
+        
+        source 为 Excel 文件或 save_to_json 导出的 JSON 文件，默认使用 ExcelDataLoader 的 Excel 文件。
+        """
+        if source is not None and source.endswith('.json'):
+            excel_loader = None
+        else:
+            excel_loader = ExcelDataLoader(source) if source else ExcelDataLoader()
+            source = excel_loader.excel_file
         
-        for hotel in self.hotels:
-            # 添加酒店名称
-            for normalized in self.normalizer.normalize(hotel.hotel_name_cn):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.hotel_name_en):
-                index[normalized].append(hotel)
-            
-            # 添加城市名称
-            for normalized in self.normalizer.normalize(hotel.city_name_cn):
-                index[normalized].append(hotel)
-            for normalized in self.normalizer.normalize(hotel.city_name_en):
-                index[normalized].append(hotel)
-            
-            # 添加区域名称
-            for normalized in self.normalizer.normalize(hotel.region_name):
-                index[normalized].append(hotel)
+        cache = IndexArtifactCache(artifact_path, [source], cls.index_config(excel_loader))
+        reason = cache.stale_reason()
+        if reason is None:
+            try:
+                system = cls.from_index_file(artifact_path)
+                print(f"♻️ 输入与配置未变化，复用索引文件: {artifact_path}")
+                return system
+            except ValueError as e:
+                # 清单有效但索引文件损坏（截断、被改写等），重新构建
+                reason = str(e)
         
-        return dict(index)
+        print(f"🔨 重新构建索引文件（{reason}）: {artifact_path}")
+        input_digests = cache.input_digests()
+        if excel_loader is not None:
+            system = cls(excel_loader=excel_loader)
+        else:
+            start = time.perf_counter()
+            with open(source, 'r', encoding='utf-8') as f:
+                hotels = [ExcelHotelData(**hotel) for hotel in json.load(f)['hotels']]
+            load_seconds = time.perf_counter() - start
+            system = cls(hotels)
+            system.build_timings = {'load_json': load_seconds, **system.build_timings}
+        
+        # 先写临时文件再原子替换，正在 mmap 旧文件的进程不受影响
+        temp_path = artifact_path + '.tmp'
+        system._timed('write_index', lambda: system.save_index_file(temp_path))
+        os.replace(temp_path, artifact_path)
+        cache.write_manifest(system.build_timings, input_digests)
+        print(f"⏱️ 构建耗时: {', '.join(format_timings(system.build_timings))}")
+        return system
+    
+    @classmethod
+    def index_config(cls, excel_loader: ExcelDataLoader = None) -> Dict:
+        """影响索引内容的配置，用于判断已有索引文件是否可以复用"""
+        config = {
+            'normalizer': {
+                'stop_words': sorted(QueryNormalizer.STOP_WORDS),
+                'pinyin': QueryNormalizer.JAPAN_PINYIN_MAP
+            },
+            'suggest_fields': list(SUGGEST_FIELDS),
+            'max_edit_distance': MAX_EDIT_DISTANCE,
+            'deletion_prefix_length': PREFIX_LENGTH
+        }
+        if excel_loader is not None:
+            # 从 Excel 读取时，补全英文名、区域、坐标的词典也会影响酒店记录
+            config['excel_loader'] = excel_loader.parse_config()
+        return config
     
     def suggest(self, query: str, count: int = 10) -> List[HotelSuggestElem]:
         """酒店建议搜索"""
-        if not query or len(query.strip()) <= 1:
-            return []
-        
-        query = query.strip()
-        candidates = []
-        
-        # 查找匹配的酒店
-        for normalized_query in self.normalizer.normalize(query, False):
-            for prefix in self.suggest_index.keys():
-                if prefix.startswith(normalized_query) or normalized_query.startswith(prefix):
-                    candidates.extend(self.suggest_index[prefix])
-        
-        # 去重和评分
-        hotel_scores = defaultdict(float)
-        for hotel in candidates:
-            score = self._compute_suggest_score(hotel, query)
-            hotel_scores[hotel.hotel_id] = max(hotel_scores[hotel.hotel_id], score)
-        
-        # 排序和返回
-        sorted_hotels = sorted(hotel_scores.items(), key=lambda x: x[1], reverse=True)
-        
         result = []
-        seen_hotels = set()
-        
-        for hotel_id, score in sorted_hotels:
-            if len(result) >= count:
-                break
-            
-            hotel = next(h for h in self.hotels if h.hotel_id == hotel_id)
-            if hotel.hotel_id not in seen_hotels:
-                seen_hotels.add(hotel.hotel_id)
-                result.append(HotelSuggestElem(
-                    display_name=f"{hotel.hotel_name_cn} ({hotel.city_name_cn})",
-                    hotel_name=hotel.hotel_name_cn,
-                    city_name=hotel.city_name_cn,
-                    region_name=hotel.region_name,
-                    country=hotel.country,
-                    hotel_id=hotel.hotel_id,
-                    price_range=hotel.price_range,
-                    star_rating=hotel.star_rating
-                ))
+        for hotel in self._suggest_hotels(query, count):
+            result.append(HotelSuggestElem(
+                display_name=f"{hotel.hotel_name_cn} ({hotel.city_name_cn})",
+                hotel_name=hotel.hotel_name_cn,
+                city_name=hotel.city_name_cn,
+                region_name=hotel.region_name,
+                country=hotel.country,
+                hotel_id=hotel.hotel_id,
+                price_range=hotel.price_range,
+                star_rating=hotel.star_rating
+            ))
         
         return result
     
-    def _compute_suggest_score(self, hotel: ExcelHotelData, query: str) -> float:
-        """计算建议评分"""
-        search_count_score = (hotel.search_count + 1) ** 0.2
-        
-        # 计算编辑距离分数
-        distance_scores = []
-        for field in [hotel.hotel_name_cn, hotel.hotel_name_en, 
-                     hotel.city_name_cn, hotel.city_name_en, hotel.region_name]:
-            distance_scores.append(self._edit_distance(field, query))
-        
-        distance_score = max(distance_scores) if distance_scores else 0
+    def complete(self, query: str, count: int = 10) -> List[HotelSuggestElem]:
+        """按搜索热度补全，直接读取前缀树节点缓存的 top-k"""
+        if not query or not query.strip():
+            return []
         
-        # 长度因子
-        length_factor = 2.0 / len(hotel.hotel_name_cn)
+        normalized_queries = self.normalizer.normalize(query.strip(), False)
         
-        # 包含因子
-        contain_boost = 10.0 if query in hotel.hotel_name_cn or query in hotel.city_name_cn else 1.0
+        result = []
+        for doc_id in self.completion_trie.complete(normalized_queries, count):
+            hotel = self.store[doc_id]
+            result.append(HotelSuggestElem(
+                display_name=f"{hotel.hotel_name_cn} ({hotel.city_name_cn})",
+                hotel_name=hotel.hotel_name_cn,
+                city_name=hotel.city_name_cn,
+                region_name=hotel.region_name,
+                country=hotel.country,
+                hotel_id=hotel.hotel_id,
+                price_range=hotel.price_range,
+                star_rating=hotel.star_rating
+            ))
         
-        return (search_count_score * 0.2 + distance_score * 0.6 + length_factor) * contain_boost
+        return result
     
-    def _edit_distance(self, str1: str, str2: str) -> float:
-        """计算编辑距离相似度"""
-        len1, len2 = len(str1), len(str2)
-        matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-        
-        for i in range(len1 + 1):
-            matrix[i][0] = i
-        for j in range(len2 + 1):
-            matrix[0][j] = j
-        
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                cost = 0 if str1[i-1] == str2[j-1] else 1
-                matrix[i][j] = min(
-                    matrix[i-1][j] + 1,
-                    matrix[i][j-1] + 1,
-                    matrix[i-1][j-1] + cost
-                )
-        
-        distance = matrix[len1][len2]
-        max_len = max(len1, len2)
-        return 1.0 - (distance / max_len) if max_len > 0 else 1.0
-
 def run_excel_data_tests():
     """运行Excel数据测试"""
     print("🗾 Excel酒店数据测试 - 2377家酒店")
@@ -273,6 +322,28 @@ def run_excel_data_tests():
             print(f"  {i}. {suggestion.display_name}")
             print(f"     价格: {suggestion.price_range} | 星级: {suggestion.star_rating}星")
 
+    # 测试热度补全（短前缀）
+    print(f"\n🔥 热度补全测试:")
+    short_prefixes = ["东", "新", "to", "sh"]
+
+    for prefix in short_prefixes:
+        print(f"\n🔤 补全前缀: '{prefix}'")
+        suggestions = system.complete(prefix, 3)
+        for i, suggestion in enumerate(suggestions, 1):
+            print(f"  {i}. {suggestion.display_name}")
+            print(f"     区域: {suggestion.region_name} | 星级: {suggestion.star_rating}星")
+
+    # 测试拼写纠错（编辑距离 1-2 以内的词面作为额外候选）
+    print(f"\n✏️ 拼写纠错测试:")
+    typo_queries = ["shinjyuku", "tokio"]
+
+    for query in typo_queries:
+        print(f"\n🔤 查询: '{query}'")
+        suggestions = system.suggest(query, 3)
+        for i, suggestion in enumerate(suggestions, 1):
+            print(f"  {i}. {suggestion.display_name}")
+            print(f"     区域: {suggestion.region_name} | 星级: {suggestion.star_rating}星")
+
 def run_performance_test():
     """运行性能测试"""
     print(f"\n\n⚡ 性能测试:")
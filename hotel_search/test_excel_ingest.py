@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录批量导入测试
+合并结果与“按文件顺序逐个解析、保留首次出现的 hotel_id”的结果一致，且与进程数无关；
+坏文件只记为失败，不影响其他文件
+"""
+
+import os
+
+import openpyxl
+
+from excel_data_loader import ExcelDataLoader
+from excel_ingest import SheetResult, find_workbooks, ingest_directory, merge_results
+
+
+def write_workbook(path, sheets):
+    """sheets 为 {工作表名: (表头, 数据行)}"""
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for name, (header, rows) in sheets.items():
+        sheet = workbook.create_sheet(name)
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
+def brute_force_merge(hotel_lists):
+    merged = {}
+    for hotels in hotel_lists:
+        for hotel in hotels:
+            merged.setdefault(hotel.hotel_id, hotel)
+    return list(merged.values())
+
+
+def test_merge_results_keeps_first_duplicate():
+    class Hotel:
+        def __init__(self, hotel_id, name):
+            self.hotel_id, self.name = hotel_id, name
+
+    results = [SheetResult('a.xlsx', None, [Hotel('1', 'a1'), Hotel('2', 'a2'), Hotel('1', 'a1 again')]),
+               SheetResult('b.xlsx', None, error='BadZipFile: 坏文件'),
+               SheetResult('c.xlsx', None, [Hotel('2', 'c2'), Hotel('3', 'c3')]),
+               SheetResult('d.xlsx', None, [])]
+    merged = merge_results(results)
+    expected = brute_force_merge(result.hotels for result in results)
+    assert [hotel.name for hotel in merged] == [hotel.name for hotel in expected] == ['a1', 'a2', 'c3']
+    assert [result.duplicates for result in results] == [1, 0, 1, 0]
+    # 重复合并时丢弃数量重新计算
+    merge_results(results)
+    assert [result.duplicates for result in results] == [1, 0, 1, 0]
+    assert merge_results([]) == []
+
+
+def test_ingest_directory_matches_sequential_parse(tmp_path, sample_sheet_rows):
+    header, data = sample_sheet_rows
+    # 携程酒店ID 不在 ID_COLUMNS 中，改名为 hotel_id 后各文件按同一ID去重
+    header = ('hotel_id',) + header[1:]
+    # b 与 a 有 10 行重复，子目录中的文件与 a 完全相同
+    write_workbook(tmp_path / 'a.xlsx', {'Sheet1': (header, data[:30])})
+    write_workbook(tmp_path / 'b.xlsx', {'Sheet1': (header, data[20:50])})
+    os.mkdir(tmp_path / 'sub')
+    write_workbook(tmp_path / 'sub' / 'c.xlsx', {'Sheet1': (header, data[:30])})
+    (tmp_path / 'broken.xlsx').write_bytes(b'not a workbook')
+    (tmp_path / '~$a.xlsx').write_bytes(b'lock')
+    (tmp_path / 'notes.txt').write_text('skip')
+
+    paths = find_workbooks(str(tmp_path))
+    assert [os.path.relpath(path, tmp_path) for path in paths] == \
+        ['a.xlsx', 'b.xlsx', 'broken.xlsx', os.path.join('sub', 'c.xlsx')]
+
+    expected = brute_force_merge(list(ExcelDataLoader(path).iter_excel_hotels(keep_original_data=False))
+                                 for path in paths if not path.endswith('broken.xlsx'))
+    assert len(expected) == 50
+
+    for workers in (1, 2):
+        report = ingest_directory(str(tmp_path), workers)
+        assert report.hotels == expected
+        assert [result.path for result in report.failed] == ['broken.xlsx']
+        assert [(result.path, len(result.hotels), result.duplicates) for result in report.results] == \
+            [('a.xlsx', 30, 0), ('b.xlsx', 30, 10), ('broken.xlsx', 0, 0), (os.path.join('sub', 'c.xlsx'), 30, 30)]
+        assert len(report.lines()) == 4
+
+
+def test_all_sheets_without_id_column(tmp_path, sample_sheet_rows):
+    header, data = sample_sheet_rows
+    # 没有可识别的ID列时按 文件名:工作表_行号 生成ID，不同工作表的行不会被当成重复
+    write_workbook(tmp_path / 'region.xlsx', {'东': (header, data[:5]), '西': (header, data[:3])})
+
+    first_sheet = ingest_directory(str(tmp_path), 1)
+    assert [hotel.hotel_id for hotel in first_sheet.hotels] == [f"region_{row:06d}" for row in range(1, 6)]
+
+    for workers in (1, 2):
+        report = ingest_directory(str(tmp_path), workers, all_sheets=True)
+        assert [hotel.hotel_id for hotel in report.hotels] == \
+            [f"region:东_{row:06d}" for row in range(1, 6)] + [f"region:西_{row:06d}" for row in range(1, 4)]
+        assert not report.failed
+
+
+def test_empty_directory(tmp_path):
+    report = ingest_directory(str(tmp_path), 4)
+    assert report.hotels == [] and report.results == []
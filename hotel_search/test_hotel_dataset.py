@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据集持有者测试
+首次加载失败时发布空快照并在下一轮重试；之后加载失败保留旧快照
+"""
+
+import json
+import os
+
+from hotel_dataset import HotelDatasetHolder
+
+
+def write_dataset(path, hotels):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'hotels': hotels}, f, ensure_ascii=False)
+
+
+def test_first_load_failure_is_retried_without_file_change(tmp_path):
+    path = str(tmp_path / 'hotels.json')
+    write_dataset(path, [{'hotel_id': '1', 'city_name_cn': '东京'}])
+    holder = HotelDatasetHolder(path, check_interval=0)
+
+    # 模拟一次临时读取错误，文件本身没有变化
+    load_hotels = holder._load_hotels
+    holder._load_hotels = lambda: None
+    assert holder.start().hotels == []
+    holder._load_hotels = load_hotels
+
+    assert holder.reload()
+    assert [hotel['hotel_id'] for hotel in holder.snapshot.hotels] == ['1']
+    assert holder.snapshot.version == 2
+    # 成功加载之后文件不变就不再重新加载
+    assert not holder.reload()
+
+
+def test_first_load_of_missing_or_partial_file(tmp_path):
+    path = str(tmp_path / 'hotels.json')
+    holder = HotelDatasetHolder(path, check_interval=0)
+    assert holder.snapshot.hotels == []
+    assert not holder.reload()
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"hotels": [')
+    assert not holder.reload()
+    assert holder.snapshot.hotels == []
+
+    write_dataset(path, [{'hotel_id': '1'}])
+    assert holder.reload()
+    assert len(holder.snapshot.hotels) == 1
+
+
+def test_later_failure_keeps_snapshot(tmp_path):
+    path = str(tmp_path / 'hotels.json')
+    write_dataset(path, [{'hotel_id': '1'}, {'hotel_id': '2'}])
+    holder = HotelDatasetHolder(path, check_interval=0)
+    snapshot = holder.start()
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"hotels": [')
+    assert not holder.reload()
+    assert holder.snapshot is snapshot
+
+    write_dataset(path, [{'hotel_id': '3'}])
+    os.utime(path, (snapshot.mtime + 5, snapshot.mtime + 5))
+    assert holder.reload()
+    assert [hotel['hotel_id'] for hotel in holder.snapshot.hotels] == ['3']
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式酒店表测试
+行视图与原酒店对象逐字段相同；字典编码列的统计与逐个酒店计数的结果一致
+"""
+
+from array import array
+from collections import Counter
+from dataclasses import asdict, replace
+
+import pytest
+
+from excel_data_loader import ExcelHotelData
+from hotel_dataset import CATEGORY_DEFAULTS
+from hotel_table import (CategoricalColumn, FloatColumn, HotelTable, category_counts, categorical_columns,
+                         hotel_statistics, top_counts)
+from reference_utils import load_hotels
+from simple_server import HotelSearchApi
+
+
+def record_dict(hotel):
+    values = asdict(hotel)
+    values.pop('original_data')
+    return values
+
+
+def brute_force_statistics(hotels):
+    """逐个酒店计数（原 get_data_statistics 的结果格式）"""
+    cities = Counter(hotel.city_name_cn for hotel in hotels)
+    return {
+        'total_hotels': len(hotels),
+        'total_cities': len(cities),
+        'cities': {city: {'count': count} for city, count in cities.items()},
+        'star_ratings': dict(Counter(hotel.star_rating for hotel in hotels)),
+        'price_ranges': dict(Counter(hotel.price_range for hotel in hotels)),
+        'countries': list(dict.fromkeys(hotel.country for hotel in hotels))
+    }
+
+
+def test_rows_match_records():
+    hotels = load_hotels(200)
+    table = HotelTable.from_records(hotels)
+    assert len(table) == len(hotels)
+
+    for doc_id, hotel in enumerate(hotels):
+        row = table[doc_id]
+        assert row.to_dict() == record_dict(hotel)
+        assert row.to_record() == replace(hotel, original_data=None)
+        assert row.original_data is None
+        assert not hasattr(row, '__dict__')
+
+    assert [row.hotel_id for row in table] == [hotel.hotel_id for hotel in hotels]
+    assert table[-1].hotel_id == 'empty_name'
+    assert table[len(table) - 2].latitude is None
+    with pytest.raises(IndexError):
+        table[len(table)]
+    with pytest.raises(IndexError):
+        table[-len(table) - 1]
+
+    # 重复的 hotel_id 以第一次出现的记录为准
+    assert table.doc_id(hotels[0].hotel_id) == 0
+    assert table.get(hotels[0].hotel_id).hotel_name_cn == hotels[0].hotel_name_cn
+    assert table.get('missing') is None and table.doc_id('missing') is None
+
+
+def test_slices():
+    hotels = load_hotels(20)
+    table = HotelTable.from_records(hotels)
+    for index in (slice(None, 1), slice(3, 7), slice(None, None, -3), slice(-2, None), slice(50, 60)):
+        assert [row.to_dict() for row in table[index]] == [record_dict(hotel) for hotel in hotels[index]]
+
+
+def test_column_types():
+    table = HotelTable.from_records(load_hotels(200))
+    for name in ('country', 'city_name_cn', 'region_name', 'price_range', 'star_rating'):
+        assert isinstance(table.column(name), CategoricalColumn)
+    assert isinstance(table.column('search_count'), array)
+    assert isinstance(table.column('latitude'), FloatColumn)
+    assert isinstance(table.column('hotel_name_cn'), list)
+    assert set(table.memory_bytes()) == set(table.fields) | {'hotel_id_index'}
+
+
+def test_from_dicts_fills_defaults():
+    hotels = [{'hotel_id': '1', 'hotel_name_cn': '甲', 'hotel_name_en': 'A', 'hotel_name_jp': '', 'city_name_cn': '东京',
+               'city_name_en': 'Tokyo', 'city_name_jp': '東京', 'region_name': '新宿地区', 'address': '',
+               'country': 'Japan', 'search_count': 3}]
+    row = HotelTable.from_dicts(hotels, ExcelHotelData)[0]
+    assert row.price_range == '' and row.star_rating == 0 and row.latitude is None
+
+    with pytest.raises(KeyError):
+        HotelTable.from_dicts([{'hotel_id': '2'}], ExcelHotelData)
+
+
+def test_categorical_columns_and_statistics():
+    hotels = load_hotels(200)
+    table = HotelTable.from_records(hotels)
+    dicts = [record_dict(hotel) for hotel in hotels]
+    defaults = {'city_name_cn': None, 'hotel_name_cn': None, 'rating': 5, 'star_rating': None}
+
+    expected = {
+        'city_name_cn': dict(Counter(hotel.city_name_cn for hotel in hotels)),
+        'hotel_name_cn': dict(Counter(hotel.hotel_name_cn for hotel in hotels)),
+        'rating': {5: len(hotels)},
+        'star_rating': dict(Counter(hotel.star_rating for hotel in hotels)),
+    }
+    for source in (table, hotels, dicts):
+        columns = categorical_columns(source, defaults)
+        counts = category_counts(columns)
+        assert counts == expected
+        # 取值按首次出现的顺序
+        assert list(counts['city_name_cn']) == list(dict.fromkeys(hotel.city_name_cn for hotel in hotels))
+        assert list(columns['hotel_name_cn']) == [hotel.hotel_name_cn for hotel in hotels]
+
+    # HotelTable 的字典编码列直接复用
+    assert categorical_columns(table, defaults)['city_name_cn'] is table.column('city_name_cn')
+
+    expected_stats = brute_force_statistics(hotels)
+    assert hotel_statistics(table) == expected_stats
+    assert hotel_statistics(hotels) == expected_stats
+    assert hotel_statistics(dicts) == expected_stats
+
+
+def test_empty_inputs():
+    assert hotel_statistics([]) == {}
+    assert category_counts({}) == {}
+    columns = categorical_columns([], {'city_name_cn': None})
+    assert len(columns['city_name_cn']) == 0
+    assert columns['city_name_cn'].counts() == {}
+    empty = HotelTable.from_columns({'hotel_id': []}, ExcelHotelData)
+    assert len(empty) == 0 and empty[:1] == [] and list(empty) == []
+
+
+def test_top_counts():
+    assert top_counts({'a': 1, 'b': 3, 'c': 3, 'd': 2}, 3) == [('b', 3), ('c', 3), ('d', 2)]
+
+
+def legacy_stats(hotels):
+    """原 calculate_stats：逐个酒店字典计数"""
+    cities, regions = Counter(), Counter()
+    for hotel in hotels:
+        cities[hotel.get('city_name_cn', '未知城市')] += 1
+        regions[hotel.get('region_name', '未知区域')] += 1
+    return {
+        'total_hotels': len(hotels),
+        'total_cities': len(cities),
+        'tokyo_hotels': cities.get('东京', 0),
+        'top_cities': sorted(cities.items(), key=lambda item: item[1], reverse=True)[:10],
+        'top_regions': sorted(regions.items(), key=lambda item: item[1], reverse=True)[:10]
+    }
+
+
+def test_calculate_stats_matches_dict_counts():
+    hotels = [record_dict(hotel) for hotel in load_hotels(200)]
+    # 缺少城市、区域字段的酒店计入默认值
+    del hotels[3]['city_name_cn'], hotels[4]['region_name']
+    api = HotelSearchApi.__new__(HotelSearchApi)
+    expected = legacy_stats(hotels)
+    assert api.calculate_stats(hotels) == expected
+    assert api.calculate_stats(hotels, categorical_columns(hotels, CATEGORY_DEFAULTS)) == expected
+    assert api.calculate_stats([]) == {}
+
+    table = HotelTable.from_records(load_hotels(200), ExcelHotelData)
+    assert api.calculate_stats(table, categorical_columns(table, CATEGORY_DEFAULTS)) == \
+        legacy_stats([row.to_dict() for row in table])
+
+
+def test_category_counts_with_many_values():
+    """超过 65536 个不同取值时编码改用 32 位"""
+    values = [f"城市{index % 70000}" for index in range(140000)]
+    column = CategoricalColumn(values)
+    assert column.codes.typecode == 'I'
+    assert list(column) == values
+    assert column.counts() == dict(Counter(values))
+    assert category_counts({'a': column, 'b': CategoricalColumn(['x', 'y', 'x'])})['b'] == {'x': 2, 'y': 1}
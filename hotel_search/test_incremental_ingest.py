@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量导入测试
+每次增量导入后的数据集与对当前 Excel 全量解析的结果一致；
+只有新增和变化的行被重新解析；行按内容匹配，插入、删除一行不影响其他行
+"""
+
+import json
+import os
+
+import openpyxl
+import pytest
+
+from excel_data_loader import ExcelDataLoader
+from incremental_ingest import IncrementalIngest, row_keys
+
+
+@pytest.fixture(scope='module')
+def sheet_rows(sample_sheet_rows):
+    header, data = sample_sheet_rows
+    # 携程酒店ID 不在 ID_COLUMNS 中，改名为 hotel_id 作为匹配键
+    return ('hotel_id',) + header[1:], [list(row) for row in data[:20]]
+
+
+def write_workbook(path, header, rows):
+    workbook = openpyxl.Workbook()
+    workbook.active.append(header)
+    for row in rows:
+        workbook.active.append(row)
+    workbook.save(path)
+
+
+def full_parse(loader):
+    """对当前 Excel 全量解析，按 save_to_json 的格式读回"""
+    hotels = [loader._hotel_to_dict(hotel) for hotel in loader.iter_excel_hotels(keep_original_data=False)]
+    return json.loads(json.dumps(hotels, ensure_ascii=False))
+
+
+def saved_hotels(json_path):
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)['hotels']
+
+
+@pytest.fixture
+def ingest(tmp_path, sheet_rows):
+    header, rows = sheet_rows
+    excel_path = str(tmp_path / 'hotels.xlsx')
+    write_workbook(excel_path, header, rows)
+    return IncrementalIngest(ExcelDataLoader(excel_path), str(tmp_path / 'hotels.json'))
+
+
+def rerun(ingest, header, rows):
+    write_workbook(ingest.loader.excel_file, header, rows)
+    delta = ingest.run()
+    assert saved_hotels(ingest.json_path) == full_parse(ExcelDataLoader(ingest.loader.excel_file))
+    return delta
+
+
+def test_row_keys():
+    assert row_keys(['1', '2', '1', '1', '3', '2']) == ['1', '2', '1#2', '1#3', '3', '2#2']
+    assert row_keys([]) == []
+
+
+def test_incremental_runs_match_full_parse(ingest, sheet_rows):
+    header, rows = sheet_rows
+    rows = [row[:] for row in rows]
+
+    delta = ingest.run()
+    assert delta.full_reason == "没有指纹文件" and len(delta.added) == 20
+    assert saved_hotels(ingest.json_path) == full_parse(ingest.loader)
+
+    delta = ingest.run()
+    assert delta.skipped and delta.unchanged == 20 and delta.parsed == 0
+
+    # 修改 2 行、删除 1 行、新增 1 行
+    rows[3][1] += "（已修改）"
+    rows[7][3] = "新地址"
+    removed = rows.pop(10)
+    rows.append([999999] + rows[0][1:])
+    delta = rerun(ingest, header, rows)
+    assert delta.full_reason is None
+    assert delta.changed == [str(rows[3][0]), str(rows[7][0])]
+    assert delta.removed == [str(removed[0])]
+    assert delta.added == ['999999']
+    assert delta.unchanged == 17
+
+    # 只调整顺序：不重新解析，但重写数据集
+    rows.reverse()
+    mtime = os.stat(ingest.json_path).st_mtime_ns
+    delta = rerun(ingest, header, rows)
+    assert delta.reordered and delta.parsed == 0 and not delta.removed
+    assert os.stat(ingest.json_path).st_mtime_ns != mtime
+
+    # 指纹文件中的 Excel 哈希过期但各行不变（如重新保存了文件）：读取工作表，数据集保持原文件
+    state = ingest.load_state()
+    with open(ingest.fingerprint_path, 'w', encoding='utf-8') as f:
+        json.dump({**state, 'source_digest': 'stale'}, f)
+    mtime = os.stat(ingest.json_path).st_mtime_ns
+    delta = ingest.run()
+    assert not delta.skipped and not delta.dataset_changed and delta.unchanged == 20
+    assert os.stat(ingest.json_path).st_mtime_ns == mtime
+
+
+def test_duplicate_hotel_ids(ingest, sheet_rows):
+    header, rows = sheet_rows
+    # 第 0 行的ID在表中再出现两次，名称不同
+    duplicated = [row[:] for row in rows[:5]]
+    for copy_no in (2, 3):
+        duplicated.append([rows[0][0], f"{rows[0][1]} 副本{copy_no}"] + rows[0][2:])
+    hotel_id = str(rows[0][0])
+
+    delta = rerun(ingest, header, duplicated)
+    assert len(delta.added) == 7
+    assert [hotel['hotel_id'] for hotel in saved_hotels(ingest.json_path)].count(hotel_id) == 3
+
+    # 只修改第二次出现的行
+    duplicated[5][1] += "（已修改）"
+    delta = rerun(ingest, header, duplicated)
+    assert delta.changed == [f"{hotel_id}#2"] and not delta.added and not delta.removed
+
+    # 删除第一次出现的行：其余两行按内容匹配，不重新解析
+    delta = rerun(ingest, header, duplicated[1:])
+    assert delta.removed == [hotel_id]
+    assert delta.parsed == 0 and delta.unchanged == 6
+
+    # 内容完全相同的两行按出现次序分别匹配
+    delta = rerun(ingest, header, duplicated[1:] + [duplicated[1]])
+    assert delta.added == [str(duplicated[1][0]) + "#2"] and delta.unchanged == 6
+    delta = rerun(ingest, header, duplicated[1:])
+    assert delta.removed == [str(duplicated[1][0]) + "#2"] and delta.parsed == 0
+
+
+def count_parsed_rows(ingest):
+    """记录每次调用 _parse_row_to_hotel 的行号"""
+    parsed = []
+    parse_row = ingest.loader._parse_row_to_hotel
+
+    def parse_and_record(row, index):
+        parsed.append(index)
+        return parse_row(row, index)
+
+    ingest.loader._parse_row_to_hotel = parse_and_record
+    return parsed
+
+
+def test_insert_and_delete_without_id_column(tmp_path, sample_sheet_rows):
+    """样例表没有可识别的ID列，hotel_id 由行号生成：中间插入或删除一行只解析这一行"""
+    header, data = sample_sheet_rows
+    rows = [list(row) for row in data[:30]]
+    ingest = IncrementalIngest(ExcelDataLoader(str(tmp_path / 'hotels.xlsx')), str(tmp_path / 'hotels.json'))
+    rerun(ingest, header, rows)
+    parsed = count_parsed_rows(ingest)
+
+    inserted = list(data[100])
+    rows.insert(10, inserted)
+    delta = rerun(ingest, header, rows)
+    assert parsed == [10]
+    assert delta.added == ['excel_000011'] and not delta.changed and not delta.removed
+    assert delta.unchanged == 30
+
+    del parsed[:]
+    del rows[3]
+    delta = rerun(ingest, header, rows)
+    assert parsed == []
+    assert delta.removed == ['excel_000004'] and delta.unchanged == 30
+
+    # 同时修改一行
+    rows[20][1] += "（已修改）"
+    rows.pop(0)
+    delta = rerun(ingest, header, rows)
+    assert parsed == [19]
+    assert delta.parsed == 1 and delta.unchanged == 28
+
+
+def test_full_reparse_when_state_is_stale(ingest, sheet_rows):
+    header, rows = sheet_rows
+    ingest.run()
+
+    os.unlink(ingest.json_path)
+    delta = rerun(ingest, header, rows)
+    assert delta.full_reason == "数据集不存在" and len(delta.added) == 20
+
+    ingest.loader.parse_config = lambda: {'columns': '已修改'}
+    delta = ingest.run()
+    assert delta.full_reason == "解析配置变化" and len(delta.added) == 20
+    assert saved_hotels(ingest.json_path) == full_parse(ingest.loader)
+
+    with open(ingest.fingerprint_path, 'w', encoding='utf-8') as f:
+        f.write('{"version": 2, "rows": [')
+    assert ingest.load_state() is None
+    assert ingest.run().full_reason == "没有指纹文件"
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+索引文件缓存测试
+清单与输入文件、配置、索引格式版本、索引文件不符时给出重新构建的原因；
+load_cached 在清单过期或索引文件损坏时重新构建，否则复用
+"""
+
+import json
+
+import pytest
+
+import index_cache
+from excel_data_loader import ExcelDataLoader
+from index_cache import IndexArtifactCache, config_digest, file_digest
+from reference_utils import load_hotels
+from test_excel_hotels import ExcelHotelSearchSystem
+
+CONFIG = {'stop_words': ['酒店', 'hotel'], 'max_edit_distance': 2}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    source = tmp_path / 'hotels.json'
+    source.write_text('{"hotels": []}', encoding='utf-8')
+    artifact = tmp_path / 'hotels.idx'
+    artifact.write_bytes(b'index')
+    cache = IndexArtifactCache(str(artifact), [str(source)], CONFIG)
+    cache.write_manifest({'build': 1.0})
+    return cache
+
+
+def rewrite_manifest(cache, **changes):
+    manifest = cache.load_manifest()
+    manifest.update(changes)
+    with open(cache.manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+
+def test_fresh_manifest(cache):
+    assert cache.stale_reason() is None
+    manifest = cache.load_manifest()
+    assert manifest['inputs'] == {cache.inputs[0]: file_digest(cache.inputs[0])}
+    assert manifest['config_digest'] == config_digest(dict(reversed(list(CONFIG.items()))))
+    assert manifest['stage_timings'] == {'build': 1.0}
+
+
+def test_stale_reasons(cache, tmp_path):
+    source, artifact = tmp_path / 'hotels.json', tmp_path / 'hotels.idx'
+
+    source.write_text('{"hotels": [1]}', encoding='utf-8')
+    assert cache.stale_reason().startswith("输入文件内容变化")
+    cache.write_manifest({})
+    assert cache.stale_reason() is None
+
+    artifact.write_bytes(b'index!')
+    assert cache.stale_reason() == "索引文件大小与清单不符"
+    artifact.unlink()
+    assert cache.stale_reason() == "索引文件不存在"
+    artifact.write_bytes(b'index!')
+    cache.write_manifest({})
+
+    assert IndexArtifactCache(cache.artifact_path, cache.inputs, {**CONFIG, 'max_edit_distance': 1}).stale_reason() == \
+        "归一化或建索引配置变化"
+    assert IndexArtifactCache(cache.artifact_path, cache.inputs + [str(artifact)], CONFIG).stale_reason() == \
+        "输入文件列表变化"
+
+    source.unlink()
+    assert cache.stale_reason().startswith("输入文件无法读取")
+    source.write_text('{"hotels": [1]}', encoding='utf-8')
+    assert cache.stale_reason() is None
+
+    rewrite_manifest(cache, index_format_version=index_cache.INDEX_FORMAT_VERSION - 1)
+    assert cache.stale_reason().startswith("索引格式版本变化")
+    rewrite_manifest(cache, manifest_version=0)
+    assert cache.stale_reason() == "清单格式版本变化"
+
+    with open(cache.manifest_path, 'w', encoding='utf-8') as f:
+        f.write('{"manifest_version": 1,')
+    assert cache.stale_reason() == "没有构建清单"
+
+
+def test_load_cached_rebuilds_stale_artifacts(tmp_path, capsys):
+    source = tmp_path / 'hotels.json'
+    artifact = str(tmp_path / 'hotels.idx')
+    loader = ExcelDataLoader()
+    loader.save_to_json(load_hotels(50), str(source))
+
+    def load():
+        capsys.readouterr()
+        system = ExcelHotelSearchSystem.load_cached(artifact, str(source))
+        return system, capsys.readouterr().out
+
+    system, output = load()
+    assert "重新构建索引文件（没有构建清单）" in output
+    expected = [item.hotel_id for item in system.suggest('东京', 20)]
+
+    system, output = load()
+    assert "复用索引文件" in output
+    assert [item.hotel_id for item in system.suggest('东京', 20)] == expected
+
+    # 清单过期：输入文件内容变化
+    loader.save_to_json(load_hotels(60), str(source))
+    system, output = load()
+    assert "输入文件内容变化" in output
+    assert len(system.store) == 62
+    system, output = load()
+    assert "复用索引文件" in output and len(system.store) == 62
+
+    # 清单有效但索引文件被改写（大小不变），打开时报错后重新构建
+    with open(artifact, 'r+b') as f:
+        f.write(b'\0' * 16)
+    system, output = load()
+    assert "重新构建索引文件" in output
+    assert len(system.store) == 62
+    assert "复用索引文件" in load()[1]
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+二进制索引文件测试
+构建 -> 写入 -> mmap 打开 -> 再写入，两次写入的文件逐字节相同，映射结构的查询结果与内存结构一致；
+截断或损坏的文件打开时报 ValueError
+"""
+
+import pytest
+
+from excel_data_loader import ExcelHotelData
+from index_file import MAGIC, MappedIndexFile, _HEADER
+from reference_utils import load_hotels
+from test_excel_hotels import ExcelHotelSearchSystem
+
+QUERIES = ['东京', '新宿', 'shinjuku', 'shinjyuku', 'washingten', 'tokyo', 'hotel', 'akihabara', '上野', 'xqz']
+
+
+@pytest.fixture(scope='module')
+def system():
+    return ExcelHotelSearchSystem(load_hotels())
+
+
+def suggestion_ids(system, query, count):
+    return [item.hotel_id for item in system.suggest(query, count)]
+
+
+def test_round_trip_is_byte_identical(system, tmp_path):
+    first, second = tmp_path / 'first.idx', tmp_path / 'second.idx'
+    size = system.save_index_file(str(first))
+    assert size == first.stat().st_size
+
+    mapped = ExcelHotelSearchSystem.from_index_file(str(first))
+    assert mapped.save_index_file(str(second)) == size
+    assert first.read_bytes() == second.read_bytes()
+
+    # 列式酒店表写出的文件与酒店对象列表相同
+    third = tmp_path / 'third.idx'
+    ExcelHotelSearchSystem(load_hotels(), columnar=True).save_index_file(str(third))
+    assert first.read_bytes() == third.read_bytes()
+
+
+def test_mapped_queries_match_memory(system, tmp_path):
+    path = tmp_path / 'hotels.idx'
+    system.save_index_file(str(path))
+    mapped = ExcelHotelSearchSystem.from_index_file(str(path))
+
+    assert len(mapped.store) == len(system.store)
+    assert list(mapped.store) == list(system.store)
+    assert mapped.store.get('empty_name').hotel_name_cn == ''
+    # 重复的 hotel_id 以第一次出现的记录为准
+    assert mapped.store.get(system.store[0].hotel_id) == system.store[0]
+    assert mapped.store.get('missing') is None
+
+    assert list(mapped.suggest_index) == list(system.suggest_index)
+    for key in list(system.suggest_index)[:200]:
+        assert list(mapped.suggest_index[key]) == list(system.suggest_index[key])
+
+    assert len(mapped.deletion_index) == len(system.deletion_index)
+    assert mapped.deletion_index.delete_count == system.deletion_index.delete_count
+    assert len(mapped.bk_tree) == len(system.bk_tree)
+
+    for query in QUERIES + ['', 'x']:
+        normalized = query.lower()
+        assert mapped.prefix_index.matching_keys(normalized) == system.prefix_index.matching_keys(normalized)
+        assert mapped.deletion_index.lookup(normalized) == system.deletion_index.lookup(normalized)
+        for max_nodes in (None, 1, 50):
+            assert mapped.bk_tree.search(normalized, 2, max_nodes) == system.bk_tree.search(normalized, 2, max_nodes)
+        for count in (1, 10, 50):
+            assert mapped.completion_trie.lookup_weighted(normalized, count) == \
+                system.completion_trie.lookup_weighted(normalized, count)
+            assert suggestion_ids(mapped, query, count) == suggestion_ids(system, query, count)
+            assert [item.hotel_id for item in mapped.complete(query, count)] == \
+                [item.hotel_id for item in system.complete(query, count)]
+
+
+def test_mapped_tables_match_memory(system, tmp_path):
+    path = tmp_path / 'hotels.idx'
+    system.save_index_file(str(path))
+    index = MappedIndexFile(str(path), ExcelHotelData)
+
+    memory, mapped = system.deletion_index.tables(), index.deletion_index.tables()
+    assert mapped.surfaces == memory.surfaces
+    assert mapped.prefixes == memory.prefixes
+    assert mapped.prefix_surfaces == memory.prefix_surfaces
+    assert {variant: list(ids) for variant, ids in mapped.deletes.items()} == \
+        {variant: list(ids) for variant, ids in memory.deletes.items()}
+
+    assert index.bk_tree.tables() == system.bk_tree.tables()
+    assert index.completion_trie.tables() == system.completion_trie.tables()
+
+
+def test_truncated_or_corrupted_file(system, tmp_path):
+    path = tmp_path / 'hotels.idx'
+    system.save_index_file(str(path))
+    data = path.read_bytes()
+
+    broken = tmp_path / 'broken.idx'
+    cases = [
+        b'',
+        data[:_HEADER.size - 1],
+        data[:_HEADER.size + 10],
+        data[:len(data) // 2],
+        data[:-1],
+        b'NOTINDEX' + data[len(MAGIC):],
+        _HEADER.pack(MAGIC, 999, 0) + data[_HEADER.size:],
+    ]
+    for content in cases:
+        broken.write_bytes(content)
+        with pytest.raises(ValueError):
+            MappedIndexFile(str(broken), ExcelHotelData)
+
+    # 元信息被改写
+    meta = data.index(b'"format_version"')
+    broken.write_bytes(data[:meta] + b'\xff' + data[meta + 1:])
+    with pytest.raises(ValueError):
+        MappedIndexFile(str(broken), ExcelHotelData)
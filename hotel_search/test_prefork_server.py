@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预派生服务测试
+数据集重新加载时替换工作进程，正在处理的请求照常完成
+"""
+
+import gc
+import http.client
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from hotel_dataset import HotelDatasetHolder
+from prefork_server import PreforkSupervisor
+from simple_server import HotelSearchApi, HotelSearchHandler
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason="需要 fork")
+
+
+class SlowHandler(HotelSearchHandler):
+    """/slow 先创建 marker 文件，等待一秒后才响应"""
+    marker = None
+
+    def do_GET(self):
+        if self.path != '/slow':
+            super().do_GET()
+            return
+        open(self.marker, 'w').close()
+        time.sleep(1.0)
+        self.send_result(200, [('Content-type', 'text/plain')], b'done')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_dataset(path, hotel_ids):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'hotels': [{'hotel_id': hotel_id, 'city_name_cn': '东京'} for hotel_id in hotel_ids]}, f)
+
+
+def get(server, path):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_reload_lets_in_flight_request_finish(tmp_path):
+    data_file = str(tmp_path / 'hotels.json')
+    marker = str(tmp_path / 'started')
+    write_dataset(data_file, ['1'])
+    holder = HotelDatasetHolder(data_file, check_interval=0)
+    holder.start()
+    handler_class = type('SlowHandler', (SlowHandler,), {'marker': marker})
+    supervisor = PreforkSupervisor(('127.0.0.1', 0), HotelSearchApi(holder), workers=1,
+                                   handler_class=handler_class, report_interval=0)
+    thread = threading.Thread(target=supervisor.serve_forever)
+    thread.start()
+    try:
+        wait_for(lambda: supervisor.worker_pids())
+        old_pids = supervisor.worker_pids()
+
+        # 唯一的工作进程正在处理 /slow 时重新加载数据集
+        results = []
+        client = threading.Thread(target=lambda: results.append(get(supervisor, '/slow')))
+        client.start()
+        wait_for(lambda: os.path.exists(marker))
+        write_dataset(data_file, ['1', '2'])
+        assert holder.reload(force=True)
+        client.join()
+        assert results == [(200, b'done')]
+
+        # 旧进程退出后换成共享新快照的进程
+        wait_for(lambda: supervisor.worker_pids() and supervisor.worker_pids() != old_pids)
+        status, body = get(supervisor, '/api/stats')
+        assert status == 200 and json.loads(body)['stats']['total_hotels'] == 2
+    finally:
+        supervisor.shutdown()
+        thread.join()
+        supervisor.server_close()
+        gc.unfreeze()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio 服务模式测试
+同一连接上处理多个请求；HEAD 与 GET 响应头相同但没有响应体；超长的行返回 400 / 431
+"""
+
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from hotel_dataset import HotelDatasetHolder
+from simple_server import MAX_HEADERS, MAX_LINE, HotelSearchApi, create_server
+
+
+@pytest.fixture
+def server(tmp_path):
+    path = str(tmp_path / 'hotels.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'hotels': [{'hotel_id': '1', 'hotel_name_cn': '新宿酒店', 'city_name_cn': '东京'}]}, f,
+                  ensure_ascii=False)
+    holder = HotelDatasetHolder(path, check_interval=0)
+    holder.start()
+    server = create_server('asyncio', ('127.0.0.1', 0), HotelSearchApi(holder), workers=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def raw_request(server, data):
+    """发送原始请求，读取到连接关闭为止"""
+    with socket.create_connection(server.server_address, timeout=5) as sock:
+        sock.sendall(data)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+
+def test_keep_alive_and_head(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        conn.request('GET', '/api/stats')
+        response = conn.getresponse()
+        body = response.read()
+        assert response.status == 200 and not response.will_close
+        assert json.loads(body)['stats']['total_hotels'] == 1
+        sock = conn.sock
+
+        conn.request('HEAD', '/api/stats')
+        response = conn.getresponse()
+        assert response.status == 200 and response.read() == b''
+        assert int(response.getheader('Content-Length')) == len(body)
+
+        conn.request('GET', '/api/missing')
+        response = conn.getresponse()
+        assert response.status == 404 and response.read() == b'API not found'
+        # 三个请求都在同一个连接上
+        assert conn.sock is sock
+
+        conn.request('GET', '/api/stats', headers={'Connection': 'close'})
+        response = conn.getresponse()
+        assert response.status == 200 and response.will_close
+        response.read()
+    finally:
+        conn.close()
+
+
+def test_http10_closes_unless_keep_alive(server):
+    response = raw_request(server, b'GET /api/stats HTTP/1.0\r\n\r\n')
+    assert response.startswith(b'HTTP/1.1 200 ') and b'Connection: close' in response
+
+    # 同一连接上的两个请求都得到响应
+    data = b'GET /api/stats HTTP/1.0\r\nConnection: keep-alive\r\n\r\nGET /api/stats HTTP/1.0\r\n\r\n'
+    response = raw_request(server, data)
+    assert response.count(b'HTTP/1.1 200 ') == 2
+    assert b'Connection: keep-alive' in response and response.rstrip().endswith(b'}')
+
+
+def test_bad_requests(server):
+    assert raw_request(server, b'GET\r\n\r\n').startswith(b'HTTP/1.1 400 ')
+    assert raw_request(server, b'POST /api/stats HTTP/1.1\r\n\r\n').startswith(b'HTTP/1.1 501 ')
+
+    response = raw_request(server, b'GET /' + b'a' * MAX_LINE + b' HTTP/1.1\r\n\r\n')
+    assert response.startswith(b'HTTP/1.1 400 ') and b'Connection: close' in response
+
+    response = raw_request(server, b'GET / HTTP/1.1\r\nX-Long: ' + b'a' * MAX_LINE + b'\r\n\r\n')
+    assert response.startswith(b'HTTP/1.1 431 ')
+
+    headers = b''.join(b'X-%d: 1\r\n' % index for index in range(MAX_HEADERS + 1))
+    assert raw_request(server, b'GET / HTTP/1.1\r\n' + headers + b'\r\n').startswith(b'HTTP/1.1 431 ')
+
+    # 出错之后服务器仍然正常
+    assert raw_request(server, b'GET /api/stats HTTP/1.0\r\n\r\n').startswith(b'HTTP/1.1 200 ')
+
+
+def test_idle_connection_does_not_block_shutdown(tmp_path):
+    holder = HotelDatasetHolder(str(tmp_path / 'missing.json'), check_interval=0)
+    server = create_server('asyncio', ('127.0.0.1', 0), HotelSearchApi(holder), workers=1)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        conn.request('GET', '/api/stats')
+        assert conn.getresponse().read()
+        server.shutdown()
+        thread.join()
+        server.server_close()
+    finally:
+        conn.close()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编辑距离测试
+位并行（模式串不超过 64 个字符）、带状动态规划（更长）和 NumPy 批量计算与完整矩阵动态规划的结果一致
+"""
+
+import random
+
+import pytest
+
+from reference_utils import matrix_edit_distance
+from string_compute_utils import BIT_PARALLEL_MAX_LENGTH, StringComputeUtils
+
+
+def random_string(rng, length, alphabet='abcd东京'):
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+def string_pairs(seed=4):
+    """覆盖空串、相同串、位并行 64 / 65 个字符的边界以及长度差很大的串"""
+    rng = random.Random(seed)
+    lengths = [0, 1, 2, 5, BIT_PARALLEL_MAX_LENGTH - 1, BIT_PARALLEL_MAX_LENGTH, BIT_PARALLEL_MAX_LENGTH + 1, 100]
+    pairs = [('', ''), ('', 'abc'), ('abc', ''), ('abc', 'abc'), ('kitten', 'sitting'), ('东京', '京都')]
+    for len1 in lengths:
+        for len2 in lengths:
+            for _ in range(3):
+                pairs.append((random_string(rng, len1), random_string(rng, len2)))
+    # 只有少量编辑的长串
+    base = random_string(rng, BIT_PARALLEL_MAX_LENGTH)
+    for edits in range(4):
+        edited = list(base + 'x')
+        for _ in range(edits):
+            edited[rng.randrange(len(edited))] = rng.choice('xyz')
+        pairs.append((base, ''.join(edited)))
+        pairs.append((base + 'y', ''.join(edited)))
+    return pairs
+
+
+@pytest.mark.parametrize('str1,str2', string_pairs())
+def test_levenshtein_matches_matrix(str1, str2):
+    expected = matrix_edit_distance(str1, str2)
+    assert StringComputeUtils.compute_levenshtein_distance(str1, str2) == expected
+    assert StringComputeUtils.compute_levenshtein_distance(str2, str1) == expected
+    for max_distance in (0, 1, 2, expected, expected + 1, 200):
+        bounded = StringComputeUtils.compute_levenshtein_distance(str1, str2, max_distance)
+        assert bounded == (expected if expected <= max_distance else max_distance + 1)
+
+
+def test_batch_matches_scalar():
+    pairs = string_pairs(9)
+    rng = random.Random(9)
+    candidates = [str2 for _, str2 in pairs]
+    for query in ['', 'a', '东京', random_string(rng, BIT_PARALLEL_MAX_LENGTH),
+                  random_string(rng, BIT_PARALLEL_MAX_LENGTH + 1)]:
+        assert StringComputeUtils.batch_levenshtein_distance(query, candidates).tolist() == \
+            [matrix_edit_distance(query, candidate) for candidate in candidates]
+        assert StringComputeUtils.batch_similarity(query, candidates).tolist() == \
+            [StringComputeUtils.compute_similarity(query, candidate) for candidate in candidates]
+        for normalize in (True, False):
+            assert StringComputeUtils.batch_distance_score(query, candidates, normalize).tolist() == \
+                [StringComputeUtils.compute_distance_score(query, candidate, normalize) for candidate in candidates]
+
+    assert StringComputeUtils.batch_levenshtein_distance('abc', []).tolist() == []
+    assert StringComputeUtils.batch_distance_score('abc', []).tolist() == []
+
+
+def test_scores_and_upper_bounds():
+    for str1, str2 in string_pairs(11):
+        max_length = max(len(str1), len(str2))
+        similarity = 1.0 - matrix_edit_distance(str1, str2) / max_length if max_length else 1.0
+        assert StringComputeUtils.compute_similarity(str1, str2) == similarity
+        assert StringComputeUtils.similarity_upper_bound(str1, str2) >= similarity
+
+        score = StringComputeUtils.compute_distance_score(str1, str2)
+        assert score == (similarity ** 0.5 if str1 and str2 else 0.0)
+        assert StringComputeUtils.distance_score_upper_bound(str1, str2) >= score
+
+        # 提前停止：超过阈值的相似度总是精确值，否则返回 0
+        for min_similarity in (0.0, 0.5, 0.9):
+            bounded = StringComputeUtils.compute_similarity(str1, str2, min_similarity)
+            assert bounded == similarity or (bounded == 0.0 and similarity <= min_similarity)
+        for min_score in (0.3, 0.8):
+            bounded = StringComputeUtils.compute_distance_score(str1, str2, min_score=min_score)
+            assert bounded == score or (bounded == 0.0 and score <= min_score)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+排序前缀索引测试
+matching_keys 与原来对全部索引键线性扫描的结果（包括顺序）一致
+"""
+
+import random
+
+from suggest_index import SortedPrefixIndex
+from reference_utils import build_suggest_index, linear_matching_keys, load_hotels
+from test_excel_hotels import QueryNormalizer
+
+KEYS = ['', 'a', 'ab', 'abc', 'abd', 'b', 'ba', '东京', '东京都', '东', 'z\U0010ffff', 'z\U0010ffffa', 'z']
+
+
+def test_matching_keys_match_linear_scan():
+    suggest_index = build_suggest_index(load_hotels(), QueryNormalizer())
+    index = SortedPrefixIndex(suggest_index)
+    assert len(index) == len(suggest_index)
+
+    queries = ['', 'x', '东', '东京', '新宿', 'shinjuku', 'shin', 'tokyo', 'to', 'hotel', 'xqz', '东京都新宿区']
+    queries += [key[:length] for key in list(suggest_index)[::37] for length in (1, 3, len(key), len(key) + 1)]
+    for query in queries:
+        assert index.matching_keys(query) == linear_matching_keys(suggest_index, query)
+
+
+def test_keys_with_prefix_and_prefixes_of():
+    rng = random.Random(5)
+    keys = KEYS[:]
+    rng.shuffle(keys)
+    index = SortedPrefixIndex(keys)
+    for query in KEYS + ['abz', 'c', '东京都新宿', 'z\U0010ffffab']:
+        assert index.keys_with_prefix(query) == sorted(key for key in keys if key.startswith(query))
+        assert index.prefixes_of(query) == sorted((key for key in keys if query.startswith(key)), key=len)
+        assert index.matching_keys(query) == linear_matching_keys(dict.fromkeys(keys), query)
+
+
+def test_from_sorted_and_empty():
+    index = SortedPrefixIndex(KEYS)
+    copy = SortedPrefixIndex.from_sorted(sorted(KEYS), {key: order for order, key in enumerate(KEYS)})
+    for query in KEYS:
+        assert copy.matching_keys(query) == index.matching_keys(query)
+
+    empty = SortedPrefixIndex([])
+    assert len(empty) == 0
+    assert empty.matching_keys('') == [] and empty.matching_keys('a') == []
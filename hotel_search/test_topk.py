@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Top-K 选取测试
+堆选取、上界剪枝与“全部打分 + 稳定排序 + 切片”的结果完全一致
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from reference_utils import load_hotels, reference_suggest_score
+from score_features import rank_candidates
+from test_excel_hotels import ExcelHotelSearchSystem
+from topk import bound_order, top_k, top_k_by_bounds
+
+
+def brute_force_top_k(items, k, score):
+    """全部打分后稳定排序：同分保持输入顺序"""
+    return sorted(((item, score(item)) for item in items), key=lambda pair: pair[1], reverse=True)[:max(k, 0)]
+
+
+def random_items(rng, count):
+    # 分数取少量整数，制造大量同分
+    return [(index, rng.randrange(6)) for index in range(count)]
+
+
+def test_top_k_matches_sorted():
+    rng = random.Random(1)
+    for count in (0, 1, 5, 50):
+        items = random_items(rng, count)
+        score = lambda item: item[1]
+        for k in (-1, 0, 1, 3, 50, 80):
+            expected = brute_force_top_k(items, k, score)
+            assert top_k(items, k, score) == expected
+            # 上界可以比分数松，但不能低于分数
+            assert top_k(items, k, score, upper_bound=lambda item: item[1] + rng.random()) == expected
+            assert top_k(iter(items), k, score, upper_bound=score) == expected
+
+
+def test_upper_bound_prunes_scoring():
+    items = list(range(100))
+    calls = []
+
+    def score(item):
+        calls.append(item)
+        return item
+
+    stats = {}
+    assert top_k(items, 3, score, upper_bound=lambda item: item, stats=stats) == [(99, 99), (98, 98), (97, 97)]
+    assert len(calls) == 3
+    assert stats == {'candidates': 100, 'scored': 3}
+
+
+def test_top_k_by_bounds():
+    rng = random.Random(2)
+    for count in (0, 1, 7, 60):
+        scores = [rng.randrange(5) for _ in range(count)]
+        bounds = np.array([value + rng.randrange(3) for value in scores], dtype=np.float64)
+        for k in (0, 1, 5, 100):
+            expected = brute_force_top_k(range(count), k, scores.__getitem__)
+            assert top_k_by_bounds(bounds, k, scores.__getitem__) == expected
+            assert top_k_by_bounds(bounds, k, scores.__getitem__, order=bound_order(bounds)) == expected
+
+    assert bound_order(np.array([1.0, 3.0, 1.0, 3.0])).tolist() == [1, 3, 0, 2]
+
+
+@pytest.fixture(scope='module')
+def system():
+    return ExcelHotelSearchSystem(load_hotels())
+
+
+@pytest.mark.parametrize('query', ['东京', 'tokyo', 'Tokyo', '新宿', 'shinjuku', 'hotel', 'xq'])
+def test_rank_candidates_match_reference_scores(system, query):
+    """向量化静态特征 + 上界剪枝的排名与逐个酒店按原公式打分、全量排序相同"""
+    store = system.store
+    candidates = system._collect_candidates(query)
+    full = brute_force_top_k(candidates, 10, lambda doc_id: reference_suggest_score(system, store[doc_id], query))
+
+    for batch in (None, lambda doc_ids: system._distance_scores(doc_ids, query)):
+        ranked = rank_candidates(
+            candidates, 10, system.static_features,
+            distance_score=lambda doc_id: system._distance_score(store[doc_id], query),
+            distance_upper_bound=lambda doc_id: system._distance_upper_bound(store[doc_id], query),
+            contain_boost=lambda doc_id: system._contain_boost(store[doc_id], query),
+            batch_distance_score=batch
+        )
+        assert [doc_id for doc_id, _ in ranked] == [doc_id for doc_id, _ in full]
+        assert [value for _, value in ranked] == pytest.approx([value for _, value in full])
+
+
+def test_rank_candidates_empty(system):
+    assert rank_candidates([], 10, system.static_features, None, None, None) == []
+    assert rank_candidates([0, 1], 0, system.static_features, None, None, None) == []
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Top-K 选取
+用大小为 k 的最小堆代替“全部打分 + 全量排序 + 切片”，并支持分数上界剪枝
+"""
+
+import heapq
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar('T')
+
+
+def top_k(items: Iterable[T], k: int,
+          score: Callable[[T], float],
+          upper_bound: Optional[Callable[[T], float]] = None,
+          stats: Optional[Dict[str, int]] = None) -> List[Tuple[T, float]]:
+    """选出分数最高的 k 个元素，按分数降序返回 [(item, score), ...]
+
+    同分元素保持输入顺序，结果与 sorted(..., reverse=True)[:k] 完全一致。
+
+    提供 upper_bound 时，先计算每个元素廉价的分数上界并按上界降序处理：
+    一旦堆已满且上界小于当前第 k 名的分数，剩余元素都不可能进入结果，
+    直接停止，不再调用开销大的 score。upper_bound 必须满足
+    upper_bound(item) >= score(item)。
+    """
+    if k <= 0:
+        return []
+
+    if upper_bound is None:
+        items = list(items)
+        ordered = ((seq, item, None) for seq, item in enumerate(items))
+    else:
+        bounded = [(upper_bound(item), seq, item) for seq, item in enumerate(items)]
+        bounded.sort(key=lambda entry: (-entry[0], entry[1]))
+        items = bounded
+        ordered = ((seq, item, bound) for bound, seq, item in bounded)
+
+    return _select(ordered, len(items), k, score, stats)
+
+
+def bound_order(upper_bounds: np.ndarray) -> np.ndarray:
+    """按上界降序的处理顺序；稳定排序，上界相同的保持输入顺序"""
+    return np.argsort(-upper_bounds, kind='stable')
+
+
+def top_k_by_bounds(upper_bounds: np.ndarray, k: int,
+                    score: Callable[[int], float],
+                    stats: Optional[Dict[str, int]] = None,
+                    order: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+    """上界已经向量化算好时的 top_k，元素就是上界数组的下标
+
+    order 为调用方已经算好的 bound_order(upper_bounds)，score 会严格按这个顺序被调用。
+    """
+    if k <= 0 or len(upper_bounds) == 0:
+        return []
+
+    if order is None:
+        order = bound_order(upper_bounds)
+    order = order.tolist()
+    bounds = upper_bounds.tolist()
+    ordered = ((seq, seq, bounds[seq]) for seq in order)
+
+    return _select(ordered, len(order), k, score, stats)
+
+
+def _select(ordered: Iterator[Tuple[int, T, Optional[float]]], total: int, k: int,
+            score: Callable[[T], float],
+            stats: Optional[Dict[str, int]]) -> List[Tuple[T, float]]:
+    """按给定顺序维护大小为 k 的堆，上界低于第 k 名时提前结束"""
+    # 堆顶是当前第 k 名；同分时输入位置靠后的更差
+    heap: List[Tuple[float, int, T]] = []
+    scored = 0
+
+    for seq, item, bound in ordered:
+        if bound is not None and len(heap) == k and bound < heap[0][0]:
+            break
+        value = score(item)
+        scored += 1
+        entry = (value, -seq, item)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    if stats is not None:
+        stats['candidates'] = stats.get('candidates', 0) + total
+        stats['scored'] = stats.get('scored', 0) + scored
+
+    heap.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+    return [(item, value) for value, _, item in heap]